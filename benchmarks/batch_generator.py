@@ -0,0 +1,91 @@
+import argparse
+import math
+import os
+import sys
+import time
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+import numpy as np
+
+from src.braid_dataset import BraidDataset
+from src.braid_generator import BraidGenerator
+from src.braid_kernels import batch_action_masks
+from src.config import Configuration
+
+def ks_pvalue(a, b):
+    # Two-sample Kolmogorov-Smirnov with the asymptotic Kolmogorov distribution
+    # (conservative for discrete statistics like the ones below).
+    a, b = np.sort(a), np.sort(b)
+    values = np.concatenate([a, b])
+    d = np.abs(np.searchsorted(a, values, side="right") / len(a) - np.searchsorted(b, values, side="right") / len(b)).max()
+    n = len(a) * len(b) / (len(a) + len(b))
+    lam = (math.sqrt(n) + 0.12 + 0.11 / math.sqrt(n)) * d
+    if lam < 1e-3:
+        return d, 1.0
+    p = 2 * sum((-1) ** (k - 1) * math.exp(-2 * k * k * lam * lam) for k in range(1, 101))
+    return d, min(max(p, 0.0), 1.0)
+
+def chi2_pvalue(counts_a, counts_b):
+    # Chi-square test of homogeneity, p-value via the Wilson-Hilferty normal approximation.
+    table = np.array([counts_a, counts_b], dtype=float)
+    table = table[:, table.sum(axis=0) > 0]
+    expected = table.sum(axis=1, keepdims=True) * table.sum(axis=0) / table.sum()
+    stat = ((table - expected) ** 2 / expected).sum()
+    dof = table.shape[1] - 1
+    z = ((stat / dof) ** (1 / 3) - (1 - 2 / (9 * dof))) / math.sqrt(2 / (9 * dof))
+    return stat, 0.5 * math.erfc(z / math.sqrt(2))
+
+def braid_statistics(dataset: BraidDataset):
+    length = int(dataset.lengths().max())
+    words = dataset.padded_words(length + 2)
+    lengths = dataset.lengths()
+    masks = batch_action_masks(words, lengths, length)
+    return {
+        "commutable positions": masks[:, :length].sum(axis=1),
+        "R3 positions": masks[:, length:2 * length].sum(axis=1),
+        "inverse pairs": masks[:, 2 * length:3 * length].sum(axis=1),
+        "sum |generator|": np.abs(words).sum(axis=1),
+        "distinct generators": np.array([len(set(np.abs(row).tolist()) - {0}) for row in words]),
+        "first letter": words[:, 0]
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scalar vs. NumPy batch braid generation: distribution match and speed.")
+    parser.add_argument("--count", type=int, default=5000)
+    parser.add_argument("--settings", nargs="*", default=["3,8,10", "5,16,50", "7,24,100"])
+    parser.add_argument("--alpha", type=float, default=0.001)
+    args = parser.parse_args()
+
+    config = Configuration()
+    failures = 0
+    for setting in args.settings:
+        n_strands, crossings, difficulty = map(int, setting.split(","))
+        gen = BraidGenerator(n_strands, config, seed=1, verify=False)
+
+        start = time.perf_counter()
+        scalar = BraidDataset.from_braids([gen.generate_braid(crossings, difficulty) for _ in range(args.count)], n_strands)
+        scalar_sec = time.perf_counter() - start
+
+        start = time.perf_counter()
+        batch = gen.generate_batch(args.count, crossings, difficulty, seed=2)
+        batch_sec = time.perf_counter() - start
+
+        print(f"n{n_strands} c{crossings} m{difficulty}: scalar {args.count / scalar_sec:.0f} braids/s, "
+              f"batch {args.count / batch_sec:.0f} braids/s ({scalar_sec / batch_sec:.1f}x)")
+
+        letters = np.arange(-(n_strands - 1), n_strands)
+        stat, p = chi2_pvalue([np.sum(scalar.letters == g) for g in letters], [np.sum(batch.letters == g) for g in letters])
+        failures += p < args.alpha
+        print(f"  {'letter histogram':<22} chi2={stat:8.2f}  p={p:.3f}")
+
+        scalar_stats, batch_stats = braid_statistics(scalar), braid_statistics(batch)
+        for name in scalar_stats:
+            d, p = ks_pvalue(scalar_stats[name], batch_stats[name])
+            failures += p < args.alpha
+            print(f"  {name:<22} KS D={d:.4f}  p={p:.3f}  means {scalar_stats[name].mean():.3f} / {batch_stats[name].mean():.3f}")
+
+    print(f"{failures} test(s) rejected at alpha={args.alpha}")
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,92 @@
+import argparse
+import os
+import sys
+import time
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from src.braid_agent import BraidAgent
+from src.braid_dataset import BraidDataset
+from src.callbacks import BraidCallback
+from src.config import Configuration
+from src.encoding import BraidEncoding
+from src.optimal_solver import AStarSolver
+from src.trajectory_store import TrajectoryLoader, TrajectoryStore
+
+class ThresholdCallback(BraidCallback):
+    # Stops learn() once the rolling success rate over a full window reaches the threshold.
+    def __init__(self, threshold, window):
+        super().__init__(window=window)
+        self.threshold = threshold
+        self.reached_at = None
+
+    def _on_step(self) -> bool:
+        super()._on_step()
+        if len(self.recent_successes) == self.recent_successes.maxlen and self.rolling_success_rate() >= self.threshold:
+            self.reached_at = self.num_timesteps
+            return False
+        return True
+
+def solve_trajectories(dataset, count, max_nodes):
+    solver = AStarSolver(dataset.n_strands, 100)
+    words, paths = [], []
+    for result in solver.solve_many((dataset[i] for i in range(count)), max_time_sec=10.0, max_nodes=max_nodes, workers=0):
+        if result["path"] is not None:
+            words.append(dataset.word(result["index"]).tobytes())
+            paths.append(result["path"])
+    return TrajectoryStore.from_solutions(words, paths, dataset.n_strands)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Environment samples until MaskablePPO reaches a rolling success rate, "
+                                                 "from scratch vs. after behaviour cloning on solver solutions.")
+    parser.add_argument("--dataset", default="data/train/train_n5_c16_m10.txt")
+    parser.add_argument("--solutions", type=int, default=1000, help="braids of the dataset to solve for pretraining")
+    parser.add_argument("--max-nodes", type=int, default=20_000)
+    parser.add_argument("--epochs", type=int, default=10)
+    parser.add_argument("--threshold", type=float, default=0.8)
+    parser.add_argument("--window", type=int, default=200)
+    parser.add_argument("--max-steps", type=int, default=200_000)
+    parser.add_argument("--n-envs", type=int, default=8)
+    parser.add_argument("--max-episode-steps", type=int, default=100)
+    parser.add_argument("--seeds", nargs="+", type=int, default=[0, 1])
+    args = parser.parse_args()
+
+    dataset = BraidDataset.load(os.path.join(project_root, args.dataset))
+    config = Configuration(n_strands=dataset.n_strands, max_len=100)
+
+    start = time.perf_counter()
+    store = solve_trajectories(dataset, min(args.solutions, len(dataset)), args.max_nodes)
+    solve_time = time.perf_counter() - start
+    start = time.perf_counter()
+    loader = TrajectoryLoader([store], BraidEncoding.from_config(config))
+    load_time = time.perf_counter() - start
+    start = time.perf_counter()
+    batches = sum(1 for _ in loader)
+    print(f"{len(store)} solutions, {store.n_transitions} transitions: solved in {solve_time:.1f}s, loader built in "
+          f"{load_time * 1000:.0f} ms, {loader.n_transitions / (time.perf_counter() - start):.0f} transitions/s "
+          f"over {batches} batches\n")
+
+    print(f"{'seed':>4} {'approach':<12} {'bc time':>8} {'bc acc':>7} {'samples':>9} {'rl time':>8} {'final rate':>11}")
+    for seed in args.seeds:
+        for pretrain in (False, True):
+            hyperparameters = {"n_steps": 256, "batch_size": 256, "seed": seed, "device": "cpu", "verbose": 0}
+            agent = BraidAgent(config, hyperparameters, name="bc" if pretrain else "scratch")
+            env = agent.make_mixed_env([os.path.join(project_root, args.dataset)], n_envs=args.n_envs,
+                                       max_episode_steps=args.max_episode_steps)
+            bc_time, accuracy = 0.0, "-"
+            if pretrain:
+                start = time.perf_counter()
+                history = agent.pretrain(env, [store], epochs=args.epochs, seed=seed, verbose=False)
+                bc_time = time.perf_counter() - start
+                accuracy = f"{history[-1]['accuracy']:.1%}"
+
+            callback = ThresholdCallback(args.threshold, args.window)
+            start = time.perf_counter()
+            agent.train(env, args.max_steps, callback=callback)
+            rl_time = time.perf_counter() - start
+            env.close()
+            samples = callback.reached_at if callback.reached_at is not None else f">{agent.model.num_timesteps}"
+            print(f"{seed:>4} {agent.name:<12} {bc_time:>7.1f}s {accuracy:>7} {samples:>9} {rl_time:>7.1f}s "
+                  f"{callback.rolling_success_rate():>10.1%}", flush=True)
@@ -0,0 +1,55 @@
+import argparse
+import os
+import sys
+import time
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+import numpy as np
+from stable_baselines3.common.vec_env import DummyVecEnv
+
+from src.braid_agent import BraidAgent
+from src.config import Configuration
+
+def rollout_steps_per_sec(agent, env, n_steps):
+    # Raw env throughput under masked random actions, as seen by the rollout loop.
+    rng = np.random.default_rng(0)
+    env.reset()
+    start = time.perf_counter()
+    for _ in range(n_steps // env.num_envs):
+        masks = np.stack(env.env_method("action_masks"))
+        actions = np.array([rng.choice(np.flatnonzero(mask)) for mask in masks])
+        env.step(actions)
+    return (n_steps // env.num_envs) * env.num_envs / (time.perf_counter() - start)
+
+def training_steps_per_sec(agent, env, n_steps):
+    start = time.perf_counter()
+    agent.train(env, n_steps)
+    return n_steps / (time.perf_counter() - start)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Steps/sec of BraidAgent env pools from 1 to N worker processes.")
+    parser.add_argument("--dataset", default="data/train/train_n5_c16_m50.txt")
+    parser.add_argument("--max-envs", type=int, default=os.cpu_count())
+    parser.add_argument("--steps", type=int, default=8192)
+    args = parser.parse_args()
+
+    config = Configuration(n_strands=7, max_len=50)
+    dataset = os.path.join(project_root, args.dataset)
+
+    counts = sorted({1, 2, 4, 8, args.max_envs} & set(range(1, args.max_envs + 1)))
+    print(f"{'envs':>4} {'env steps/s':>12} {'train steps/s':>14} {'speedup':>8}")
+    baseline = None
+    for n_envs in counts:
+        agent = BraidAgent(config, {"n_steps": max(64, 1024 // n_envs), "verbose": 0})
+        # One env stays in-process; wrapping it keeps the stepping code identical.
+        env = agent.make_env(dataset, n_envs=n_envs) if n_envs > 1 else DummyVecEnv([lambda: agent.make_env(dataset)])
+
+        raw = rollout_steps_per_sec(agent, env, args.steps)
+        train = training_steps_per_sec(agent, env, args.steps)
+        env.close()
+
+        baseline = baseline or train
+        print(f"{n_envs:>4} {raw:>12.0f} {train:>14.0f} {train / baseline:>7.2f}x", flush=True)
@@ -0,0 +1,43 @@
+import argparse
+import os
+import sys
+import time
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from src.braid_agent import BraidAgent
+from src.braid_env import BraidEnv
+from src.config import Configuration
+
+def serial_episodes_per_sec(agent, path, episodes, max_steps):
+    # The notebook's test() loop: one env, one solve() per episode.
+    env = BraidEnv(path, agent.config.N_STRANDS, agent.config.MAX_LEN, agent.config)
+    start = time.perf_counter()
+    for _ in range(episodes):
+        agent.solve(env, max_steps=max_steps)
+    return episodes / (time.perf_counter() - start)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serial solve() loop vs the batched evaluator.")
+    parser.add_argument("--model", default=None, help="MaskablePPO .zip; a briefly trained model is used otherwise")
+    parser.add_argument("--files", nargs="+", default=["test_n5_c8_m10.txt", "test_n5_c16_m50.txt", "test_n5_c24_m100.txt"])
+    parser.add_argument("--episodes", type=int, default=200)
+    parser.add_argument("--max-steps", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=1)
+    args = parser.parse_args()
+
+    config = Configuration(n_strands=7, max_len=100)
+    agent = BraidAgent(config, {"verbose": 0, "n_steps": 256}, model_path=args.model)
+    paths = [os.path.join(project_root, "data", "test", name) for name in args.files]
+    if agent.model is None:
+        agent.train(agent.make_env(paths[0]), 2048)
+
+    serial = sum(serial_episodes_per_sec(agent, path, args.episodes, args.max_steps) for path in paths) / len(paths)
+    print(f"Serial solve(): {serial:.1f} episodes/s\n")
+
+    start = time.perf_counter()
+    results = agent.evaluate(paths, episodes=args.episodes, max_steps=args.max_steps, seed=0, n_workers=args.workers)
+    batched = sum(r["episodes"] for r in results) / (time.perf_counter() - start)
+    print(f"\nBatched evaluate(): {batched:.1f} episodes/s ({batched / serial:.1f}x)")
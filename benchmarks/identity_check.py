@@ -0,0 +1,52 @@
+import argparse
+import os
+import sys
+import time
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from src.braid_generator import BraidGenerator
+from src.config import Configuration
+
+class SageBraidGenerator(BraidGenerator):
+    # The previous validity path: one Sage BraidGroup element per candidate.
+    def __init__(self, n_strands, config, seed=None):
+        from sage.all import BraidGroup
+        super().__init__(n_strands, config, seed=seed, verify=False)
+        self.B = BraidGroup(n_strands)
+
+    def generate_braid(self, crossings, difficulty):
+        while True:
+            braid = super().generate_braid(crossings, difficulty)
+            if self.B(braid.word).is_one():
+                return braid
+
+def braids_per_sec(generator, count, crossings, difficulty):
+    start = time.perf_counter()
+    for _ in range(count):
+        generator.generate_braid(crossings, difficulty)
+    return count / (time.perf_counter() - start)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Braid generation throughput per identity-check strategy.")
+    parser.add_argument("--count", type=int, default=500)
+    args = parser.parse_args()
+
+    config = Configuration()
+    try:
+        import sage.all  # noqa: F401
+        has_sage = True
+    except ImportError:
+        has_sage = False
+        print("Sage not installed: skipping the Sage column")
+
+    print(f"{'strands':>7} {'crossings':>9} {'moves':>5} {'handle':>10} {'no_verify':>10} {'sage':>10}")
+    for n_strands in (3, 5, 7):
+        for crossings in (8, 16, 24):
+            for difficulty in (10, 100):
+                handle = braids_per_sec(BraidGenerator(n_strands, config, seed=0), args.count, crossings, difficulty)
+                skip = braids_per_sec(BraidGenerator(n_strands, config, seed=0, verify=False), args.count, crossings, difficulty)
+                sage = braids_per_sec(SageBraidGenerator(n_strands, config, seed=0), args.count, crossings, difficulty) if has_sage else float("nan")
+                print(f"{n_strands:>7} {crossings:>9} {difficulty:>5} {handle:>10.0f} {skip:>10.0f} {sage:>10.0f}", flush=True)
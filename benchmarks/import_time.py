@@ -0,0 +1,61 @@
+import argparse
+import os
+import subprocess
+import sys
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY = ("torch", "gymnasium", "stable_baselines3", "sb3_contrib", "pandas", "sage")
+
+# module: (budget in ms, modules that must not be imported along with it)
+BUDGETS = {
+    "src.move_kernels": (30, HEAVY + ("numpy",)),
+    "src.braid": (30, HEAVY + ("numpy",)),
+    "src.heuristics": (30, HEAVY + ("numpy",)),
+    "src.optimal_solver": (50, HEAVY + ("numpy",)),
+    "src.solution_cache": (50, HEAVY + ("numpy",)),
+    "src.braid_generator": (60, HEAVY + ("numpy",)),
+    "src.braid_dataset": (250, HEAVY),
+    "src.braid_kernels": (250, HEAVY),
+    "src.generation_pipeline": (250, HEAVY),
+    "src.numpy_policy": (250, HEAVY),
+    "src.evaluation": (250, HEAVY),
+    "src.policy_search": (250, HEAVY),
+    "src.braid_agent": (300, HEAVY)
+}
+
+PROBE = (
+    "import sys, time\n"
+    "start = time.perf_counter()\n"
+    "import {module}\n"
+    "elapsed = time.perf_counter() - start\n"
+    "print(elapsed * 1000, ','.join(m for m in {forbidden!r} if m in sys.modules))\n"
+)
+
+def measure(module, forbidden, repeats):
+    # Best of several fresh interpreters: the floor is what the code costs, the rest is noise.
+    best, loaded = float("inf"), ""
+    for _ in range(repeats):
+        out = subprocess.run([sys.executable, "-c", PROBE.format(module=module, forbidden=forbidden)],
+                             cwd=project_root, check=True, capture_output=True, text=True).stdout.split()
+        best = min(best, float(out[0]))
+        loaded = out[1] if len(out) > 1 else ""
+    return best, loaded
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fails when a src module exceeds its import-time budget or pulls in heavy dependencies.")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--scale", type=float, default=1.0, help="multiply every budget, e.g. on slow machines")
+    args = parser.parse_args()
+
+    failures = 0
+    print(f"{'module':<24} {'ms':>7} {'budget':>7}  heavy imports")
+    for module, (budget, forbidden) in BUDGETS.items():
+        elapsed, loaded = measure(module, forbidden, args.repeats)
+        ok = elapsed <= budget * args.scale and not loaded
+        failures += not ok
+        print(f"{module:<24} {elapsed:>7.1f} {budget * args.scale:>7.0f}  {loaded or '-'}{'' if ok else '  FAIL'}")
+
+    if failures:
+        print(f"{failures} module(s) over budget")
+        sys.exit(1)
@@ -0,0 +1,95 @@
+import argparse
+import os
+import sys
+import time
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+import numpy as np
+
+from src.braid_agent import BraidAgent
+from src.braid_kernels import batch_rolling_hashes, hash_values
+from src.braid_vec_env import BraidVecEnv
+from src.config import Configuration
+
+SETTINGS = [
+    ("no tracking", {}),
+    ("loop penalty", {"track_loops": True}),
+    ("penalty + mask", {"track_loops": True, "mask_loops": True}),
+]
+
+def rollout(env, choose, n_steps, seed):
+    # Episode lengths, successes and revisited words over n_steps batched steps. Revisits
+    # are counted here, so settings without loop tracking report them too; steps/s only
+    # times the env and the policy.
+    rng = np.random.default_rng(seed)
+    env.seed(seed)
+    obs = env.reset()
+    steps = np.zeros(env.num_envs, dtype=np.int64)
+    visited = [{h} for h in hash_values(batch_rolling_hashes(env.words, env.lengths))]
+    lengths, successes, loops = [], [], 0
+    elapsed = 0.0
+    for _ in range(n_steps // env.num_envs):
+        start = time.perf_counter()
+        masks = env.action_masks()
+        obs, _, dones, infos = env.step(choose(obs, masks, rng))
+        elapsed += time.perf_counter() - start
+        steps += 1
+        hashes = hash_values(batch_rolling_hashes(env.words, env.lengths))
+        for env_idx in range(env.num_envs):
+            if dones[env_idx]:
+                lengths.append(int(steps[env_idx]))
+                successes.append(infos[env_idx]["is_success"])
+                steps[env_idx] = 0
+                visited[env_idx] = {hashes[env_idx]}
+            elif infos[env_idx]["success"]:
+                loops += hashes[env_idx] in visited[env_idx]
+                visited[env_idx].add(hashes[env_idx])
+    return np.array(lengths), np.array(successes), loops, (n_steps // env.num_envs) * env.num_envs / elapsed
+
+def random_policy(obs, masks, rng):
+    return (rng.random(masks.shape) * masks).argmax(axis=1)
+
+def model_policy(model):
+    def choose(obs, masks, rng):
+        actions, _ = model.predict(obs, action_masks=masks, deterministic=True)
+        return actions
+    return choose
+
+def report(name, policy, lengths, successes, loops, steps_per_sec, n_steps):
+    if len(lengths) == 0:
+        lengths = np.zeros(1)
+    print(f"{name:<16} {policy:<8} {len(successes):>8} {np.mean(successes) if len(successes) else 0:>7.1%} "
+          f"{lengths.mean():>6.1f} {np.percentile(lengths, 50):>5.0f} {np.percentile(lengths, 90):>5.0f} "
+          f"{loops / n_steps:>8.1%} {steps_per_sec:>8.0f}", flush=True)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Episode lengths, solve rate and revisited words without loop "
+                                                 "tracking, with the REWARD_LOOP penalty (track_loops) and with loop "
+                                                 "masking.")
+    parser.add_argument("--dataset", default="data/train/train_n5_c8_m10.txt")
+    parser.add_argument("--n-strands", type=int, default=5)
+    parser.add_argument("--n-envs", type=int, default=16)
+    parser.add_argument("--max-episode-steps", type=int, default=100)
+    parser.add_argument("--steps", type=int, default=20_000, help="rollout steps per setting")
+    parser.add_argument("--train-steps", type=int, default=30_000, help="PPO steps per setting (0: random policy only)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    dataset = os.path.join(project_root, args.dataset)
+    print(f"{'setting':<16} {'policy':<8} {'episodes':>8} {'solved':>7} {'mean':>6} {'p50':>5} {'p90':>5} "
+          f"{'revisits':>8} {'steps/s':>8}")
+    for name, overrides in SETTINGS:
+        config = Configuration(n_strands=args.n_strands, max_len=100, **overrides)
+        env = BraidVecEnv(dataset, args.n_strands, 100, config, n_envs=args.n_envs,
+                          max_episode_steps=args.max_episode_steps)
+        report(name, "random", *rollout(env, random_policy, args.steps, args.seed), args.steps)
+
+        if args.train_steps:
+            hyperparameters = {"n_steps": 256, "batch_size": 256, "seed": args.seed, "device": "cpu", "verbose": 0}
+            agent = BraidAgent(config, hyperparameters, name=name)
+            agent.train(env, args.train_steps)
+            report(name, "ppo", *rollout(env, model_policy(agent.model), args.steps, args.seed), args.steps)
+        env.close()
@@ -0,0 +1,169 @@
+import argparse
+import os
+import random
+import sys
+import time
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from array import array
+
+from src import move_kernels
+from src.move_kernels import COMMUTE, R3, REMOVE, INSERT
+
+# Reference copies of the per-call-site loops that move_kernels replaced.
+
+def reference_flags(word):
+    n = len(word)
+    commute = bytearray(i < n - 1 and abs(abs(word[i]) - abs(word[i + 1])) >= 2 for i in range(n))
+    r3 = bytearray(i < n - 2 and word[i] == word[i + 2] and abs(abs(word[i]) - abs(word[i + 1])) == 1
+                   and ((word[i] > 0 and word[i + 1] > 0) or (word[i] < 0 and word[i + 1] < 0)) for i in range(n))
+    remove = bytearray(i < n - 1 and word[i] == -word[i + 1] for i in range(n))
+    return commute, r3, remove
+
+def reference_generator_moves(word):
+    possible_moves = []
+    for i in range(len(word) - 2):
+        gen_0, gen_1, gen_2 = word[i], word[i + 1], word[i + 2]
+        if gen_0 == gen_2 and abs(abs(gen_0) - abs(gen_1)) == 1:
+            if gen_0 * gen_1 > 0:
+                possible_moves.append(('r3', i))
+    for i in range(len(word) - 1):
+        if abs(abs(word[i]) - abs(word[i + 1])) >= 2:
+            possible_moves.append(('commute', i))
+    return possible_moves
+
+def reference_apply(word, move_type, index, generator):
+    word = list(word)
+    if move_type == COMMUTE:
+        word[index], word[index + 1] = word[index + 1], word[index]
+    elif move_type == R3:
+        word[index:index + 3] = [word[index + 1], word[index], word[index + 1]]
+    elif move_type == REMOVE:
+        del word[index:index + 2]
+    else:
+        word[index:index] = [generator, -generator]
+    return word
+
+def reference_predecessors(key, signed_pairs, insert_limit, max_word_len):
+    word = array('b', key).tolist()
+    curr_len = len(word)
+    for i in range(curr_len - 1):
+        gen_0, gen_1 = word[i], word[i + 1]
+        dist = abs(abs(gen_0) - abs(gen_1))
+        if dist >= 2:
+            yield COMMUTE, i, key[:i] + key[i+1:i+2] + key[i:i+1] + key[i+2:]
+        elif dist == 1 and i < curr_len - 2 and word[i + 2] == gen_0 and gen_0 * gen_1 > 0:
+            yield R3, i, key[:i] + key[i+1:i+2] + key[i:i+1] + key[i+1:i+2] + key[i+3:]
+        elif gen_0 == -gen_1 and gen_0 > 0 and curr_len - 2 < insert_limit:
+            yield INSERT, i, key[:i] + key[i+2:]
+    if curr_len + 2 <= max_word_len:
+        for i in range(curr_len + 1):
+            prefix, suffix = key[:i], key[i:]
+            for pair in signed_pairs:
+                yield REMOVE, i, prefix + pair + suffix
+
+def random_word(rng, n_strands, length):
+    # Small generator ranges and repeated letters so every move type shows up.
+    word = []
+    while len(word) < length:
+        gen = rng.randint(1, n_strands - 1) * rng.choice((1, -1))
+        roll = rng.random()
+        if roll < 0.2:
+            word += (gen, -gen)
+        elif roll < 0.4 and n_strands > 2:
+            other = max(1, min(n_strands - 1, abs(gen) + rng.choice((1, -1)))) * (1 if gen > 0 else -1)
+            word += (gen, other, gen)
+        else:
+            word.append(gen)
+    return word[:length]
+
+def pairs_for(n_strands):
+    pairs = [bytes((gen, -gen & 0xFF)) for gen in range(1, n_strands)]
+    return pairs, pairs + [bytes((-gen & 0xFF, gen)) for gen in range(1, n_strands)]
+
+def check_equivalence(backends, words, n_strands, rng):
+    pairs, signed_pairs = pairs_for(n_strands)
+    for word in words:
+        key = array('b', word).tobytes()
+        expected_flags = reference_flags(word)
+        expected_successors = list(move_kernels.python_successor_keys(key, pairs, len(word) + 3))
+        expected_predecessors = list(reference_predecessors(key, signed_pairs, len(word) + 3, len(word) + 4))
+        for name, codes in backends.items():
+            move_kernels.move_codes = codes
+            assert move_kernels.move_flags(array('b', word)) == expected_flags, (name, word)
+            commute, r3, _ = move_kernels.enumerate_moves(array('b', word))
+            assert [('r3', i) for i in r3] + [('commute', i) for i in commute] == reference_generator_moves(word), (name, word)
+            assert list(move_kernels._coded_successor_keys(key, pairs, len(word) + 3)) == expected_successors, (name, word)
+            assert list(move_kernels.predecessor_keys(key, signed_pairs, len(word) + 3, len(word) + 4)) == \
+                expected_predecessors, (name, word)
+
+        for i in range(len(word) + 1):
+            patched = array('b', word)
+            flags = move_kernels.move_flags(patched)
+            for move_type, check in move_kernels.CHECKS.items():
+                assert check(word, i) == (move_type == INSERT or (i < len(word) and expected_flags[move_type][i] == 1))
+            move_type = rng.choice([m for m in range(4) if move_kernels.is_valid(word, m, i)])
+            generator = rng.randint(1, n_strands - 1)
+            assert move_kernels.apply_move(patched, move_type, i, generator)
+            assert patched.tolist() == reference_apply(word, move_type, i, generator)
+            assert not move_kernels.apply_move(array('b', word), COMMUTE, len(word))
+
+def per_call(fn, args_list, repeats):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for args in args_list:
+            fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best / len(args_list) * 1e6
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Checks the move kernels against the loops they replaced, then times "
+                                                 "them per call for the pure-Python and (if installed) numba backends.")
+    parser.add_argument("--n_strands", type=int, default=7)
+    parser.add_argument("--lengths", nargs="+", type=int, default=[8, 24, 60, 100])
+    parser.add_argument("--words", type=int, default=500, help="random words per length")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    backends = {"python": move_kernels.python_move_codes}
+    try:
+        start = time.perf_counter()
+        backends["numba"] = move_kernels.load_numba()
+        print(f"numba backend compiled/loaded in {(time.perf_counter() - start) * 1000:.0f} ms")
+    except ImportError:
+        print("numba not installed: timing the pure-Python backend only")
+
+    rng = random.Random(args.seed)
+    words = {length: [random_word(rng, args.n_strands, length) for _ in range(args.words)] for length in args.lengths}
+    for length in args.lengths:
+        check_equivalence(backends, words[length], args.n_strands, rng)
+    print(f"Equivalence: {len(args.lengths) * args.words} words, flags / generator moves / successors / "
+          f"predecessors / apply_move match the reference for {', '.join(backends)}\n")
+
+    pairs, _ = pairs_for(args.n_strands)
+    header = f"{'len':>4} {'operation':<18} {'reference':>10}" + "".join(f" {name:>10}" for name in backends) + \
+             "".join(f" {'x ' + name:>9}" for name in backends)
+    print(header + "   (us per call)")
+    for length in args.lengths:
+        arrays = [(array('b', word),) for word in words[length]]
+        keys = [(array('b', word).tobytes(), pairs, length + 3) for word in words[length]]
+        operations = [
+            ("flags", lambda word: reference_flags(word), lambda word: move_kernels.move_flags(word), arrays),
+            ("generator moves", reference_generator_moves, lambda word: move_kernels.enumerate_moves(word), arrays),
+            ("successors", lambda *a: list(move_kernels.python_successor_keys(*a)),
+             lambda *a: list(move_kernels._coded_successor_keys(*a)), keys),
+        ]
+        for name, reference, kernel, inputs in operations:
+            base = per_call(reference, inputs, args.repeats)
+            timings = []
+            for codes in backends.values():
+                move_kernels.move_codes = codes
+                timings.append(per_call(kernel, inputs, args.repeats))
+            print(f"{length:>4} {name:<18} {base:>10.2f}" + "".join(f" {t:>10.2f}" for t in timings) +
+                  "".join(f" {base / t:>8.2f}x" for t in timings))
+    move_kernels.move_codes = backends["python"]
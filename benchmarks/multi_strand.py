@@ -0,0 +1,66 @@
+import argparse
+import os
+import sys
+import time
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from src.braid_agent import BraidAgent
+from src.config import Configuration
+
+def train_sequential(config, hyperparameters, train_paths, n_envs, total_steps, max_episode_steps):
+    # The notebook's approach: one env per file, rebuilt for each training pass.
+    agent = BraidAgent(config, hyperparameters, name="sequential")
+    start = time.perf_counter()
+    for path in train_paths:
+        env = agent.make_mixed_env([path], n_envs=n_envs, max_episode_steps=max_episode_steps)
+        agent.train(env, total_steps // len(train_paths))
+        env.close()
+    return agent, time.perf_counter() - start
+
+def train_mixed(config, hyperparameters, train_paths, n_envs, total_steps, max_episode_steps):
+    agent = BraidAgent(config, hyperparameters, name="mixed")
+    start = time.perf_counter()
+    env = agent.make_mixed_env(train_paths, n_envs=n_envs, max_episode_steps=max_episode_steps)
+    agent.train(env, total_steps)
+    env.close()
+    return agent, time.perf_counter() - start
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sequential per-strand-count training vs. one vectorized env mixing "
+                                                 "strand counts: training throughput and test solve rate.")
+    parser.add_argument("--strands", nargs="+", type=int, default=[3, 5, 7])
+    parser.add_argument("--crossings", type=int, default=8)
+    parser.add_argument("--moves", type=int, default=10)
+    parser.add_argument("--steps", type=int, default=30_000, help="total training steps per approach")
+    parser.add_argument("--n-envs", type=int, default=8)
+    parser.add_argument("--max-episode-steps", type=int, default=100)
+    parser.add_argument("--episodes", type=int, default=100, help="test episodes per file")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    def paths(split, prefix):
+        return [os.path.join(project_root, "data", split, f"{prefix}_n{n}_c{args.crossings}_m{args.moves}.txt")
+                for n in args.strands]
+
+    train_paths, test_paths = paths("train", "train"), paths("test", "test")
+    hyperparameters = {"n_steps": 256, "batch_size": 256, "seed": args.seed, "device": "cpu", "verbose": 0}
+    runs = [
+        ("sequential raw", train_sequential, "raw"),
+        ("mixed raw", train_mixed, "raw"),
+        ("mixed channels", train_mixed, "channels"),
+    ]
+
+    print(f"{'approach':<16} {'steps/s':>8} " + " ".join(f"{'n' + str(n) + ' solved':>10}" for n in args.strands)
+          + f" {'mean':>6}")
+    for name, run, encoding in runs:
+        config = Configuration(n_strands=max(args.strands), max_len=100, obs_encoding=encoding)
+        agent, elapsed = run(config, hyperparameters, train_paths, args.n_envs, args.steps, args.max_episode_steps)
+        # learn() rounds each call up to whole rollouts, so count the steps actually taken.
+        steps = agent.model.num_timesteps
+        results = agent.evaluate(test_paths, episodes=args.episodes, seed=args.seed, verbose=False)
+        scores = [r["Score"] for r in results]
+        print(f"{name:<16} {steps / elapsed:>8.0f} " + " ".join(f"{s:>9.0f}%" for s in scores)
+              + f" {sum(scores) / len(scores):>5.0f}%", flush=True)
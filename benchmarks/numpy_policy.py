@@ -0,0 +1,102 @@
+import argparse
+import glob
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+import numpy as np
+
+from src.braid_agent import BraidAgent
+from src.braid_dataset import BraidDataset
+from src.braid_env import BraidEnv
+from src.braid_kernels import batch_action_masks
+from src.config import Configuration
+from src.numpy_policy import NumpyPolicy
+
+STARTUP = {
+    "MaskablePPO": "from src.braid_agent import BraidAgent; from src.config import Configuration; "
+                   "BraidAgent(Configuration(), {{}}, model_path={path!r})",
+    "NumpyPolicy": "from src.numpy_policy import NumpyPolicy; NumpyPolicy.load({path!r})"
+}
+
+def startup_sec(code, repeats):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], cwd=project_root, check=True, capture_output=True)
+        times.append(time.perf_counter() - start)
+    return float(np.median(times))
+
+def solve_latency_ms(agent, path, episodes):
+    env = BraidEnv(path, agent.config.N_STRANDS, agent.config.MAX_LEN, agent.config)
+    env.reset(seed=0)
+    start = time.perf_counter()
+    for _ in range(episodes):
+        agent.solve(env, max_steps=200)
+    return (time.perf_counter() - start) / episodes * 1000
+
+def test_states(config, n_strands):
+    # Initial states of every shipped test file, padded like BraidEnv observations.
+    words, lengths = [], []
+    for path in sorted(glob.glob(os.path.join(project_root, "data", "test", f"test_n{n_strands}_*.txt"))):
+        dataset = BraidDataset.load(path)
+        words.append(dataset.padded_words(config.MAX_LEN + 2))
+        lengths.append(np.minimum(dataset.lengths(), config.MAX_LEN))
+    words, lengths = np.concatenate(words), np.concatenate(lengths)
+    words[:, config.MAX_LEN:] = 0
+    return words, lengths
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="MaskablePPO vs. exported NumpyPolicy: startup, latency, agreement.")
+    parser.add_argument("--model", default=None, help="MaskablePPO .zip; a briefly trained model is used otherwise")
+    parser.add_argument("--n-strands", type=int, default=7)
+    parser.add_argument("--episodes", type=int, default=50)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    config = Configuration(n_strands=args.n_strands, max_len=100)
+    tmp_dir = tempfile.mkdtemp()
+    model_path = args.model
+    if model_path is None:
+        trainer = BraidAgent(config, {"verbose": 0, "n_steps": 256})
+        trainer.train(trainer.make_env(os.path.join(project_root, "data", "train", f"train_n{args.n_strands}_c8_m10.txt")), 4096)
+        model_path = os.path.join(tmp_dir, "model.zip")
+        trainer.model.save(model_path)
+
+    torch_agent = BraidAgent(config, {}, model_path=model_path)
+    npz_path = torch_agent.export(os.path.join(tmp_dir, "policy.npz"))
+    numpy_agent = BraidAgent(config, {}, model_path=npz_path)
+
+    print("Startup (fresh interpreter, import + load):")
+    for name, path in (("MaskablePPO", model_path), ("NumpyPolicy", npz_path)):
+        print(f"  {name:<12} {startup_sec(STARTUP[name].format(path=path), args.repeats):.2f}s")
+
+    test_file = os.path.join(project_root, "data", "test", f"test_n{args.n_strands}_c16_m50.txt")
+    print("Per-solve latency (BraidAgent.solve, max 200 steps):")
+    for name, agent in (("MaskablePPO", torch_agent), ("NumpyPolicy", numpy_agent)):
+        print(f"  {name:<12} {solve_latency_ms(agent, test_file, args.episodes):.1f} ms")
+
+    words, lengths = test_states(config, args.n_strands)
+    masks = batch_action_masks(words, lengths, config.MAX_LEN)
+    obs = words[:, :config.MAX_LEN]
+    torch_actions, _ = torch_agent.model.predict(obs, action_masks=masks, deterministic=True)
+    numpy_actions, _ = numpy_agent.model.predict(obs, action_masks=masks, deterministic=True)
+    agreement = np.mean(torch_actions == numpy_actions)
+
+    import torch
+    with torch.no_grad():
+        obs_tensor, _ = torch_agent.model.policy.obs_to_tensor(obs)
+        reference = torch_agent.model.policy.get_distribution(obs_tensor).distribution.logits.numpy()
+    reference -= reference.max(axis=1, keepdims=True)
+    logits = numpy_agent.model.logits(obs)
+    logits -= logits.max(axis=1, keepdims=True)
+    print(f"Action agreement on {len(obs)} test states: {agreement * 100:.3f}% "
+          f"(max |logit diff| {np.abs(reference - logits).max():.2e})")
+    if agreement < 0.999:
+        sys.exit(1)
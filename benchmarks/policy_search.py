@@ -0,0 +1,67 @@
+import argparse
+import os
+import sys
+import time
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+import numpy as np
+
+from src.braid import Braid
+from src.braid_agent import BraidAgent
+from src.braid_dataset import BraidDataset
+from src.config import Configuration
+from src.evaluation import BatchedEvaluator
+from src.policy_search import PolicySearchSolver
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Solve rate of policy-guided beam search vs. budget.")
+    parser.add_argument("--model", default=None, help="MaskablePPO .zip; a briefly trained model is used otherwise")
+    parser.add_argument("--files", nargs="+", default=["test_n7_c24_m10.txt", "test_n7_c24_m50.txt", "test_n7_c24_m100.txt"])
+    parser.add_argument("--n-strands", type=int, default=7)
+    parser.add_argument("--episodes", type=int, default=30)
+    parser.add_argument("--node-budgets", type=int, nargs="+", default=[250, 1000, 4000])
+    parser.add_argument("--time-budgets", type=float, nargs="*", default=[])
+    parser.add_argument("--beam-width", type=int, default=16)
+    parser.add_argument("--value-weight", type=float, default=0.0)
+    args = parser.parse_args()
+
+    config = Configuration(n_strands=args.n_strands, max_len=100)
+    agent = BraidAgent(config, {"verbose": 0, "n_steps": 256}, model_path=args.model)
+    paths = [os.path.join(project_root, "data", "test", name) for name in args.files]
+    if agent.model is None:
+        agent.train(agent.make_env(paths[0]), 4096)
+
+    budgets = [("nodes", b) for b in args.node_budgets] + [("seconds", b) for b in args.time_budgets]
+    print(f"{'file':<24} {'budget':>14} {'solved':>7} {'avg len':>8} {'avg nodes':>10} {'avg sec':>8}")
+    for path in paths:
+        dataset = BraidDataset.load(path)
+        rng = np.random.default_rng(0)
+        rows = rng.choice(len(dataset), size=min(args.episodes, len(dataset)), replace=False)
+        name = os.path.basename(path)
+
+        subset = BraidDataset.from_braids([dataset[int(i)] for i in rows], dataset.n_strands)
+        greedy = BatchedEvaluator(agent.model, config, max_steps=200, seed=0).run(subset)
+        print(f"{name:<24} {'greedy':>14} {greedy['Score']:>6.0f}% {'-':>8} {'-':>10} {'-':>8}")
+
+        for kind, budget in budgets:
+            solver = PolicySearchSolver(agent.model, config.N_STRANDS, config.MAX_LEN,
+                                        beam_width=args.beam_width, value_weight=args.value_weight)
+            solved, lengths, nodes, seconds = 0, [], [], []
+            for i in rows:
+                braid = Braid(dataset.word(int(i)).tolist(), config.N_STRANDS)
+                start = time.perf_counter()
+                moves = solver.solve(braid, **({"max_nodes": budget} if kind == "nodes" else {"max_time_sec": budget}))
+                seconds.append(time.perf_counter() - start)
+                nodes.append(solver.stats["nodes_expanded"])
+                if moves is not None:
+                    # Replaying the moves must reach the empty word.
+                    assert braid.apply_moves(moves) == len(moves) and len(braid) == 0
+                    solved += 1
+                    lengths.append(len(moves))
+
+            rate = solved / len(rows) * 100
+            avg_len = f"{np.mean(lengths):.1f}" if lengths else "-"
+            print(f"{name:<24} {f'{budget} {kind}':>14} {rate:>6.0f}% {avg_len:>8} {np.mean(nodes):>10.0f} {np.mean(seconds):>8.2f}", flush=True)
@@ -0,0 +1,74 @@
+import argparse
+import os
+import sys
+import time
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+import numpy as np
+
+from src.braid_env import BraidEnv
+from src.config import Configuration
+
+def run_episodes(env, n_steps, seed):
+    # Random valid actions with the env's step cap, so episodes (and resets) keep coming.
+    rng = np.random.default_rng(seed)
+    reset_times = []
+    start = time.perf_counter()
+    reset_start = time.perf_counter()
+    env.reset(seed=seed)
+    reset_times.append(time.perf_counter() - reset_start)
+    for _ in range(n_steps):
+        _, _, terminated, truncated, _ = env.step(rng.choice(np.flatnonzero(env.action_masks())))
+        if terminated or truncated:
+            reset_start = time.perf_counter()
+            env.reset()
+            reset_times.append(time.perf_counter() - reset_start)
+    return time.perf_counter() - start, np.array(reset_times)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="File-backed vs. procedural (thread or process prefetched) BraidEnv: reset latency, "
+                                                 "step throughput and how often the prefetch buffer runs dry.")
+    parser.add_argument("--n_strands", type=int, default=7)
+    parser.add_argument("--crossings", type=int, default=24)
+    parser.add_argument("--difficulty", type=int, default=100)
+    parser.add_argument("--steps", type=int, default=20_000)
+    parser.add_argument("--episode-steps", nargs="*", type=int, default=[200, 20, 5],
+                        help="step caps to try; shorter episodes mean more resets per second")
+    args = parser.parse_args()
+
+    config = Configuration(n_strands=args.n_strands, max_len=100)
+    path = os.path.join(project_root, "data", "train", f"train_n{args.n_strands}_c{args.crossings}_m{args.difficulty}.txt")
+    setting = f"n{args.n_strands} c{args.crossings} m{args.difficulty}"
+
+    start = time.perf_counter()
+    env = BraidEnv(path, args.n_strands, 100, config)
+    print(f"File env ({setting}): built in {(time.perf_counter() - start) * 1000:.0f} ms")
+    start = time.perf_counter()
+    procedural = BraidEnv(None, args.n_strands, 100, config)
+    procedural.set_procedural(args.crossings, args.difficulty)
+    print(f"Procedural env ({setting}): built in {(time.perf_counter() - start) * 1000:.0f} ms (first batch)")
+    start = time.perf_counter()
+    process = BraidEnv(None, args.n_strands, 100, config)
+    process.set_procedural(args.crossings, args.difficulty, processes=True)
+    print(f"Procedural env, producer process ({setting}): built in {(time.perf_counter() - start) * 1000:.0f} ms\n")
+
+    print(f"{'env':<12} {'cap':>5} {'steps/s':>9} {'resets/s':>9} {'reset p50':>10} {'reset p99':>10} "
+          f"{'reset max':>10} {'recycled':>9}")
+    for cap in args.episode_steps:
+        for name, instance in (("file", env), ("procedural", procedural), ("process", process)):
+            instance.max_episode_steps = cap
+            before = instance.source_stats()
+            elapsed, resets = run_episodes(instance, args.steps, 0)
+            after = instance.source_stats()
+            recycled = "-"
+            if after:
+                served = after["fresh"] + after["recycled"] - before["fresh"] - before["recycled"]
+                recycled = f"{(after['recycled'] - before['recycled']) / served:.1%}"
+            print(f"{name:<12} {cap:>5} {args.steps / elapsed:>9.0f} {len(resets) / elapsed:>9.0f} "
+                  f"{np.percentile(resets, 50) * 1e6:>8.1f}us {np.percentile(resets, 99) * 1e6:>8.1f}us "
+                  f"{resets.max() * 1e6:>8.1f}us {recycled:>9}")
+    procedural.close()
+    process.close()
@@ -0,0 +1,73 @@
+import argparse
+import glob
+import os
+import sys
+import time
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from src.braid_generator import BraidGenerator
+from src.optimal_solver import AStarSolver
+
+def run(solver, dataset, max_time_sec):
+    expanded = 0
+    lengths = []
+    start = time.perf_counter()
+    for braid in dataset:
+        path = solver.solve(braid, max_time_sec=max_time_sec)
+        expanded += solver.stats["nodes_expanded"]
+        lengths.append(len(path) if path is not None else None)
+    return expanded, time.perf_counter() - start, lengths
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="A* node expansions per second with the plain successor loop, the "
+                                                 "cross-solve expansion cache and the hashed transposition table.")
+    parser.add_argument("--files", nargs="*", default=["data/test/test_n7_*.txt"])
+    parser.add_argument("--per-file", type=int, default=10)
+    parser.add_argument("--max-time", type=float, default=5.0)
+    parser.add_argument("--max-len", type=int, default=100)
+    parser.add_argument("--cache-size", type=int, default=100_000)
+    args = parser.parse_args()
+
+    files = sorted(f for pattern in args.files for f in glob.glob(os.path.join(project_root, pattern)))
+    configs = [
+        ("plain", {"transpositions": False}),
+        ("expansion cache", {"transpositions": False, "expansion_cache_size": args.cache_size}),
+        ("transpositions", {"transpositions": True}),
+    ]
+
+    print(f"{'file':<24} {'solver':<16} {'solved':>7} {'expanded':>10} {'time':>8} {'exp/s':>8} {'speedup':>8} "
+          f"{'cache hits':>10} {'len diff':>8}")
+    totals = {name: [0, 0.0] for name, _ in configs}
+    # Load (or compile) the numba kernels before anything is timed.
+    warmup = BraidGenerator.load_dataset(files[0])[0]
+    AStarSolver(warmup.n_strands, args.max_len, transpositions=True).solve(warmup, max_time_sec=0.1)
+    for path in files:
+        dataset = BraidGenerator.load_dataset(path)[:args.per_file]
+        if not dataset:
+            continue
+        n_strands = dataset[0].n_strands
+        baseline = None
+        for name, kwargs in configs:
+            # One solver per file and config, as in a dataset run: the expansion cache carries over between braids.
+            solver = AStarSolver(n_strands, args.max_len, **kwargs)
+            expanded, elapsed, lengths = run(solver, dataset, args.max_time)
+            rate = expanded / elapsed
+            totals[name][0] += expanded
+            totals[name][1] += elapsed
+            if baseline is None:
+                baseline = (rate, lengths)
+            # Only compare braids both solvers finished: a faster solver finishes more within the time limit.
+            diffs = sum(a is not None and b is not None and a != b for a, b in zip(lengths, baseline[1]))
+            hits = f"{solver.expansion_cache.summary()['hit_rate']:.1%}" if solver.expansion_cache is not None else "-"
+            solved = sum(length is not None for length in lengths)
+            print(f"{os.path.basename(path):<24} {name:<16} {solved:>3}/{len(dataset):<3} {expanded:>10} {elapsed:>7.2f}s "
+                  f"{rate:>8.0f} {rate / baseline[0]:>7.2f}x {hits:>10} {diffs:>8}", flush=True)
+
+    print()
+    base_rate = totals["plain"][0] / max(totals["plain"][1], 1e-9)
+    for name, (expanded, elapsed) in totals.items():
+        rate = expanded / max(elapsed, 1e-9)
+        print(f"{'all files':<24} {name:<16} {'':>7} {expanded:>10} {elapsed:>7.2f}s {rate:>8.0f} {rate / base_rate:>7.2f}x")
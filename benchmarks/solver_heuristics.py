@@ -0,0 +1,60 @@
+import argparse
+import glob
+import os
+import sys
+import time
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from src.braid_generator import BraidGenerator
+from src.heuristics import HEURISTICS
+from src.optimal_solver import AStarSolver
+
+CONFIGS = [
+    ("length", "astar"),
+    ("exponent_imbalance", "astar"),
+    ("blocked", "astar"),
+    ("combined", "astar"),
+    ("combined", "ida"),
+    ("length", "bidirectional")
+]
+
+def run(files, per_file, max_time_sec, max_len):
+    print(f"{'file':<28} {'heuristic':<20} {'mode':<14} {'solved':>7} {'expanded':>10} {'time':>8} {'label_diff':>10}")
+
+    for path in files:
+        dataset = BraidGenerator.load_dataset(path)[:per_file]
+        if not dataset:
+            continue
+        n_strands = dataset[0].n_strands
+
+        for heuristic_name, mode in CONFIGS:
+            solver = AStarSolver(n_strands, max_len, heuristic=HEURISTICS[heuristic_name](), mode=mode)
+            solved = expanded = label_diff = 0
+            start = time.perf_counter()
+
+            for braid in dataset:
+                path_found = solver.solve(braid, max_time_sec=max_time_sec)
+                expanded += solver.stats["nodes_expanded"]
+                if path_found is None:
+                    continue
+                solved += 1
+                if braid.optimal_steps >= 0 and len(path_found) != braid.optimal_steps:
+                    label_diff += 1
+
+            elapsed = time.perf_counter() - start
+            print(f"{os.path.basename(path):<28} {heuristic_name:<20} {mode:<14} "
+                  f"{solved:>3}/{len(dataset):<3} {expanded:>10} {elapsed:>7.2f}s {label_diff:>10}", flush=True)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare solver heuristics and search modes on labelled datasets.")
+    parser.add_argument("--files", nargs="*", default=["data/test/test_n*_c8_*.txt", "data/finetune/ft_n*_c16_m50.txt"])
+    parser.add_argument("--per-file", type=int, default=20)
+    parser.add_argument("--max-time", type=float, default=5.0)
+    parser.add_argument("--max-len", type=int, default=20)
+    args = parser.parse_args()
+
+    files = sorted(f for pattern in args.files for f in glob.glob(os.path.join(project_root, pattern)))
+    run(files, args.per_file, args.max_time, args.max_len)
@@ -0,0 +1,259 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+import numpy as np
+
+from src.braid_dataset import BraidDataset
+from src.braid_generator import BraidGenerator
+from src.config import Configuration
+from src.optimal_solver import AStarSolver
+
+# Each case is a setup function returning a zero-argument callable; only the callable
+# is timed. It returns (operations, counters): operations give the rate, counters are
+# machine-independent numbers (e.g. solver expansions) that should not move between runs.
+CASES = {}
+
+SOLVER_BUCKETS = [(3, 8, 10), (3, 8, 50), (3, 8, 100), (5, 8, 10), (5, 8, 50), (5, 8, 100),
+                  (7, 8, 10), (7, 8, 50), (7, 8, 100), (3, 16, 10), (5, 16, 10)]
+
+def case(name, unit):
+    def register(setup):
+        CASES[name] = (setup, unit)
+        return setup
+    return register
+
+def data_path(*parts):
+    return os.path.join(project_root, "data", *parts)
+
+@case("braid.apply_move", "moves/s")
+def bench_braid_moves(quick):
+    rng = np.random.default_rng(0)
+    n_moves = 20_000 if quick else 100_000
+    moves = list(zip(rng.integers(0, 4, n_moves).tolist(), rng.integers(0, 20, n_moves).tolist(),
+                     rng.integers(1, 5, n_moves).tolist()))
+    start = BraidGenerator(5, Configuration(), seed=0).generate_braid(16, 50)
+
+    def run():
+        braid = start.copy()
+        applied = 0
+        for move_type, index, generator in moves:
+            # Keep the word bounded like the env does.
+            if move_type == 3 and len(braid) >= 40:
+                move_type = 2
+            applied += braid.apply_move(move_type, index % (len(braid) + 1), generator)
+        return len(moves), {"applied": applied}
+    return run
+
+def _env_steps(env, n_steps, seed):
+    rng = np.random.default_rng(seed)
+    env.reset(seed=seed)
+    for _ in range(n_steps):
+        mask = env.action_masks()
+        # A random legal action without np.flatnonzero + choice, which cost as much as the step.
+        _, _, terminated, truncated, _ = env.step((rng.random(mask.shape) * mask).argmax())
+        if terminated or truncated:
+            env.reset()
+    return n_steps, {}
+
+@case("env.step+action_masks", "steps/s")
+def bench_env(quick):
+    from src.braid_env import BraidEnv
+
+    config = Configuration(n_strands=7, max_len=100)
+    env = BraidEnv(data_path("train", "train_n7_c16_m50.txt"), 7, 100, config)
+    return lambda: _env_steps(env, 2_000 if quick else 10_000, 0)
+
+@case("vec_env.step+action_masks", "steps/s")
+def bench_vec_env(quick):
+    from src.braid_vec_env import BraidVecEnv
+
+    config = Configuration(n_strands=7, max_len=100)
+    env = BraidVecEnv(data_path("train", "train_n7_c16_m50.txt"), 7, 100, config, n_envs=16)
+    env.seed(0)
+    env.reset()
+    n_batches = 200 if quick else 1_000
+    rng = np.random.default_rng(0)
+
+    def run():
+        for _ in range(n_batches):
+            masks = env.action_masks()
+            env.step((rng.random(masks.shape) * masks).argmax(axis=1))
+        return n_batches * env.num_envs, {}
+    return run
+
+@case("dataset.load_text", "braids/s")
+def bench_load_text(quick):
+    path = data_path("train", "train_n7_c24_m100.txt")
+
+    def run():
+        dataset = BraidDataset.load_text(path)
+        return len(dataset), {"braids": len(dataset)}
+    return run
+
+@case("dataset.load_binary+braids", "braids/s")
+def bench_load_binary(quick):
+    binary = os.path.join(tempfile.mkdtemp(), "dataset.bin")
+    BraidDataset.load_text(data_path("train", "train_n7_c24_m100.txt")).save(binary)
+
+    def run():
+        braids = BraidDataset.load_binary(binary).braids()
+        return len(braids), {"braids": len(braids)}
+    return run
+
+@case("generator.generate_braid", "braids/s")
+def bench_generator(quick):
+    n_braids = 100 if quick else 500
+
+    def run():
+        gen = BraidGenerator(5, Configuration(), seed=0)
+        total_len = sum(len(gen.generate_braid(16, 50)) for _ in range(n_braids))
+        return n_braids, {"total_len": total_len}
+    return run
+
+def _solver_case(n_strands, crossings, moves):
+    @case(f"solver.n{n_strands}_c{crossings}_m{moves}", "solves/s")
+    def bench_solver(quick):
+        braids = BraidDataset.load(data_path("test", f"test_n{n_strands}_c{crossings}_m{moves}.txt")).braids()
+        braids = braids[:2 if quick else 5]
+        solver = AStarSolver(n_strands, 20)
+
+        def run():
+            expanded = solved = 0
+            for braid in braids:
+                solved += solver.solve(braid, max_time_sec=30.0) is not None
+                expanded += solver.stats["nodes_expanded"]
+            return len(braids), {"nodes_expanded": expanded, "solved": solved}
+        return run
+
+for bucket in SOLVER_BUCKETS:
+    _solver_case(*bucket)
+
+def _untrained_agent():
+    # A fixed-seed untrained policy: throughput does not depend on what it learned.
+    from sb3_contrib import MaskablePPO
+    from sb3_contrib.common.wrappers import ActionMasker
+    from src.braid_agent import BraidAgent, mask_fn
+
+    config = Configuration(n_strands=5, max_len=100)
+    agent = BraidAgent(config, {})
+    env = agent.make_env(data_path("test", "test_n5_c8_m10.txt"))
+    agent.model = MaskablePPO("MlpPolicy", ActionMasker(env, mask_fn), seed=0, device="cpu")
+    return agent, env
+
+@case("agent.solve", "episodes/s")
+def bench_agent_solve(quick):
+    agent, env = _untrained_agent()
+    episodes = 5 if quick else 20
+
+    def run():
+        env.reset(seed=0)
+        solved = sum(agent.solve(env, max_steps=200)[0] for _ in range(episodes))
+        return episodes, {"solved": solved}
+    return run
+
+@case("agent.evaluate", "episodes/s")
+def bench_agent_evaluate(quick):
+    agent, _ = _untrained_agent()
+    paths = [data_path("test", "test_n5_c8_m10.txt"), data_path("test", "test_n5_c16_m50.txt")]
+    episodes = 50 if quick else 200
+
+    def run():
+        results = agent.evaluate(paths, episodes=episodes, seed=0, verbose=False)
+        return sum(r["episodes"] for r in results), {}
+    return run
+
+def measure(setup, quick, repeats, min_time):
+    # Each repeat calls the workload until min_time has passed, so short cases are not
+    # dominated by timer noise; the best repeat gives the rate.
+    run = setup(quick)
+    rates = []
+    for _ in range(repeats):
+        ops = 0
+        start = time.perf_counter()
+        while True:
+            done, counters = run()
+            ops += done
+            elapsed = time.perf_counter() - start
+            if elapsed >= min_time:
+                break
+        rates.append(ops / elapsed)
+    return {"rate": max(rates), "median_rate": float(np.median(rates)), "repeats": repeats, "counters": counters}
+
+def metadata():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=project_root,
+                                capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = ""
+    return {"timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"), "commit": commit, "python": platform.python_version(),
+            "numpy": np.__version__, "machine": platform.machine(), "cpus": os.cpu_count()}
+
+def compare(results, baseline, threshold):
+    # A case regresses when its rate drops by more than `threshold`; counters that move
+    # mean the work itself changed (e.g. the solver expands more nodes), not just the speed.
+    flags = {}
+    for name, result in results.items():
+        reference = baseline.get("results", {}).get(name)
+        if reference is None:
+            continue
+        notes = []
+        change = result["rate"] / reference["rate"] - 1
+        if change < -threshold:
+            notes.append(f"REGRESSION {change * 100:+.0f}%")
+        for key, value in result["counters"].items():
+            if key in reference["counters"] and reference["counters"][key] != value:
+                notes.append(f"{key} {reference['counters'][key]} -> {value}")
+        flags[name] = (change, notes)
+    return flags
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Hot-path benchmarks with JSON results and baseline comparison.")
+    parser.add_argument("--only", nargs="*", default=None, help="run cases whose name contains any of these")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--min-time", type=float, default=0.5, help="seconds each repeat runs for at least")
+    parser.add_argument("--quick", action="store_true", help="smaller workloads for a fast smoke run")
+    parser.add_argument("--output", default=None, help="JSON results path (default: benchmarks/results/<time>_<commit>.json)")
+    parser.add_argument("--baseline", default=None, help="earlier results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.15, help="relative slowdown flagged as a regression")
+    args = parser.parse_args()
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    meta = metadata()
+    results = {}
+    print(f"{'case':<28} {'rate':>12} {'unit':<11} {'vs base':>8}  notes")
+    for name, (setup, unit) in CASES.items():
+        if args.only and not any(pattern in name for pattern in args.only):
+            continue
+        results[name] = dict(measure(setup, args.quick, args.repeats, args.min_time), unit=unit)
+
+        change, notes = compare({name: results[name]}, baseline, args.threshold).get(name, (None, [])) if baseline else (None, [])
+        change_str = f"{change * 100:+.0f}%" if change is not None else "-"
+        print(f"{name:<28} {results[name]['rate']:>12.1f} {unit:<11} {change_str:>8}  {'; '.join(notes)}", flush=True)
+
+    output = args.output or os.path.join(project_root, "benchmarks", "results",
+                                         f"{meta['timestamp'].replace(':', '')}_{meta['commit'] or 'nogit'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump({"meta": dict(meta, quick=args.quick), "results": results}, f, indent=2)
+    print(f"Results saved to {output}")
+
+    if baseline:
+        regressions = [name for name, (_, notes) in compare(results, baseline, args.threshold).items()
+                       if any(note.startswith("REGRESSION") for note in notes)]
+        if regressions:
+            print(f"{len(regressions)} regression(s): {', '.join(regressions)}")
+            sys.exit(1)
@@ -0,0 +1,28 @@
+import argparse
+import glob
+import os
+import sys
+import time
+
+project_root = os.path.dirname(os.path.abspath(__file__))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from src.braid_dataset import convert_dataset
+
+def convert_all(data_dir: str):
+    paths = sorted(glob.glob(os.path.join(data_dir, "**", "*.txt"), recursive=True))
+    print(f"Converting {len(paths)} datasets under {data_dir}...")
+
+    start_time = time.time()
+    for path in paths:
+        binary = convert_dataset(path)
+        print(f"[DONE] {os.path.relpath(binary, data_dir)}")
+
+    print(f"\n--- COMPLETE in {time.time() - start_time:.2f} seconds ---")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert .txt braid datasets to the memory-mapped binary format.")
+    parser.add_argument("data_dir", nargs="?", default="./data/")
+    args = parser.parse_args()
+    convert_all(args.data_dir)
@@ -0,0 +1,63 @@
+import argparse
+import glob
+import os
+import sys
+import time
+
+project_root = os.path.dirname(os.path.abspath(__file__))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from src.braid_index import FileIndex, dedup_masks, leakage_report, write_filtered
+
+def dataset_paths(data_dir: str, splits):
+    return [path for split in splits for path in sorted(glob.glob(os.path.join(data_dir, split, "*.txt")))]
+
+def print_report(report: dict, data_dir: str):
+    print(f"{'file':<34} {'words':>7} {'dup':>6} {'canon dup':>9} {'x-file/leak':>11} {'canon':>6}")
+    for path, entry in report.items():
+        if path in ("train", "test"):
+            continue
+        other = "cross_file" if entry["split"] == "train" else "leaks"
+        print(f"{os.path.relpath(path, data_dir):<34} {entry['words']:>7} {entry['exact_duplicates']:>6} "
+              f"{entry['canonical_duplicates']:>9} {entry[f'exact_{other}']:>11} {entry[f'canonical_{other}']:>6}")
+
+    train, test = report["train"], report["test"]
+    if train["words"]:
+        print(f"\nTrain: {train['words']} words, {train['exact_distinct']} distinct "
+              f"({1 - train['exact_distinct'] / train['words']:.2%} duplicate), {train['canonical_distinct']} "
+              f"distinct up to commutation ({1 - train['canonical_distinct'] / train['words']:.2%} duplicate)")
+    if test["words"]:
+        print(f"Test: {test['words']} words, {test['exact_leaks']} in train ({test['exact_leak_rate']:.2%}), "
+              f"{test['canonical_leaks']} up to commutation ({test['canonical_leak_rate']:.2%})")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Report duplicate and train/test leak rates of braid datasets "
+                                                 "and optionally write deduplicated copies.")
+    parser.add_argument("data_dir", nargs="?", default="./data/")
+    parser.add_argument("--train", nargs="+", default=["train", "finetune"], help="training split directories")
+    parser.add_argument("--test", nargs="+", default=["test"], help="held-out split directories")
+    parser.add_argument("--key", choices=["canonical", "exact"], default="canonical",
+                        help="what counts as a duplicate when writing")
+    parser.add_argument("--emit", default=None, help="directory for deduplicated copies (same split layout)")
+    parser.add_argument("--drop-leaks", action="store_true", help="also drop train words that appear in a test split")
+    parser.add_argument("--cache-dir", default=None, help="reuse per-file hashes stored here")
+    parser.add_argument("--chunk-size", type=int, default=65536)
+    args = parser.parse_args()
+
+    start_time = time.time()
+    train = [FileIndex.build(p, args.chunk_size, args.cache_dir) for p in dataset_paths(args.data_dir, args.train)]
+    test = [FileIndex.build(p, args.chunk_size, args.cache_dir) for p in dataset_paths(args.data_dir, args.test)]
+    n_words = sum(len(i) for i in train + test)
+    elapsed = time.time() - start_time
+    print(f"Indexed {n_words} words in {len(train) + len(test)} files in {elapsed:.2f}s "
+          f"({n_words / max(elapsed, 1e-9):.0f} words/s)\n")
+    print_report(leakage_report(train, test), args.data_dir)
+
+    if args.emit:
+        masks = dedup_masks(train, test, args.key, args.drop_leaks)
+        kept = 0
+        for index in train + test:
+            output_path = os.path.join(args.emit, os.path.relpath(index.path, args.data_dir))
+            kept += write_filtered(index.path, output_path, masks[index.path], args.chunk_size)
+        print(f"\nWrote {kept} of {n_words} words to {args.emit}")
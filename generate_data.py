@@ -1,6 +1,5 @@
 import os
 import sys
-import concurrent.futures
 import time
 
 project_root = os.path.abspath(os.path.join(os.getcwd(), '..'))
@@ -8,28 +7,12 @@ if project_root not in sys.path:
     sys.path.append(project_root)
 
 from src.config import Configuration
-from src.braid_generator import BraidGenerator
+from src.generation_pipeline import DatasetJob, run_jobs
 
-def generate_task(args):
-    n_strands, crossings, difficulty, count, filepath, compute_optimal, seed = args
-    
-    try:
-        config = Configuration()
-        gen = BraidGenerator(n_strands=n_strands, config=config, seed=seed)
-        
-        if os.path.exists(filepath):
-            return f"[SKIP] {os.path.basename(filepath)} exists"
-
-        gen.generate_dataset(
-            count=count, 
-            crossings=crossings, 
-            difficulty=difficulty, 
-            filepath=filepath,
-            compute_optimal=compute_optimal
-        )
-        return f"[DONE] {os.path.basename(filepath)}"
-    except Exception as e:
-        return f"[FAIL] {os.path.basename(filepath)}: {str(e)}"
+# Shards are the unit of scheduling and of resumption: small enough that a slow
+# optimal-labelled file spreads over every core, large enough to amortize startup.
+TRAIN_SHARD_SIZE = 500
+LABELED_SHARD_SIZE = 10
 
 def generate_all_datasets_parallel():
     config = Configuration()
@@ -37,7 +20,7 @@ def generate_all_datasets_parallel():
     crossings_list = [8, 16, 24]
     moves_list = [10, 50, 100]
     
-    tasks = []
+    jobs = []
     
     print(f"--- Preparing Training Tasks ---")
     TRAIN_COUNT = 5000
@@ -50,7 +33,7 @@ def generate_all_datasets_parallel():
                 path = os.path.join(config.DATA_DIR, "train", f"{filename}.txt")
                 
                 seed = 42 + (i * 100) + (j * 10) + k
-                tasks.append((st, cr, mv, TRAIN_COUNT, path, False, seed))
+                jobs.append(DatasetJob(path, st, cr, mv, TRAIN_COUNT, False, seed, TRAIN_SHARD_SIZE, vectorized=True))
 
     print(f"--- Preparing Fine-Tuning Tasks ---")
     FINETUNE_COUNT = 50
@@ -62,7 +45,7 @@ def generate_all_datasets_parallel():
                 path = os.path.join(config.DATA_DIR, "finetune", f"{filename}.txt")
                 
                 seed = 9999 + (i * 100) + (j * 10) + k
-                tasks.append((st, cr, mv, FINETUNE_COUNT, path, True, seed))
+                jobs.append(DatasetJob(path, st, cr, mv, FINETUNE_COUNT, True, seed, LABELED_SHARD_SIZE))
 
     print(f"--- Preparing Test Tasks ---")
     TEST_COUNT = 100
@@ -75,25 +58,25 @@ def generate_all_datasets_parallel():
                 path = os.path.join(config.DATA_DIR, "test", f"{filename}.txt")
                 
                 seed = 1337 + (i * 100) + (j * 10) + k
-                tasks.append((st, cr, mv, TEST_COUNT, path, True, seed))
+                jobs.append(DatasetJob(path, st, cr, mv, TEST_COUNT, True, seed, LABELED_SHARD_SIZE))
 
     os.makedirs(os.path.join(config.DATA_DIR, "train"), exist_ok=True)
     os.makedirs(os.path.join(config.DATA_DIR, "finetune"), exist_ok=True)
     os.makedirs(os.path.join(config.DATA_DIR, "test"), exist_ok=True)
 
-    print(f"\nStarting Parallel Generation of {len(tasks)} datasets...")
+    print(f"\nStarting Parallel Generation of {len(jobs)} datasets...")
     print(f"Using all available CPU cores.")
     
     start_time = time.time()
-    
-    with concurrent.futures.ProcessPoolExecutor() as executor:
-        futures = [executor.submit(generate_task, task) for task in tasks]
-        
-        for future in concurrent.futures.as_completed(futures):
-            print(future.result())
+    cache_totals = run_jobs(jobs, cache_path=config.get_cache_path())
 
     duration = time.time() - start_time
     print(f"\n--- COMPLETE in {duration:.2f} seconds ---")
 
+    lookups = cache_totals["hits"] + cache_totals["misses"]
+    if lookups:
+        print(f"Solution cache: {cache_totals['hits']}/{lookups} hits ({cache_totals['hits'] / lookups:.1%}), "
+              f"{cache_totals['equivalent_hits']} misses had a commutation-equivalent word cached")
+
 if __name__ == "__main__":
-    generate_all_datasets_parallel()
\ No newline at end of file
+    generate_all_datasets_parallel()
@@ -0,0 +1,39 @@
+import argparse
+import glob
+import os
+import sys
+
+project_root = os.path.dirname(os.path.abspath(__file__))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from src.generation_pipeline import relabel_dataset
+from src.heuristics import HEURISTICS
+from src.optimal_solver import MODES
+from src.trajectory_store import trajectory_path_for
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Solve braids of existing datasets in a process pool and write "
+                                                 "their optimal_steps in place (resumable: braids already "
+                                                 "labelled are skipped unless --all).")
+    parser.add_argument("files", nargs="+", help="dataset files or glob patterns (.txt or .bin)")
+    parser.add_argument("--max-time", type=float, default=10.0, help="seconds per braid")
+    parser.add_argument("--max-nodes", type=int, default=None, help="node expansions per braid")
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: all cores, 0: no pool)")
+    parser.add_argument("--all", action="store_true", help="re-solve braids that already have a label")
+    parser.add_argument("--mode", choices=MODES, default="astar")
+    parser.add_argument("--heuristic", choices=sorted(HEURISTICS), default="length")
+    parser.add_argument("--transpositions", action="store_true", help="hashed A* duplicate detection (needs numba)")
+    parser.add_argument("--trajectories", action="store_true",
+                        help="also store the solutions next to each file (<name>.traj) for imitation pretraining")
+    args = parser.parse_args()
+
+    paths = sorted(p for pattern in args.files for p in (glob.glob(pattern) or [pattern]))
+    for path in paths:
+        totals = relabel_dataset(path, args.max_time, args.max_nodes, args.workers, relabel_all=args.all,
+                                 heuristic=HEURISTICS[args.heuristic](), mode=args.mode,
+                                 transpositions=args.transpositions or None,
+                                 trajectory_path=trajectory_path_for(path) if args.trajectories else None)
+        print(f"[DONE] {os.path.basename(path)}: {totals['solved']}/{totals['labelled']} solved, "
+              f"{totals['timed_out']} over budget ({totals['out_of_nodes']} on nodes), "
+              f"{totals['nodes_expanded']} nodes in {totals['elapsed']:.1f}s\n")
@@ -33,6 +33,14 @@ class AgentMetrics:
         else:
             self.failed += 1
 
+    def record_batch(self, move_counts, episodes: int, solved: int):
+        for action_type, count in enumerate(move_counts):
+            self.agent_actions[action_type] += int(count)
+            self.total_steps += int(count)
+        self.episodes += episodes
+        self.solved += solved
+        self.failed += episodes - solved
+
     def print_summary(self):
         print(f"\n--- Agent Performance Summary ---")
         print(f"Episodes: {self.episodes} | Solved: {self.solved} ({self.solved/self.episodes*100 if self.episodes else 0:.1f}%)")
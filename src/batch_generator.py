@@ -0,0 +1,61 @@
+from typing import Optional
+
+import numpy as np
+
+from .braid import Braid, COMMUTE, R3, INSERT
+from .braid_dataset import BraidDataset
+from .braid_kernels import batch_action_masks, batch_apply_moves
+
+def generate_batch(n_strands: int, count: int, crossings: int, difficulty: int, seed: Optional[int] = None,
+                   verify: bool = False) -> BraidDataset:
+    # Array version of BraidGenerator.generate_braid for `count` braids at once. Each row
+    # follows the same random walk: canceling pairs of a uniform generator inserted at a
+    # uniform position until the word has `crossings` letters, then up to `difficulty`
+    # moves, each drawn uniformly from the row's valid R3 and commutation positions (a
+    # row with none stops, as the scalar loop does after max_attempts). The result has
+    # the same distribution, not the same words: the streams come from one NumPy
+    # generator per batch, so a batch is reproducible from its seed.
+    rng = np.random.default_rng(seed)
+    length = crossings + crossings % 2
+    width = length + 2
+    rows = np.arange(count)
+
+    words = np.zeros((count, width), dtype=np.int32)
+    lengths = np.zeros(count, dtype=np.int64)
+    inserts = np.full(count, INSERT)
+    for current in range(0, length, 2):
+        generators = rng.integers(1, n_strands, size=count).astype(np.int32)
+        batch_apply_moves(words, lengths, inserts, rng.integers(0, current + 1, size=count), generators)
+
+    # batch_action_masks lays out [commute | r3 | remove | insert] per position; R3 and
+    # commutations never share a position, so their union is the scalar move list.
+    no_generators = np.zeros(count, dtype=np.int32)
+    active = rows
+    for _ in range(difficulty):
+        masks = batch_action_masks(words[active], lengths[active], length)
+        candidates = masks[:, :2 * length]
+        n_moves = candidates.sum(axis=1)
+        movable = n_moves > 0
+        active, candidates, n_moves = active[movable], candidates[movable], n_moves[movable]
+        if len(active) == 0:
+            break
+
+        # Uniform pick among each row's valid moves: the k-th set flag with k ~ U[0, n).
+        picks = (rng.random(len(active)) * n_moves).astype(np.int64)
+        choice = np.argmax(np.cumsum(candidates, axis=1) > picks[:, None], axis=1)
+        move_types = np.where(choice < length, COMMUTE, R3)
+
+        batch_words, batch_lengths = words[active], lengths[active]
+        batch_apply_moves(batch_words, batch_lengths, move_types, choice % length, no_generators[:len(active)])
+        words[active] = batch_words
+
+    offsets = np.arange(count + 1, dtype=np.int64) * length
+    letters = words[:, :length].astype(np.int8).reshape(-1)
+    dataset = BraidDataset(offsets, letters, np.full(count, -1, dtype=np.int32), n_strands,
+                           {"crossings": crossings, "difficulty": difficulty, "optimal": False})
+
+    if verify:
+        for i in range(count):
+            if not Braid.from_key(dataset.word(i).tobytes(), n_strands).is_identity():
+                raise RuntimeError(f"Generated braid {dataset.word(i).tolist()} is not the identity")
+    return dataset
@@ -1,84 +1,188 @@
-from typing import List
+from array import array
+from typing import Iterable, List, Sequence, Tuple
+
+from .move_kernels import (COMMUTE, R3, REMOVE, INSERT, apply_valid_move, can_commute, can_insert, can_r3,
+                           can_remove, is_valid, move_flags, refresh_flags)
+
+def canonical_key(word: Sequence[int]) -> bytes:
+    # Lexicographically smallest word reachable by far commutations (|i - j| >= 2),
+    # built by repeatedly taking the smallest letter that can be commuted to the front.
+    remaining = list(word)
+    result = array('b')
+    while remaining:
+        blocked = set()
+        best = None
+        for pos, gen in enumerate(remaining):
+            a = abs(gen)
+            if a not in blocked and (best is None or gen < remaining[best]):
+                best = pos
+            blocked.update((a - 1, a, a + 1))
+        result.append(remaining.pop(best))
+    return result.tobytes()
+
+def _find_handle(word: List[int]):
+    # Leftmost-ending handle s_i^e v s_i^-e where v avoids s_i and s_(i-1).
+    # Ending first means v contains no handle itself, so the reduction is permitted.
+    last = {}
+    for k, gen in enumerate(word):
+        a = abs(gen)
+        j = max(last.get(a, -1), last.get(a - 1, -1))
+        if j >= 0 and word[j] == -gen:
+            return j, k
+        last[a] = k
+    return None
+
+def reduce_handles(word: Sequence[int]) -> List[int]:
+    # Dehornoy handle reduction: terminates on any word and ends with the empty
+    # word exactly when the braid is trivial.
+    word = list(word)
+    while True:
+        handle = _find_handle(word)
+        if handle is None:
+            return word
+
+        j, k = handle
+        i = abs(word[j])
+        e = 1 if word[j] > 0 else -1
+        middle = []
+        for gen in word[j + 1:k]:
+            if abs(gen) == i + 1:
+                middle += (-e * (i + 1), i if gen > 0 else -i, e * (i + 1))
+            else:
+                middle.append(gen)
+        word[j:k + 1] = middle
+
+def is_identity(word: Sequence[int]) -> bool:
+    return not reduce_handles(word)
 
 class Braid:
-    def __init__(self, word: list[int], n_strands: int):
-        self.word = list(word)
+    # Words are stored as signed bytes (generators never exceed 127 strands).
+    # copy() shares the buffers until either side is mutated.
+    __slots__ = ("_word", "_moves", "_shared", "n_strands", "optimal_steps")
+
+    def __init__(self, word: Iterable[int], n_strands: int):
+        self.word = word
         self.n_strands = n_strands
-        self.optimal_steps = -1 
+        self.optimal_steps = -1
+
+    @classmethod
+    def from_key(cls, key: bytes, n_strands: int) -> "Braid":
+        braid = cls((), n_strands)
+        braid._word.frombytes(key)
+        return braid
+
+    @property
+    def word(self) -> List[int]:
+        # A private copy as a list, as before the array('b') buffer: the buffer may be shared
+        # with clones and backs the move flags, so changes go through the move methods or by
+        # assigning a new word.
+        return self._word.tolist()
+
+    @word.setter
+    def word(self, word: Iterable[int]):
+        self._word = array('b', word)
+        # Per-index validity flags (commute, r3, remove), built lazily and patched locally after each move.
+        self._moves = None
+        self._shared = False
 
     def __len__(self):
-        return len(self.word)
-    
+        return len(self._word)
+
+    def key(self) -> bytes:
+        return self._word.tobytes()
+
+    def canonical_key(self) -> bytes:
+        return canonical_key(self._word)
+
+    def is_identity(self) -> bool:
+        return is_identity(self._word)
+
     def copy(self):
-        new_b = Braid(list(self.word), self.n_strands)
-        if hasattr(self, 'optimal_steps'):
-            new_b.optimal_steps = self.optimal_steps
+        new_b = Braid.__new__(Braid)
+        new_b._word = self._word
+        new_b._moves = self._moves
+        new_b._shared = self._shared = True
+        new_b.n_strands = self.n_strands
+        new_b.optimal_steps = self.optimal_steps
         return new_b
 
+    def _detach(self):
+        if self._shared:
+            self._word = self._word[:]
+            if self._moves is not None:
+                self._moves = tuple(bytearray(flags) for flags in self._moves)
+            self._shared = False
+
     def get_padded_word(self, max_len: int) -> List[int]:
-        word = self.word[:max_len]
+        word = self._word[:max_len].tolist()
         padding = [0] * (max_len - len(word))
         return word + padding
-    
+
     def check_insert(self, index: int) -> bool:
-        return 0 <= index <= len(self.word)
-    
+        return can_insert(self._word, index)
+
     def check_remove_pair(self, index: int) -> bool:
-        if index < 0 or index >= len(self.word) - 1:
-            return False
-        return self.word[index] == -self.word[index + 1]
-    
+        return can_remove(self._word, index)
+
     def check_commutation(self, index: int) -> bool:
-        if index < 0 or index >= len(self.word) - 1:
-            return False
-        
-        gen_0, gen_1 = self.word[index], self.word[index + 1]
-        return abs(abs(gen_0) - abs(gen_1)) >= 2
-    
+        return can_commute(self._word, index)
+
     def check_braid_relation(self, index: int) -> bool:
-        if index < 0 or index >= len(self.word) - 2:
-            return False
-        
-        gen_0, gen_1, gen_2 = self.word[index], self.word[index + 1], self.word[index + 2]
-        return gen_0 == gen_2 and \
-                abs(abs(gen_0) - abs(gen_1)) == 1 and \
-                ((gen_0 > 0 and gen_1 > 0) or (gen_0 < 0 and gen_1 < 0))
+        return can_r3(self._word, index)
+
+    def valid_moves(self) -> Tuple[bytearray, bytearray, bytearray]:
+        if self._moves is None:
+            self._moves = move_flags(self._word)
+        return self._moves
+
+    def check_valid_moves(self) -> bool:
+        if self._moves is None:
+            return True
+        return move_flags(self._word) == self._moves
+
+    def _refresh_moves(self, start: int, stop: int):
+        # A flag at index i only depends on letters i..i+2, so a move touching
+        # letters [a, b) can only change flags in [a - 2, b).
+        if self._moves is not None:
+            refresh_flags(self._word, self._moves, start, stop)
 
     def insert_canceling_pair(self, index: int, generator: int) -> bool:
-        if not self.check_insert(index):
-            return False
-        
-        self.word.insert(index, generator)
-        self.word.insert(index + 1, -generator)
-        return True
+        return self.apply_move(INSERT, index, generator)
 
     def remove_pair_at_index(self, index: int) -> bool:
-        if not self.check_remove_pair(index):
-            return False
-        
-        del self.word[index]
-        del self.word[index]
-        return True
+        return self.apply_move(REMOVE, index)
 
     def apply_commutation(self, index: int) -> bool:
-        if not self.check_commutation(index):
-            return False
-        
-        gen_0 = self.word[index]
-        gen_1 = self.word[index + 1]
-        
-        self.word[index], self.word[index + 1] = gen_1, gen_0
-        return True
-    
+        return self.apply_move(COMMUTE, index)
+
     def apply_braid_relation(self, index: int) -> bool:
-        if not self.check_braid_relation(index):
+        return self.apply_move(R3, index)
+
+    def apply_move(self, move_type: int, index: int, generator: int = 0) -> bool:
+        if not is_valid(self._word, move_type, index):
             return False
-            
-        gen_0 = self.word[index]
-        gen_1 = self.word[index+1]
-        gen_2 = self.word[index+2]
-        
-        self.word[index] = gen_1
-        self.word[index+1] = gen_0
-        self.word[index+2] = gen_1
-        return True
\ No newline at end of file
+
+        self._detach()
+        apply_valid_move(self._word, move_type, index, generator)
+        moves = self._moves
+        if moves is None:
+            return True
+        if move_type == INSERT:
+            for flags in moves:
+                flags[index:index] = b"\x00\x00"
+            self._refresh_moves(index - 2, index + 2)
+        elif move_type == REMOVE:
+            for flags in moves:
+                del flags[index:index + 2]
+            self._refresh_moves(index - 2, index)
+        else:
+            self._refresh_moves(index - 2, index + 3 if move_type == R3 else index + 2)
+        return True
+
+    def apply_moves(self, moves: Sequence[Tuple[int, ...]]) -> int:
+        # Moves are (move_type, index) or (move_type, index, generator) for inserts.
+        # Stops at the first invalid move and returns how many were applied.
+        for applied, move in enumerate(moves):
+            if not self.apply_move(*move):
+                return applied
+        return len(moves)
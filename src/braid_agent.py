@@ -1,25 +1,154 @@
-import numpy as np
 import os
-from sb3_contrib import MaskablePPO
-from sb3_contrib.common.wrappers import ActionMasker
+from functools import partial
 from .agent_metrics import AgentMetrics
+from .braid_dataset import shared_dataset_path
+from .encoding import BraidEncoding
+from .evaluation import evaluate_files
+from .numpy_policy import NumpyPolicy, export_policy
+from .policy_search import PolicySearchSolver
+from .profiling import PhaseTimer, make_profiled_vec_env, make_profiling_callback
 
 def mask_fn(env):
     return env.action_masks()
 
 class BraidAgent:
-    def __init__(self, config, hyperparameters, model_path=None, name="untrained"):
+    def __init__(self, config, hyperparameters, model_path=None, name="untrained", profile=False):
         self.config = config
         self.hyperparameters = hyperparameters
         self.model = None
         self.name = name
         self.metrics = AgentMetrics(config)
+        # Opt-in per-phase timings, logged under timing/ in TensorBoard while training.
+        self.timer = PhaseTimer(enabled=profile)
 
         if model_path:
             self.load(model_path)
 
+    # torch / SB3 / gymnasium are imported inside the methods that need them, so
+    # inference with an exported NumpyPolicy never pays for the training stack.
+    def make_env(self, dataset_path, n_envs=1, finetune_mode=False, start_method=None, max_episode_steps=None):
+        from .braid_env import BraidEnv
+
+        with self.timer.phase("dataset_load"):
+            if n_envs == 1:
+                return BraidEnv(dataset_path, self.config.N_STRANDS, self.config.MAX_LEN, self.config,
+                                finetune_mode=finetune_mode, max_episode_steps=max_episode_steps)
+
+            # Workers memory-map the binary dataset, so every process shares the same pages.
+            from stable_baselines3.common.vec_env import SubprocVecEnv
+
+            if dataset_path is not None:
+                dataset_path = shared_dataset_path(dataset_path)
+            env_fn = partial(BraidEnv, dataset_path, self.config.N_STRANDS, self.config.MAX_LEN,
+                             self.config, finetune_mode=finetune_mode, max_episode_steps=max_episode_steps)
+            return SubprocVecEnv([env_fn] * n_envs, start_method=start_method)
+
+    def make_mixed_env(self, dataset_paths, n_envs=8, finetune_mode=False, max_episode_steps=None):
+        # One in-process vectorized env over several files (e.g. n=3, 5 and 7), so a single
+        # rollout buffer mixes them; use Configuration(obs_encoding="channels") to make the
+        # observations independent of the strand count.
+        from .braid_vec_env import BraidVecEnv
+
+        with self.timer.phase("dataset_load"):
+            return BraidVecEnv(list(dataset_paths), self.config.N_STRANDS, self.config.MAX_LEN, self.config, n_envs=n_envs,
+                               finetune_mode=finetune_mode, max_episode_steps=max_episode_steps)
+
+    def set_dataset(self, env, dataset_path, finetune_mode=None):
+        # Swaps the curriculum file in place; subprocess workers stay alive.
+        from stable_baselines3.common.vec_env import SubprocVecEnv, VecEnv
+
+        with self.timer.phase("dataset_load"):
+            if isinstance(env, VecEnv):
+                if isinstance(env.unwrapped, SubprocVecEnv):
+                    dataset_path = shared_dataset_path(dataset_path)
+                env.env_method("set_dataset", dataset_path, finetune_mode)
+            else:
+                env.set_dataset(dataset_path, finetune_mode)
+
+    def make_procedural_env(self, crossings, difficulty, n_envs=1, start_method=None, max_episode_steps=200, **source_kwargs):
+        # Episodes come from a background generator instead of a file; pair it with
+        # BraidCallback(curriculum=Curriculum(...)) to raise the level as training succeeds.
+        # The step cap keeps episodes (and so success rates) flowing while the policy is weak.
+        env = self.make_env(None, n_envs=n_envs, start_method=start_method, max_episode_steps=max_episode_steps)
+        self.set_procedural(env, crossings, difficulty, **source_kwargs)
+        return env
+
+    def set_procedural(self, env, crossings, difficulty, **source_kwargs):
+        from stable_baselines3.common.vec_env import VecEnv
+
+        if isinstance(env, VecEnv):
+            env.env_method("set_procedural", crossings, difficulty, **source_kwargs)
+        else:
+            env.set_procedural(crossings, difficulty, **source_kwargs)
+
+    @staticmethod
+    def _wrap_env(env):
+        from sb3_contrib.common.wrappers import ActionMasker
+        from stable_baselines3.common.vec_env import VecEnv, VecMonitor, is_vecenv_wrapped
+
+        if isinstance(env, VecEnv):
+            return env if is_vecenv_wrapped(env, VecMonitor) else VecMonitor(env)
+        return ActionMasker(env, mask_fn)
+
+    def pretrain(self, env, trajectories, epochs=5, batch_size=256, learning_rate=1e-3, seed=None, verbose=True):
+        # Behaviour cloning on solver solutions (TrajectoryStores or their paths) before
+        # train(): maximises the masked log-probability of the optimal move in every state
+        # along them. Builds the model on env if there is none yet; the PPO optimizer is
+        # left untouched, so train() starts with its own state.
+        import torch as th
+        from sb3_contrib import MaskablePPO
+        from .trajectory_store import TrajectoryLoader, TrajectoryStore
+
+        if self.model is None:
+            self.model = MaskablePPO("MlpPolicy", self._wrap_env(env), **self.hyperparameters)
+
+        stores = [TrajectoryStore.load(t) if isinstance(t, str) else t for t in trajectories]
+        loader = TrajectoryLoader(stores, BraidEncoding.from_config(self.config), batch_size=batch_size, seed=seed)
+        if verbose:
+            print(f"[{self.name}] Pretraining on {loader.n_transitions} transitions from {sum(map(len, stores))} "
+                  f"solutions ({loader.dropped} dropped) for {epochs} epochs...")
+
+        policy = self.model.policy
+        optimizer = th.optim.Adam(policy.parameters(), lr=learning_rate)
+        history = []
+        policy.set_training_mode(True)
+        for epoch in range(epochs):
+            total_loss, correct = 0.0, 0
+            for obs, masks, actions in loader:
+                obs_tensor = policy.obs_to_tensor(obs)[0]
+                actions = th.as_tensor(actions, device=policy.device)
+                distribution = policy.get_distribution(obs_tensor, action_masks=masks)
+                loss = -distribution.log_prob(actions).mean()
+
+                optimizer.zero_grad()
+                loss.backward()
+                th.nn.utils.clip_grad_norm_(policy.parameters(), self.model.max_grad_norm)
+                optimizer.step()
+
+                total_loss += loss.item() * len(actions)
+                correct += int((distribution.mode() == actions).sum())
+
+            n = max(loader.n_transitions, 1)
+            history.append({"epoch": epoch + 1, "loss": total_loss / n, "accuracy": correct / n})
+            if verbose:
+                print(f"  Epoch {epoch + 1}: loss {total_loss / n:.4f}, accuracy {correct / n:.1%}")
+        policy.set_training_mode(False)
+        return history
+
     def train(self, env, total_timesteps, save_path=None, callback=None, log_name=None):
-        env = ActionMasker(env, mask_fn)
+        from sb3_contrib import MaskablePPO
+        from stable_baselines3.common.callbacks import CallbackList
+        from stable_baselines3.common.vec_env import DummyVecEnv, VecEnv, VecMonitor
+
+        env = self._wrap_env(env)
+
+        if self.timer.enabled:
+            # The timing wrapper needs a VecEnv, so build the one SB3 would otherwise make.
+            if not isinstance(env, VecEnv):
+                env = VecMonitor(DummyVecEnv([lambda masked=env: masked]))
+            env = make_profiled_vec_env(env, self.timer)
+            callbacks = callback if isinstance(callback, list) else [callback] if callback else []
+            callback = CallbackList([make_profiling_callback(self.timer)] + callbacks)
 
         if log_name is None:
             log_name = self.name
@@ -48,11 +177,15 @@ class BraidAgent:
         action, _ = self.model.predict(obs, action_masks=action_masks, deterministic=True)
         return action
 
-    def solve(self, env, max_steps=None, reset_metrics=False, verbose=False):
+    def solve(self, env, max_steps=None, reset_metrics=False, verbose=False, mode="greedy", max_nodes=None, max_time_sec=None):
         if max_steps is None: max_steps = self.config.MAX_INFERENCE_STEPS
         if reset_metrics: self.metrics.reset()
+        if mode == "beam":
+            return self.search(env, max_steps, max_nodes, max_time_sec, verbose)
 
         obs, _ = env.reset()
+        # Decode with the env's own layout, built once rather than on every step.
+        encoding = getattr(env, "encoding", None) or BraidEncoding.from_config(self.config)
         
         initial_braid = [x for x in obs if x != 0]
         if verbose: 
@@ -61,7 +194,7 @@ class BraidAgent:
         for step in range(max_steps):
             action = self.predict(obs, env)
             
-            move_type = action // self.config.MAX_LEN
+            move_type = int(encoding.decode(action)[0])
             self.metrics.record_step(move_type)
 
             next_obs, reward, terminated, truncated, info = env.step(action)
@@ -86,11 +219,52 @@ class BraidAgent:
             print(f"  FAILED (Max steps {max_steps})")
         return False, max_steps
 
+    def search(self, env, max_steps=None, max_nodes=None, max_time_sec=None, verbose=False, **search_kwargs):
+        # Policy-guided beam search from a fresh episode, under a node and/or time budget.
+        if max_steps is None: max_steps = self.config.MAX_INFERENCE_STEPS
+
+        env.reset()
+        solver = PolicySearchSolver(self.model, self.config.N_STRANDS, self.config.MAX_LEN, max_depth=max_steps,
+                                    encoding=BraidEncoding.from_config(self.config), **search_kwargs)
+        moves = solver.solve(env.current_braid, max_nodes=max_nodes, max_time_sec=max_time_sec)
+        self.timer.record_solver(solver.stats, "search")
+        if verbose:
+            print(f"Searched {solver.stats['nodes_expanded']} nodes in {solver.stats['elapsed_sec']:.2f}s (beam {solver.stats['beam_width']})")
+
+        if moves is None:
+            self.metrics.record_episode_end(success=False)
+            return False, max_steps
+
+        for move_type, _, _ in moves:
+            self.metrics.record_step(move_type)
+        self.metrics.record_episode_end(success=True)
+        return True, len(moves)
+
+    def evaluate(self, dataset_paths, episodes=20, max_steps=200, seed=None, n_workers=1, verbose=True):
+        # Batched counterpart of calling solve() `episodes` times per file; see src/evaluation.py.
+        policy = getattr(self.model, "policy", self.model)
+        results = evaluate_files(policy, dataset_paths, self.config, episodes=episodes, max_steps=max_steps,
+                                 seed=seed, n_workers=n_workers, verbose=verbose)
+        for result in results:
+            self.metrics.record_batch(result["move_counts"], result["episodes"], result["solved"])
+        return results
+
     def save(self, path):
         if self.model: 
             self.model.save(path)
             self.name = os.path.basename(path).replace('.zip', '')
 
+    def export(self, path):
+        # NumPy-only copy of the policy for inference; load it back with load(path).
+        if self.model: 
+            return export_policy(self.model, path)
+
     def load(self, path):
-        self.model = MaskablePPO.load(path)
-        self.name = os.path.basename(path).replace('.zip', '')
\ No newline at end of file
+        # .npz files hold an exported NumpyPolicy: predict/solve/evaluate work, training does not.
+        if path.endswith('.npz'):
+            self.model = NumpyPolicy.load(path)
+        else:
+            from sb3_contrib import MaskablePPO
+
+            self.model = MaskablePPO.load(path)
+        self.name = os.path.basename(path).replace('.zip', '').replace('.npz', '')
\ No newline at end of file
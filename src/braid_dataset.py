@@ -0,0 +1,237 @@
+import json
+import os
+import struct
+from typing import Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from .braid import Braid
+
+MAGIC = b"BRDS"
+VERSION = 1
+_PREAMBLE = struct.Struct("<4sII")
+
+def _align(position: int, alignment: int = 8) -> int:
+    return (position + alignment - 1) // alignment * alignment
+
+def binary_path_for(text_path: str) -> str:
+    return os.path.splitext(text_path)[0] + ".bin"
+
+def parse_header(header: str) -> Tuple[int, dict]:
+    n_strands = 3
+    metadata = {}
+    parts = header.strip().split(',')
+    if len(parts) >= 2 and parts[1].strip().isdigit():
+        n_strands = int(parts[1])
+    if len(parts) >= 5:
+        metadata = {"crossings": int(parts[2]), "difficulty": int(parts[3]),
+                    "optimal": parts[4].strip() == "optimal=True"}
+    return n_strands, metadata
+
+def parse_record(line: str) -> Optional[Tuple[List[int], int]]:
+    # Records look like "[1, -2, ...]" or "[1, -2, ...], 12"; anything else is skipped.
+    body, bracket, rest = line.strip().partition(']')
+    if not bracket or not body.startswith('['):
+        return None
+    try:
+        body = body[1:].strip()
+        word = [int(x) for x in body.split(',')] if body else []
+        rest = rest.strip(' ,')
+        return word, int(rest) if rest else -1
+    except ValueError:
+        return None
+
+def iter_text_records(path: str) -> Iterator[Tuple[List[int], int]]:
+    # Streams (word, optimal_steps) pairs without holding the file in memory.
+    with open(path, 'r') as file:
+        file.readline()
+        for line in file:
+            record = parse_record(line)
+            if record is not None:
+                yield record
+
+class BraidDataset:
+    # Columnar dataset: word i is letters[offsets[i]:offsets[i + 1]] (int8) and its
+    # label is optimal_steps[i] (-1 when unknown). Binary files are memory-mapped
+    # read-only, so every process that opens the same file shares its pages.
+    #
+    # Binary layout: "BRDS", version, header length, JSON header, then 8-byte
+    # aligned offsets (int64, count + 1), optimal_steps (int32, count), letters (int8).
+    def __init__(self, offsets: np.ndarray, letters: np.ndarray, optimal_steps: np.ndarray,
+                 n_strands: int, metadata: Optional[dict] = None, path: Optional[str] = None):
+        self.offsets = offsets
+        self.letters = letters
+        self.optimal_steps = optimal_steps
+        self.n_strands = n_strands
+        self.metadata = metadata or {}
+        self.path = path
+
+    def __len__(self):
+        return len(self.optimal_steps)
+
+    def __getitem__(self, index: int) -> Braid:
+        braid = Braid.from_key(self.word(index).tobytes(), self.n_strands)
+        braid.optimal_steps = int(self.optimal_steps[index])
+        return braid
+
+    def __getstate__(self):
+        # Mapped datasets travel as their path and are re-mapped in the receiving process.
+        if self.path is not None:
+            return {"path": self.path}
+        return self.__dict__.copy()
+
+    def __setstate__(self, state):
+        if "offsets" not in state:
+            state = BraidDataset.load(state["path"]).__dict__
+        self.__dict__.update(state)
+
+    def word(self, index: int) -> np.ndarray:
+        return self.letters[self.offsets[index]:self.offsets[index + 1]]
+
+    def lengths(self) -> np.ndarray:
+        return np.diff(self.offsets)
+
+    def braids(self) -> List[Braid]:
+        return [self[i] for i in range(len(self))]
+
+    def padded_words(self, width: int, dtype=np.int32) -> np.ndarray:
+        # (count, width) matrix of words truncated / zero-padded to `width`.
+        lengths = np.minimum(self.lengths(), width)
+        cols = np.arange(width)
+        inside = cols < lengths[:, None]
+        positions = np.where(inside, self.offsets[:-1, None] + cols, 0)
+        words = np.zeros((len(self), width), dtype=dtype)
+        if len(self.letters):
+            words[inside] = np.asarray(self.letters)[positions[inside]]
+        return words
+
+    @classmethod
+    def empty(cls, n_strands: int = 3) -> "BraidDataset":
+        return cls(np.zeros(1, dtype=np.int64), np.zeros(0, dtype=np.int8), np.zeros(0, dtype=np.int32), n_strands)
+
+    @classmethod
+    def from_braids(cls, braids: List[Braid], n_strands: int, metadata: Optional[dict] = None) -> "BraidDataset":
+        offsets = np.zeros(len(braids) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum([len(b) for b in braids])
+        letters = np.frombuffer(b"".join(b.key() for b in braids), dtype=np.int8).copy()
+        optimal_steps = np.array([b.optimal_steps for b in braids], dtype=np.int32)
+        return cls(offsets, letters, optimal_steps, n_strands, metadata)
+
+    @classmethod
+    def load(cls, path: str, writable: bool = False) -> "BraidDataset":
+        # Text paths transparently use a sibling .bin file when it is at least as new.
+        if not os.path.exists(path):
+            return cls.empty()
+
+        if path.endswith(".txt"):
+            binary = binary_path_for(path)
+            if os.path.exists(binary) and os.path.getmtime(binary) >= os.path.getmtime(path):
+                return cls.load_binary(binary, writable)
+            return cls.load_text(path)
+        return cls.load_binary(path, writable)
+
+    @classmethod
+    def load_text(cls, path: str) -> "BraidDataset":
+        if not os.path.exists(path):
+            return cls.empty()
+
+        with open(path, 'r') as file:
+            n_strands, metadata = parse_header(file.readline())
+
+        words, optimal_steps = [], []
+        for word, opt_steps in iter_text_records(path):
+            words.append(word)
+            optimal_steps.append(opt_steps)
+
+        return cls.from_words(words, optimal_steps, n_strands, metadata)
+
+    @classmethod
+    def from_words(cls, words: List[List[int]], optimal_steps: List[int], n_strands: int,
+                   metadata: Optional[dict] = None) -> "BraidDataset":
+        offsets = np.zeros(len(words) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum([len(w) for w in words])
+        letters = np.fromiter((g for w in words for g in w), dtype=np.int8, count=int(offsets[-1]))
+        return cls(offsets, letters, np.array(optimal_steps, dtype=np.int32), n_strands, metadata)
+
+    @classmethod
+    def load_binary(cls, path: str, writable: bool = False) -> "BraidDataset":
+        with open(path, 'rb') as file:
+            magic, version, header_len = _PREAMBLE.unpack(file.read(_PREAMBLE.size))
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(f"{path} is not a version {VERSION} braid dataset")
+            header = json.loads(file.read(header_len))
+
+        count = header["count"]
+        mode = 'r+' if writable else 'r'
+        position = _align(_PREAMBLE.size + header_len)
+        offsets = np.memmap(path, dtype=np.int64, mode=mode, offset=position, shape=(count + 1,))
+        position = _align(position + offsets.nbytes)
+        optimal_steps = np.memmap(path, dtype=np.int32, mode=mode, offset=position, shape=(count,)) \
+            if count else np.zeros(0, dtype=np.int32)
+        position = _align(position + 4 * count)
+        n_letters = int(offsets[-1])
+        letters = np.memmap(path, dtype=np.int8, mode=mode, offset=position, shape=(n_letters,)) \
+            if n_letters else np.zeros(0, dtype=np.int8)
+
+        metadata = {k: v for k, v in header.items() if k not in ("count", "n_strands")}
+        return cls(offsets, letters, optimal_steps, header["n_strands"], metadata, path=path)
+
+    def save(self, path: str):
+        header = dict(self.metadata, count=len(self), n_strands=self.n_strands)
+        header_bytes = json.dumps(header).encode()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'wb') as file:
+            file.write(_PREAMBLE.pack(MAGIC, VERSION, len(header_bytes)))
+            file.write(header_bytes)
+            for array, dtype in ((self.offsets, np.int64), (self.optimal_steps, np.int32), (self.letters, np.int8)):
+                file.write(b"\0" * (_align(file.tell()) - file.tell()))
+                file.write(np.ascontiguousarray(array, dtype=dtype).tobytes())
+        os.replace(tmp_path, path)
+
+def shared_dataset_path(path: str) -> str:
+    # Binary path to hand to worker processes: they map it and share its pages.
+    if path.endswith(".txt") and os.path.exists(path):
+        binary = binary_path_for(path)
+        if not os.path.exists(binary) or os.path.getmtime(binary) < os.path.getmtime(path):
+            convert_dataset(path, binary)
+        return binary
+    return path
+
+def convert_dataset(text_path: str, binary_path: Optional[str] = None) -> str:
+    binary_path = binary_path or binary_path_for(text_path)
+    BraidDataset.load_text(text_path).save(binary_path)
+    return binary_path
+
+def iter_dataset_chunks(path: str, chunk_size: int = 65536) -> Iterator[BraidDataset]:
+    # Streams a dataset as consecutive BraidDatasets of at most chunk_size braids: slices
+    # of the memory map for binary files (or an up-to-date sibling .bin), parsed batches
+    # of lines for text files. Memory stays bounded by the chunk size.
+    if not os.path.exists(path):
+        return
+    binary = binary_path_for(path) if path.endswith(".txt") else path
+    if os.path.exists(binary) and os.path.getmtime(binary) >= os.path.getmtime(path):
+        dataset = BraidDataset.load_binary(binary)
+        for start in range(0, len(dataset), chunk_size):
+            stop = min(start + chunk_size, len(dataset))
+            offsets = dataset.offsets[start:stop + 1]
+            yield BraidDataset(offsets - offsets[0], dataset.letters[offsets[0]:offsets[-1]],
+                               dataset.optimal_steps[start:stop], dataset.n_strands, dataset.metadata)
+        return
+
+    with open(path, 'r') as file:
+        n_strands, metadata = parse_header(file.readline())
+
+    words, optimal_steps = [], []
+    for word, opt_steps in iter_text_records(path):
+        words.append(word)
+        optimal_steps.append(opt_steps)
+        if len(words) == chunk_size:
+            yield BraidDataset.from_words(words, optimal_steps, n_strands, metadata)
+            words, optimal_steps = [], []
+    if words:
+        yield BraidDataset.from_words(words, optimal_steps, n_strands, metadata)
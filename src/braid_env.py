@@ -1,85 +1,161 @@
 import gymnasium as gym
 import numpy as np
-import random
+from typing import Optional
 from gymnasium import spaces
 
 from .braid import Braid
 from .config import Configuration
-from .braid_generator import BraidGenerator
+from .braid_dataset import BraidDataset
+from .curriculum import ProceduralSource
+from .encoding import BraidEncoding
+from .move_kernels import enumerate_moves, move_hash, successor_hashes, word_hash
 
 class BraidEnv(gym.Env):
-    def __init__(self, dataset_path: str, n_strands: int, max_len: int, config: Configuration, finetune_mode: bool = False):
+    def __init__(self, dataset_path: str, n_strands: int, max_len: int, config: Configuration, finetune_mode: bool = False,
+                 debug_masks: bool = False, max_episode_steps: Optional[int] = None):
         super().__init__()
 
         self.n_strands = n_strands
         self.max_len = max_len
         self.config = config
         self.finetune_mode = finetune_mode
-        
-        self.dataset = BraidGenerator.load_dataset(dataset_path)
-        if not self.dataset:
-            print(f"Warning: No data found at {dataset_path}")
+        self.debug_masks = debug_masks
+        self.encoding = BraidEncoding(max_len, n_strands, config.OBS_ENCODING, config.ACTION_ORDER,
+                                      config.INSERT_GENERATORS)
+        # Optional step cap (truncation without penalty); without it an episode only ends
+        # when the word is solved or outgrows max_len.
+        self.max_episode_steps = max_episode_steps
+        self.source = None
+        # Rolling hash of the word (updated per move, same values as BraidVecEnv's) and
+        # the hashes seen this episode, see Configuration.TRACK_LOOPS.
+        self.track_loops = config.TRACK_LOOPS or config.MASK_LOOPS
+        self.word_hash = 0
+        self.visited = set()
+
+        # dataset_path may be None for an env that is switched to set_procedural before use.
+        if dataset_path is not None:
+            self.set_dataset(dataset_path)
+        else:
+            self.dataset = BraidDataset.empty(n_strands)
             
         self.current_braid = None
         self.current_steps = 0
         
-        # Flattened Action Space: 4 * max_len
+        # Flattened Action Space with the default layout: 4 * max_len
         # 0..max_len-1          : Commute
         # max_len..2*max_len-1  : R3
         # 2*max_len..3*max_len-1: Remove
         # 3*max_len..4*max_len-1: Insert
-        self.action_space = spaces.Discrete(4 * max_len)
-
-        self.observation_space = spaces.Box(
-            low=-(n_strands-1), 
-            high=max(n_strands-1, 100), 
-            shape=(max_len,),
-            dtype=np.int32
-        )
+        # Other layouts and the strand-agnostic observation are described in src/encoding.py.
+        self.action_space = spaces.Discrete(self.encoding.n_actions)
+        self.observation_space = self.encoding.observation_space()
+
+    def set_dataset(self, dataset_path: str, finetune_mode: Optional[bool] = None):
+        # Lets a long-lived (e.g. subprocess) env switch curriculum files without being rebuilt.
+        self.dataset = BraidDataset.load(dataset_path)
+        if len(self.dataset) == 0:
+            print(f"Warning: No data found at {dataset_path}")
+        if finetune_mode is not None:
+            self.finetune_mode = finetune_mode
+        self.close()
+
+    def set_procedural(self, crossings: int, difficulty: int, n_strands: Optional[int] = None, **source_kwargs):
+        # Draws every episode from a background generator instead of a file (see
+        # ProceduralSource); later calls without n_strands, or with the source's, only change
+        # the level.
+        if self.source is not None and n_strands in (None, self.source.n_strands):
+            self.source.set_level(crossings, difficulty)
+            return
+        n_strands = n_strands or self.n_strands
+        self.close()
+        source_kwargs.setdefault("seed", int(self.np_random.integers(2 ** 63)))
+        self.source = ProceduralSource(n_strands, crossings, difficulty, **source_kwargs)
+
+    def source_stats(self) -> dict:
+        return self.source.stats() if self.source is not None else {}
 
     def reset(self, seed=None, options=None):
         super().reset(seed=seed)
         
-        if not self.dataset:
+        if self.source is not None:
+            key = self.source.take(self.np_random)[:self.max_len]
+            self.current_braid = Braid.from_key(key, self.source.n_strands)
+        elif len(self.dataset) == 0:
             self.current_braid = Braid([], self.n_strands)
         else:
-            self.current_braid = random.choice(self.dataset).copy()
-            if len(self.current_braid) > self.max_len:
-                self.current_braid.word = self.current_braid.word[:self.max_len]
+            index = self.np_random.integers(len(self.dataset))
+            word = self.dataset.word(index)[:self.max_len]
+            self.current_braid = Braid.from_key(word.tobytes(), self.dataset.n_strands)
+            self.current_braid.optimal_steps = int(self.dataset.optimal_steps[index])
         
         self.current_steps = 0
+        self.visited = set()
+        if self.track_loops:
+            self.word_hash = word_hash(self.current_braid.word)
+            self.visited.add(self.word_hash)
         return self._get_obs(), {}
 
     def _get_obs(self):
         obs = np.zeros(self.max_len, dtype=np.int32)
-        word = self.current_braid.word
+        word = np.frombuffer(self.current_braid.key(), dtype=np.int8)
         length = min(len(word), self.max_len)
         if length > 0:
             obs[:length] = word[:length]
+        if self.encoding.obs_encoding != "raw":
+            return self.encoding.encode(obs[None], np.array([length]), np.array([self.current_braid.n_strands]))[0]
         return obs
 
     def action_masks(self):
         mask = np.zeros(4 * self.max_len, dtype=bool)
         curr_len = len(self.current_braid)
+        n = min(curr_len, self.max_len)
+
+        # The braid keeps its commute/R3/remove flags up to date after every move,
+        # so building the mask is a few buffer copies instead of a scan.
+        commute, r3, remove = self.current_braid.valid_moves()
+        mask[:n] = np.frombuffer(commute, dtype=bool, count=n)
+        mask[self.max_len:self.max_len + n] = np.frombuffer(r3, dtype=bool, count=n)
+        mask[2 * self.max_len:2 * self.max_len + n] = np.frombuffer(remove, dtype=bool, count=n)
+
+        offset_ins = 3 * self.max_len
+        if curr_len < self.max_len - 2:
+            mask[offset_ins:offset_ins + curr_len + 1] = True
+
+        if not np.any(mask):
+            mask[offset_ins] = True
+
+        if self.debug_masks:
+            expected = self._full_action_masks()
+            if not np.array_equal(mask, expected) or not self.current_braid.check_valid_moves():
+                raise RuntimeError(f"Incremental action mask out of sync for {self.current_braid.word}")
+
+        if self.config.MASK_LOOPS:
+            self._mask_loops(mask)
+
+        if not self.encoding.is_default:
+            return self.encoding.from_standard_masks(mask[None], np.array([self.current_braid.n_strands]))[0]
+        return mask
+
+    def _mask_loops(self, mask):
+        # Unless nothing else would be left, drops the commute/R3/remove actions whose
+        # resulting word was already visited this episode.
+        actions = np.flatnonzero(mask[:3 * self.max_len]).tolist()
+        hashes = successor_hashes(self.word_hash, self.current_braid.word, [divmod(a, self.max_len) for a in actions])
+        revisits = [action for action, h in zip(actions, hashes) if h in self.visited]
+        if revisits and len(revisits) < np.count_nonzero(mask):
+            mask[revisits] = False
+
+    def _full_action_masks(self):
+        # Mask from a fresh scan of the word, the reference for the incremental flags.
+        mask = np.zeros(4 * self.max_len, dtype=bool)
+        curr_len = len(self.current_braid)
+
+        for move_type, indices in enumerate(enumerate_moves(self.current_braid.word)):
+            mask[move_type * self.max_len + np.array(indices, dtype=np.int64)] = True
 
-        for i in range(curr_len - 1):
-            if self.current_braid.check_commutation(i):
-                mask[i] = True
-
-        offset_r3 = self.max_len
-        for i in range(curr_len - 2):
-            if self.current_braid.check_braid_relation(i):
-                mask[offset_r3 + i] = True
-                
-        offset_rem = 2 * self.max_len
-        for i in range(curr_len - 1):
-            if self.current_braid.check_remove_pair(i):
-                mask[offset_rem + i] = True
-                
         offset_ins = 3 * self.max_len
         if curr_len < self.max_len - 2:
-            for i in range(curr_len + 1):
-                mask[offset_ins + i] = True
+            mask[offset_ins:offset_ins + curr_len + 1] = True
         
         if not np.any(mask):
             mask[offset_ins] = True
@@ -87,25 +163,40 @@ class BraidEnv(gym.Env):
         return mask
 
     def step(self, action):
-        move_type = action // self.max_len
-        index = action % self.max_len
+        if self.encoding.is_default:
+            move_type = action // self.max_len
+            index = action % self.max_len
+            gen = 0
+        else:
+            move_type, index, gen = (int(x[0]) for x in self.encoding.decode(np.array([action])))
         
         prev_len = len(self.current_braid)
         success = False
+        # The letters before the move, for the hash update.
+        word = self.current_braid.word if self.track_loops else None
 
         if move_type == 0: success = self.current_braid.apply_commutation(index)
         elif move_type == 1: success = self.current_braid.apply_braid_relation(index)
         elif move_type == 2: success = self.current_braid.remove_pair_at_index(index)
         elif move_type == 3:
-            gen = random.randint(1, self.n_strands - 1)
+            if gen == 0:
+                insert_strands = self.current_braid.n_strands if self.encoding.per_braid_strands else self.n_strands
+                gen = int(self.np_random.integers(1, insert_strands))
             success = self.current_braid.insert_canceling_pair(index, gen)
 
         self.current_steps += 1
         reward = self.config.REWARD_STEP
+        loop = False
         
         if not success:
             reward += self.config.REWARD_INVALID 
         else:
+            if self.track_loops:
+                self.word_hash = move_hash(self.word_hash, word, move_type, int(index), gen)
+                loop = self.word_hash in self.visited
+                self.visited.add(self.word_hash)
+                if loop: reward += self.config.REWARD_LOOP
+
             new_len = len(self.current_braid)
             if new_len < prev_len: reward += self.config.REWARD_SHRINK
             elif new_len > prev_len: reward += self.config.REWARD_GROW
@@ -125,15 +216,24 @@ class BraidEnv(gym.Env):
                 return self._get_obs(), self.config.REWARD_SOLVED + bonus, True, False, {
                     "success": True, 
                     "is_success": True, 
-                    "move_type": move_type
+                    "move_type": move_type,
+                    "loop": False
                 }
 
         truncated = len(self.current_braid) >= self.max_len
         if truncated:
             reward += self.config.REWARD_INVALID * 2
+        elif self.max_episode_steps is not None and self.current_steps >= self.max_episode_steps:
+            truncated = True
 
         return self._get_obs(), reward, False, truncated, {
             "success": success, 
             "is_success": False, 
-            "move_type": move_type
-        }
\ No newline at end of file
+            "move_type": move_type,
+            "loop": loop
+        }
+
+    def close(self):
+        if self.source is not None:
+            self.source.close()
+            self.source = None
@@ -1,26 +1,29 @@
-import ast
 import random
 import os
-from typing import List, Optional
-
-try:
-    from sage.all import BraidGroup
-except ImportError:
-    print("invalid sage import")
+from typing import TYPE_CHECKING, List, Optional
 
 from .braid import Braid
 from .config import Configuration
+from .move_kernels import enumerate_moves
 from .optimal_solver import AStarSolver
 
+if TYPE_CHECKING:
+    from .solution_cache import SolutionCache
+    from .trajectory_store import TrajectoryWriter
+
 class BraidGenerator:
-    def __init__(self, n_strands: int, config: Configuration, seed: Optional[int] = None):
+    def __init__(self, n_strands: int, config: Configuration, seed: Optional[int] = None,
+                 cache: Optional["SolutionCache"] = None, verify: bool = True):
         self.n_strands = n_strands
         self.config = config
-        self.B = BraidGroup(n_strands)
+        # Words are built from canceling pairs plus R3/commutations, so they are trivial
+        # by construction; verify=False skips the (handle reduction) identity check.
+        self.verify = verify
 
         self.rng = random.Random(seed)
 
-        self.solver = AStarSolver(n_strands, config.MAX_LEN)
+        self.cache = cache
+        self.solver = AStarSolver(n_strands, config.MAX_LEN, cache=cache)
 
     def generate_braid(self, crossings: int, difficulty: int) -> Braid:
         valid = False
@@ -39,19 +42,9 @@ class BraidGenerator:
             max_attempts = 1000
 
             while moves < difficulty and attempts < max_attempts:
-                possible_moves = []
                 attempts += 1
-
-                for i in range(len(braid) - 2):
-                    gen_0, gen_1, gen_2 = braid.word[i], braid.word[i + 1], braid.word[i + 2]
-
-                    if gen_0 == gen_2 and abs(abs(gen_0) - abs(gen_1)) == 1:
-                        if gen_0 * gen_1 > 0:
-                            possible_moves.append(('r3', i))
-
-                for i in range(len(braid) - 1):
-                    if abs(abs(braid.word[i]) - abs(braid.word[i+1])) >= 2:
-                        possible_moves.append(('commute', i))
+                commute, r3, _ = enumerate_moves(braid.word)
+                possible_moves = [('r3', i) for i in r3] + [('commute', i) for i in commute]
 
                 if possible_moves: 
                     move, index = self.rng.choice(possible_moves)
@@ -63,14 +56,40 @@ class BraidGenerator:
 
                     moves += 1
 
-            sage_braid = self.B(braid.word)
-
-            if sage_braid.is_one():
+            if not self.verify or braid.is_identity():
                 valid = True
 
         return braid
 
-    def generate_dataset(self, count: int, crossings: int, difficulty: int, filepath: Optional[str] = None, compute_optimal: bool = False):
+    def generate_batch(self, count: int, crossings: int, difficulty: int, seed: Optional[int] = None):
+        # Same distribution as generate_braid, `count` braids at a time (a BraidDataset).
+        from .batch_generator import generate_batch
+
+        if seed is None:
+            seed = self.rng.getrandbits(64)
+        return generate_batch(self.n_strands, count, crossings, difficulty, seed=seed, verify=self.verify)
+
+    @staticmethod
+    def dataset_header(count: int, n_strands: int, crossings: int, difficulty: int, compute_optimal: bool) -> str:
+        return f"{count},{n_strands},{crossings},{difficulty},optimal={compute_optimal}\n"
+
+    def format_record(self, braid: Braid, compute_optimal: bool, max_time_sec: float = 10.0,
+                      trajectories: Optional["TrajectoryWriter"] = None) -> str:
+        line_content = str(braid.word)
+
+        if compute_optimal:
+            path = self.solver.solve(braid, max_time_sec=max_time_sec)
+            optimal_steps = len(path) if path is not None else -1
+            if trajectories is not None and path is not None:
+                trajectories.add(braid.key(), path)
+            line_content = f"{line_content}, {optimal_steps}"
+
+        return f"{line_content}\n"
+
+    def generate_dataset(self, count: int, crossings: int, difficulty: int, filepath: Optional[str] = None, compute_optimal: bool = False,
+                         trajectory_path: Optional[str] = None):
+        # With compute_optimal, trajectory_path also keeps the solver's move sequences (see
+        # trajectory_store) for imitation pretraining instead of just their lengths.
         print(f"Generating dataset: {count} braids, {crossings} crossings (Optimal={compute_optimal})...")
         
         if not filepath:
@@ -78,59 +97,41 @@ class BraidGenerator:
             filepath = os.path.join(self.config.DATA_DIR, f"braids_{self.n_strands}st_{crossings}cr_opt.txt")
         
         os.makedirs(os.path.dirname(filepath), exist_ok=True)
+        trajectories = None
+        if compute_optimal and trajectory_path:
+            from .trajectory_store import TrajectoryWriter
+
+            trajectories = TrajectoryWriter(trajectory_path, self.n_strands,
+                                            {"crossings": crossings, "difficulty": difficulty})
 
         with open(filepath, 'w') as file:
-            file.write(f"{count},{self.n_strands},{crossings},{difficulty},optimal={compute_optimal}\n")
+            file.write(self.dataset_header(count, self.n_strands, crossings, difficulty, compute_optimal))
 
             generated_count = 0
+            nodes_expanded = 0
+            timeouts = 0
             while generated_count < count:
                 braid_obj = self.generate_braid(crossings, difficulty)
-                
-                line_content = str(braid_obj.word)
-                
-                if compute_optimal:
-                    path = self.solver.solve(braid_obj, max_time_sec=10.0)
-                    optimal_steps = len(path) if path is not None else -1
+                file.write(self.format_record(braid_obj, compute_optimal, trajectories=trajectories))
 
-                    line_content = f"{line_content}, {optimal_steps}"
-
-                file.write(f"{line_content}\n")
+                if compute_optimal:
+                    nodes_expanded += self.solver.stats["nodes_expanded"]
+                    timeouts += self.solver.stats["timed_out"]
                 generated_count += 1
 
+        if trajectories is not None:
+            store = trajectories.close()
+            print(f"Trajectories: {len(store)} solutions, {store.n_transitions} moves saved to {trajectory_path}")
+        if compute_optimal:
+            print(f"Solver: {nodes_expanded} nodes expanded, {timeouts} timeouts")
+            if self.cache is not None:
+                stats = self.cache.summary()
+                print(f"Cache: {stats['hits']} hits / {stats['misses']} misses ({stats['hit_rate']:.1%}), "
+                      f"{stats['equivalent_hits']} commutation-equivalent")
         print(f"Done. Saved to {filepath}")
 
     @staticmethod
     def load_dataset(filepath: str) -> List[Braid]:
-        braids = []
-        if not os.path.exists(filepath):
-            return []
-
-        with open(filepath, 'r') as file:
-            header = file.readline().strip()
-            n_strands = 3
-            if header:
-                try:
-                    parts = header.split(',')
-                    if len(parts) >= 2: n_strands = int(parts[1])
-                except: pass
-
-            for line in file:
-                try:
-                    parsed = ast.literal_eval(line.strip())
-                    word = []
-                    opt_steps = None
-                    
-                    if isinstance(parsed, tuple):
-                        word = parsed[0]
-                        opt_steps = parsed[1]
-                    elif isinstance(parsed, list):
-                        word = parsed
-                    
-                    if isinstance(word, list):
-                        b = Braid(word, n_strands)
-                        if opt_steps is not None:
-                            b.optimal_steps = opt_steps
-                        braids.append(b)
-                except:
-                    continue
-        return braids
\ No newline at end of file
+        from .braid_dataset import BraidDataset
+
+        return BraidDataset.load(filepath).braids()
@@ -0,0 +1,158 @@
+import hashlib
+import os
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from .braid_dataset import iter_dataset_chunks
+from .braid_kernels import batch_canonical_forms, batch_word_hashes
+
+# Upper bound on rows * width^2 for one batch_canonical_forms call (its conflict table).
+MAX_CONFLICT_CELLS = 1 << 24
+
+def word_hashes(words: np.ndarray, lengths: np.ndarray):
+    # (exact, canonical) 64-bit hashes per row of a zero-padded word array.
+    exact = batch_word_hashes(words, lengths)
+    canonical = np.empty_like(exact)
+    rows_per_call = max(1, MAX_CONFLICT_CELLS // max(1, words.shape[1]) ** 2)
+    for start in range(0, len(words), rows_per_call):
+        stop = start + rows_per_call
+        forms = batch_canonical_forms(words[start:stop], lengths[start:stop])
+        canonical[start:stop] = batch_word_hashes(forms, lengths[start:stop])
+    return exact, canonical
+
+def contains(sorted_hashes: np.ndarray, hashes: np.ndarray) -> np.ndarray:
+    if len(sorted_hashes) == 0:
+        return np.zeros(len(hashes), dtype=bool)
+    idx = np.minimum(np.searchsorted(sorted_hashes, hashes), len(sorted_hashes) - 1)
+    return sorted_hashes[idx] == hashes
+
+def first_occurrences(hashes: np.ndarray) -> np.ndarray:
+    keep = np.zeros(len(hashes), dtype=bool)
+    keep[np.unique(hashes, return_index=True)[1]] = True
+    return keep
+
+class FileIndex:
+    # Exact and canonical (far-commutation normal form, see braid.canonical_key) 64-bit
+    # word hashes of one dataset file, in file order. Built by streaming the file in
+    # chunks, so memory is 16 bytes per word whatever the word lengths. With a cache_dir
+    # the hashes are stored as .npz keyed by the source path and reused while its size
+    # and mtime are unchanged.
+    def __init__(self, path: str, exact: np.ndarray, canonical: np.ndarray, n_strands: int, metadata: dict):
+        self.path = path
+        self.exact = exact
+        self.canonical = canonical
+        self.n_strands = n_strands
+        self.metadata = metadata
+
+    def __len__(self):
+        return len(self.exact)
+
+    def hashes(self, key: str) -> np.ndarray:
+        if key not in ("exact", "canonical"):
+            raise ValueError(f"Unknown hash key {key!r}")
+        return getattr(self, key)
+
+    @classmethod
+    def build(cls, path: str, chunk_size: int = 65536, cache_dir: Optional[str] = None) -> "FileIndex":
+        cache_path = None
+        if cache_dir:
+            stat = os.stat(path)
+            digest = hashlib.blake2b(os.path.abspath(path).encode(), digest_size=8).hexdigest()
+            cache_path = os.path.join(cache_dir, f"{os.path.splitext(os.path.basename(path))[0]}_{digest}.npz")
+            if os.path.exists(cache_path):
+                with np.load(cache_path, allow_pickle=False) as data:
+                    if data["source"].tolist() == [stat.st_size, stat.st_mtime_ns]:
+                        return cls(path, data["exact"], data["canonical"], int(data["n_strands"]),
+                                   {k[5:]: data[k].item() for k in data.files if k.startswith("meta_")})
+
+        exact_parts, canonical_parts = [], []
+        n_strands, metadata = 3, {}
+        for chunk in iter_dataset_chunks(path, chunk_size):
+            lengths = chunk.lengths()
+            exact, canonical = word_hashes(chunk.padded_words(int(lengths.max(initial=0))), lengths)
+            exact_parts.append(exact)
+            canonical_parts.append(canonical)
+            n_strands, metadata = chunk.n_strands, chunk.metadata
+        index = cls(path, np.concatenate(exact_parts or [np.zeros(0, np.uint64)]),
+                    np.concatenate(canonical_parts or [np.zeros(0, np.uint64)]), n_strands, metadata)
+
+        if cache_path:
+            os.makedirs(cache_dir, exist_ok=True)
+            tmp_path = cache_path + ".tmp.npz"
+            np.savez(tmp_path, exact=index.exact, canonical=index.canonical, n_strands=n_strands,
+                     source=np.array([stat.st_size, stat.st_mtime_ns], dtype=np.int64),
+                     **{f"meta_{k}": v for k, v in metadata.items()})
+            os.replace(tmp_path, cache_path)
+        return index
+
+def leakage_report(train: List[FileIndex], test: List[FileIndex]) -> Dict[str, dict]:
+    # Per file: words, duplicates within the file, and duplicates of words in earlier
+    # train files (train) or of any train word (test, i.e. leaks), under both hashes.
+    # "train" / "test" entries hold the totals.
+    report = {}
+    for key in ("exact", "canonical"):
+        seen = np.zeros(0, dtype=np.uint64)
+        for index in train:
+            hashes = index.hashes(key)
+            unique = np.unique(hashes)
+            entry = report.setdefault(index.path, {"split": "train", "words": len(index)})
+            entry[f"{key}_duplicates"] = len(hashes) - len(unique)
+            entry[f"{key}_cross_file"] = int(contains(seen, hashes).sum())
+            seen = np.union1d(seen, unique)
+        report.setdefault("train", {"words": sum(len(i) for i in train)})[f"{key}_distinct"] = len(seen)
+
+        leaked = total = 0
+        for index in test:
+            hashes = index.hashes(key)
+            entry = report.setdefault(index.path, {"split": "test", "words": len(index)})
+            entry[f"{key}_duplicates"] = len(hashes) - len(np.unique(hashes))
+            entry[f"{key}_leaks"] = int(contains(seen, hashes).sum())
+            leaked += entry[f"{key}_leaks"]
+            total += len(hashes)
+        totals = report.setdefault("test", {"words": total})
+        totals[f"{key}_leaks"] = leaked
+        totals[f"{key}_leak_rate"] = leaked / total if total else 0.0
+    return report
+
+def dedup_masks(train: List[FileIndex], test: List[FileIndex], key: str = "canonical",
+                drop_leaks: bool = False) -> Dict[str, np.ndarray]:
+    # Which records to keep per file: the first occurrence of each word across the train
+    # files (in the given order) and within each test file. With drop_leaks, train words
+    # that also appear in a test file are dropped too, so the test sets stay untouched.
+    test_hashes = np.unique(np.concatenate([i.hashes(key) for i in test] or [np.zeros(0, np.uint64)])) \
+        if drop_leaks else np.zeros(0, dtype=np.uint64)
+    masks = {}
+    seen = np.zeros(0, dtype=np.uint64)
+    for index in train:
+        hashes = index.hashes(key)
+        masks[index.path] = first_occurrences(hashes) & ~contains(seen, hashes) & ~contains(test_hashes, hashes)
+        seen = np.union1d(seen, hashes)
+    for index in test:
+        masks[index.path] = first_occurrences(index.hashes(key))
+    return masks
+
+def write_filtered(path: str, output_path: str, keep: np.ndarray, chunk_size: int = 65536) -> int:
+    # Streams the kept records of `path` into a text dataset with an updated header count.
+    directory = os.path.dirname(output_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    tmp_path = output_path + ".tmp"
+    start = 0
+    with open(tmp_path, 'w') as file:
+        for chunk in iter_dataset_chunks(path, chunk_size):
+            if start == 0:
+                meta = chunk.metadata
+                header = [str(int(keep.sum())), str(chunk.n_strands)]
+                if {"crossings", "difficulty", "optimal"} <= meta.keys():
+                    header += [str(meta["crossings"]), str(meta["difficulty"]), f"optimal={meta['optimal']}"]
+                file.write(",".join(header) + "\n")
+
+            labelled = chunk.metadata.get("optimal", False)
+            for i in np.flatnonzero(keep[start:start + len(chunk)]):
+                line = str(chunk.word(i).tolist())
+                file.write(f"{line}, {chunk.optimal_steps[i]}\n" if labelled else f"{line}\n")
+            start += len(chunk)
+    os.replace(tmp_path, output_path)
+    return int(keep.sum())
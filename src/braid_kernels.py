@@ -0,0 +1,200 @@
+import numpy as np
+from functools import lru_cache
+from typing import List
+
+from .braid import COMMUTE, R3, REMOVE, INSERT
+from .move_kernels import HASH_GROW, HASH_SHRINK, hash_powers
+
+def batch_action_masks(words: np.ndarray, lengths: np.ndarray, max_len: int) -> np.ndarray:
+    # Same layout and rules as BraidEnv.action_masks, one row per word.
+    # `words` must be at least max_len + 2 wide and zero padded past each length.
+    idx = np.arange(max_len)
+    lens = lengths[:, None]
+
+    gen_0 = words[:, :max_len]
+    gen_1 = words[:, 1:max_len + 1]
+    gen_2 = words[:, 2:max_len + 2]
+    dist = np.abs(np.abs(gen_0) - np.abs(gen_1))
+
+    commute = (idx < lens - 1) & (dist >= 2)
+    r3 = (idx < lens - 2) & (gen_0 == gen_2) & (dist == 1) & (gen_0 * gen_1 > 0)
+    remove = (idx < lens - 1) & (gen_0 == -gen_1)
+    insert = (idx <= lens) & (lens < max_len - 2)
+
+    mask = np.concatenate([commute, r3, remove, insert], axis=1)
+    mask[~mask.any(axis=1), INSERT * max_len] = True
+    return mask
+
+def batch_apply_moves(words: np.ndarray, lengths: np.ndarray, move_types: np.ndarray,
+                      indices: np.ndarray, generators: np.ndarray) -> np.ndarray:
+    # Applies one move per row in place, mirroring the Braid.apply_* / insert / remove checks.
+    # Returns a bool array telling which rows actually changed. Indices must stay below width - 2.
+    rows = np.arange(words.shape[0])
+    width = words.shape[1]
+    lens = lengths
+
+    gen_0 = words[rows, indices]
+    gen_1 = words[rows, indices + 1]
+    gen_2 = words[rows, indices + 2]
+    dist = np.abs(np.abs(gen_0) - np.abs(gen_1))
+
+    valid = np.zeros(words.shape[0], dtype=bool)
+    valid |= (move_types == COMMUTE) & (indices < lens - 1) & (dist >= 2)
+    valid |= (move_types == R3) & (indices < lens - 2) & (gen_0 == gen_2) & (dist == 1) & (gen_0 * gen_1 > 0)
+    valid |= (move_types == REMOVE) & (indices < lens - 1) & (gen_0 == -gen_1)
+    valid |= (move_types == INSERT) & (indices <= lens)
+
+    sel = valid & (move_types == COMMUTE)
+    if sel.any():
+        r, i = rows[sel], indices[sel]
+        words[r, i], words[r, i + 1] = gen_1[sel], gen_0[sel]
+
+    sel = valid & (move_types == R3)
+    if sel.any():
+        r, i = rows[sel], indices[sel]
+        words[r, i], words[r, i + 1], words[r, i + 2] = gen_1[sel], gen_0[sel], gen_1[sel]
+
+    cols = np.arange(width)
+
+    # Removes and inserts blend each row with a copy of itself shifted by two columns.
+    sel = valid & (move_types == REMOVE)
+    if sel.any():
+        r, i = rows[sel], indices[sel][:, None]
+        row_words = words[r]
+        shifted = np.zeros_like(row_words)
+        shifted[:, :-2] = row_words[:, 2:]
+        words[r] = np.where(cols < i, row_words, shifted)
+        lengths[r] -= 2
+
+    sel = valid & (move_types == INSERT)
+    if sel.any():
+        r, i = rows[sel], indices[sel]
+        row_words = words[r]
+        shifted = np.zeros_like(row_words)
+        shifted[:, 2:] = row_words[:, :-2]
+        shifted = np.where(cols < i[:, None], row_words, shifted)
+        local = np.arange(len(r))
+        shifted[local, i] = generators[sel]
+        shifted[local, i + 1] = -generators[sel]
+        words[r] = shifted
+        lengths[r] += 2
+
+    return valid
+
+def batch_canonical_forms(words: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+    # Row-wise braid.canonical_key: at every step each row takes its smallest remaining
+    # letter that no earlier remaining letter blocks (|a| and |b| at most 1 apart).
+    # `words` is zero padded past each length; the result has the same shape and padding.
+    n_rows, width = words.shape
+    result = np.zeros_like(words)
+    if n_rows == 0 or width == 0:
+        return result
+    rows = np.arange(n_rows)
+    cols = np.arange(width)
+    remaining = cols < lengths[:, None]
+
+    strands = np.abs(words)
+    earlier = cols[:, None] < cols[None, :]
+    # conflicts[r, q, p]: letter q comes before p and the two cannot commute.
+    conflicts = earlier & (np.abs(strands[:, :, None] - strands[:, None, :]) <= 1)
+    big = np.iinfo(words.dtype).max
+
+    for step in range(int(lengths.max(initial=0))):
+        blocked = (remaining[:, :, None] & conflicts).any(axis=1)
+        candidates = np.where(remaining & ~blocked, words, big)
+        best = candidates.argmin(axis=1)
+        live = step < lengths
+        result[live, step] = words[rows[live], best[live]]
+        remaining[rows[live], best[live]] = False
+    return result
+
+_FNV_OFFSET = np.uint64(0xcbf29ce484222325)
+_FNV_PRIME = np.uint64(0x100000001b3)
+
+def batch_word_hashes(words: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+    # 64-bit FNV-1a over (length, letters) per row with a splitmix64 finish; only the
+    # first lengths[r] letters of each row count, so padding does not matter.
+    lengths = np.asarray(lengths)
+    with np.errstate(over='ignore'):
+        hashes = (_FNV_OFFSET ^ lengths.astype(np.uint64)) * _FNV_PRIME
+        for col in range(words.shape[1]):
+            live = col < lengths
+            if not live.any():
+                break
+            mixed = (hashes ^ (words[:, col].astype(np.int64) & 0xff).astype(np.uint64)) * _FNV_PRIME
+            hashes = np.where(live, mixed, hashes)
+        hashes ^= hashes >> np.uint64(30)
+        hashes *= np.uint64(0xbf58476d1ce4e5b9)
+        hashes ^= hashes >> np.uint64(27)
+        hashes *= np.uint64(0x94d049bb133111eb)
+        hashes ^= hashes >> np.uint64(31)
+    return hashes
+
+# Batch versions of the rolling hash in move_kernels: int64 arithmetic wraps modulo 2^64
+# just like the hash, so no step needs a modulo. Hashes are kept as int64 and handed out
+# as the same unsigned values move_kernels computes (see hash_values).
+_HASH_GROW = np.array(HASH_GROW, dtype=np.uint64).view(np.int64)
+_HASH_SHRINK = np.array(HASH_SHRINK, dtype=np.uint64).view(np.int64)
+
+@lru_cache(maxsize=None)
+def _hash_powers(width: int) -> np.ndarray:
+    return np.array(hash_powers(width)[:width], dtype=np.uint64).view(np.int64)
+
+def hash_values(hashes: np.ndarray) -> list:
+    # The int64 hashes as the unsigned Python ints move_kernels uses, e.g. for visited sets.
+    return hashes.view(np.uint64).tolist()
+
+def _prefix_hashes(words: np.ndarray) -> np.ndarray:
+    # (rows, width + 1): column i holds the hash of the first i letters of each row.
+    prefix = np.zeros((words.shape[0], words.shape[1] + 1), dtype=np.int64)
+    np.cumsum((words.astype(np.int64) + 128) * _hash_powers(words.shape[1]), axis=1, out=prefix[:, 1:])
+    return prefix
+
+def batch_rolling_hashes(words: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+    # One int64 per row; only the first lengths[r] letters count.
+    return _prefix_hashes(words)[np.arange(words.shape[0]), lengths]
+
+def batch_move_hashes(hashes: np.ndarray, words: np.ndarray, rows: np.ndarray, move_types: np.ndarray,
+                      indices: np.ndarray, generators: np.ndarray) -> np.ndarray:
+    # Hash after each move, applied to words[rows] (hashes holds one value per word row,
+    # moves may share a row). Computed from the letters before the move; values for
+    # invalid moves are meaningless. `words` needs two columns past the longest word, as
+    # for batch_apply_moves.
+    width = words.shape[1]
+    index = np.minimum(indices, width - 2)
+    gen_0 = words[rows, index].astype(np.int64)
+    gen_1 = words[rows, index + 1].astype(np.int64)
+    powers = _hash_powers(width + 1)
+    pw_0, pw_1, pw_2 = powers[index], powers[index + 1], powers[index + 2]
+    current = hashes[rows]
+
+    swap = pw_0 - pw_1
+    result = current + (gen_1 - gen_0) * np.where(move_types == R3, swap + pw_2, swap)
+
+    sel = np.flatnonzero(move_types >= REMOVE)
+    if len(sel):
+        # Every row's prefix hashes come from one cumsum; a remove or insert at i needs column i.
+        prefix = _prefix_hashes(words)[rows[sel], index[sel]]
+        pw_0, pw_1, current = pw_0[sel], pw_1[sel], current[sel]
+        removed = (gen_0[sel] + 128) * pw_0 + (gen_1[sel] + 128) * pw_1
+        pair = generators[sel].astype(np.int64)
+        inserted = (pair + 128) * pw_0 + (128 - pair) * pw_1
+        result[sel] = np.where(move_types[sel] == REMOVE, prefix + (current - prefix - removed) * _HASH_SHRINK,
+                               prefix + inserted + (current - prefix) * _HASH_GROW)
+    return result
+
+def batch_loop_masks(masks: np.ndarray, words: np.ndarray, hashes: np.ndarray, max_len: int,
+                     visited: List[set]) -> np.ndarray:
+    # Standard-layout masks without the commutes, R3s and removes that lead back to a
+    # word in the row's visited set of rolling hashes; `hashes` are the rows' own.
+    # Inserts stay: the env may draw their generator. A row left with no move at all
+    # keeps its original mask.
+    rows, cols = np.nonzero(masks[:, :INSERT * max_len])
+    move_types, indices = np.divmod(cols, max_len)
+    successors = batch_move_hashes(hashes, words, rows, move_types, indices, move_types * 0)
+    revisits = np.array([h in visited[r] for r, h in zip(rows.tolist(), hash_values(successors))], dtype=bool)
+    result = masks.copy()
+    result[rows[revisits], cols[revisits]] = False
+    stuck = ~result.any(axis=1)
+    result[stuck] = masks[stuck]
+    return result
@@ -0,0 +1,249 @@
+import numpy as np
+from typing import List, Optional, Union
+from gymnasium import spaces
+from gymnasium.utils import seeding
+from stable_baselines3.common.vec_env import VecEnv
+
+from .braid import INSERT
+from .braid_kernels import (batch_action_masks, batch_apply_moves, batch_loop_masks, batch_move_hashes,
+                            batch_rolling_hashes, hash_values)
+from .config import Configuration
+from .braid_dataset import BraidDataset
+from .curriculum import ProceduralSource
+from .encoding import BraidEncoding
+
+class BraidVecEnv(VecEnv):
+    # Native batch of BraidEnv instances: every word lives in one padded int matrix,
+    # masks and moves are computed for the whole batch with array ops.
+    #
+    # dataset_path may be a list of files: each reset then draws a file uniformly, so with
+    # config.OBS_ENCODING = "channels" one batch mixes strand counts (n_strands is the
+    # largest). Observations and actions follow config's layout, see src/encoding.py.
+    _PER_ENV = ("words", "lengths", "strands", "optimal_steps", "current_steps", "rngs", "hashes", "visited")
+
+    def __init__(self, dataset_path: Union[str, List[str], None], n_strands: int, max_len: int, config: Configuration,
+                 n_envs: int = 8, finetune_mode: bool = False, max_episode_steps: Optional[int] = None):
+        self.n_strands = n_strands
+        self.max_len = max_len
+        self.config = config
+        self.encoding = BraidEncoding(max_len, n_strands, config.OBS_ENCODING, config.ACTION_ORDER,
+                                      config.INSERT_GENERATORS)
+        self.finetune_mode = finetune_mode
+        self.max_episode_steps = max_episode_steps
+        self.render_mode = None
+        self.source = None
+        if dataset_path is not None:
+            self.set_dataset(dataset_path)
+        else:
+            self._set_arrays([BraidDataset.empty(n_strands)])
+
+        # Two spare columns so an unmasked insert on a full word cannot overflow before truncation.
+        self.words = np.zeros((n_envs, max_len + 2), dtype=np.int32)
+        self.lengths = np.zeros(n_envs, dtype=np.int64)
+        self.strands = np.full(n_envs, n_strands, dtype=np.int64)
+        self.optimal_steps = np.full(n_envs, -1, dtype=np.int64)
+        self.current_steps = np.zeros(n_envs, dtype=np.int64)
+        self.rngs = [None] * n_envs
+        self.actions = np.zeros(n_envs, dtype=np.int64)
+        # Rolling hash of each word (updated per move, see move_kernels) and the hashes
+        # seen in each env's episode, see Configuration.TRACK_LOOPS.
+        self.track_loops = config.TRACK_LOOPS or config.MASK_LOOPS
+        self.hashes = np.zeros(n_envs, dtype=np.int64)
+        self.visited = [set() for _ in range(n_envs)]
+
+        action_space = spaces.Discrete(self.encoding.n_actions)
+        super().__init__(n_envs, self.encoding.observation_space(), action_space)
+
+    def set_dataset(self, dataset_path: Union[str, List[str]], finetune_mode: Optional[bool] = None):
+        paths = [dataset_path] if isinstance(dataset_path, str) else list(dataset_path)
+        datasets = []
+        for path in paths:
+            datasets.append(BraidDataset.load(path))
+            if len(datasets[-1]) == 0:
+                print(f"Warning: No data found at {path}")
+        self._set_arrays(datasets)
+        if finetune_mode is not None:
+            self.finetune_mode = finetune_mode
+        self.close()
+
+    def _set_arrays(self, datasets: List[BraidDataset]):
+        # Empty files are skipped; braids with more strands than the env has are rejected.
+        datasets = [dataset for dataset in datasets if len(dataset)]
+        for dataset in datasets:
+            if self.encoding.per_braid_strands and dataset.n_strands > self.n_strands:
+                raise ValueError(f"Dataset has {dataset.n_strands} strands, env supports at most {self.n_strands}")
+        self.dataset_words = [dataset.padded_words(self.max_len) for dataset in datasets]
+        self.dataset_lengths = [np.minimum(dataset.lengths(), self.max_len) for dataset in datasets]
+        self.dataset_optimal = [np.asarray(dataset.optimal_steps, dtype=np.int64) for dataset in datasets]
+        self.dataset_strands = [dataset.n_strands for dataset in datasets]
+
+    def set_procedural(self, crossings: int, difficulty: int, n_strands: Optional[int] = None, **source_kwargs):
+        # Same as BraidEnv.set_procedural; one source feeds every env of the batch.
+        if self.source is not None and n_strands in (None, self.source.n_strands):
+            self.source.set_level(crossings, difficulty)
+            return
+        n_strands = n_strands or self.n_strands
+        self.close()
+        self.source = ProceduralSource(n_strands, crossings, difficulty, **source_kwargs)
+
+    def source_stats(self) -> dict:
+        return self.source.stats() if self.source is not None else {}
+
+    def _rng(self, env_idx: int) -> np.random.Generator:
+        if self.rngs[env_idx] is None:
+            self.rngs[env_idx], _ = seeding.np_random()
+        return self.rngs[env_idx]
+
+    def _reset_envs(self, env_indices: np.ndarray):
+        # Only the draws run per env (each from its own stream, in the order BraidEnv.reset
+        # makes them); the rows themselves are filled per dataset with array copies.
+        self.words[env_indices] = 0
+        self.current_steps[env_indices] = 0
+        self.optimal_steps[env_indices] = -1
+        if self.source is not None:
+            for env_idx in env_indices.tolist():
+                word = np.frombuffer(self.source.take(self._rng(env_idx)), dtype=np.int8)[:self.max_len]
+                self.words[env_idx, :len(word)] = word
+                self.lengths[env_idx] = len(word)
+            self.strands[env_indices] = self.source.n_strands
+        elif len(self.dataset_words) == 0:
+            self.lengths[env_indices] = 0
+        else:
+            n_datasets = len(self.dataset_words)
+            draws = np.zeros((len(env_indices), 2), dtype=np.int64)
+            for row, env_idx in enumerate(env_indices.tolist()):
+                rng = self._rng(env_idx)
+                # A single file keeps the original stream: one draw per reset.
+                d = rng.integers(n_datasets) if n_datasets > 1 else 0
+                draws[row] = d, rng.integers(len(self.dataset_words[d]))
+            for d in range(n_datasets):
+                selected = draws[:, 0] == d
+                if not selected.any():
+                    continue
+                rows, choices = env_indices[selected], draws[selected, 1]
+                self.words[rows, :self.max_len] = self.dataset_words[d][choices]
+                self.lengths[rows] = self.dataset_lengths[d][choices]
+                self.strands[rows] = self.dataset_strands[d]
+                self.optimal_steps[rows] = self.dataset_optimal[d][choices]
+        if self.track_loops:
+            self.hashes[env_indices] = batch_rolling_hashes(self.words[env_indices], self.lengths[env_indices])
+            for env_idx, h in zip(env_indices.tolist(), hash_values(self.hashes[env_indices])):
+                self.visited[env_idx] = {h}
+
+    def _get_obs(self) -> np.ndarray:
+        return self.encoding.encode(self.words, self.lengths, self.strands)
+
+    def reset(self):
+        for env_idx, seed in enumerate(self._seeds):
+            if seed is not None:
+                self.rngs[env_idx], _ = seeding.np_random(seed)
+        self._reset_envs(np.arange(self.num_envs))
+        self._reset_seeds()
+        self._reset_options()
+        return self._get_obs()
+
+    def action_masks(self) -> np.ndarray:
+        if not self.config.MASK_LOOPS:
+            return self.encoding.action_masks(self.words, self.lengths, self.strands)
+        masks = batch_action_masks(self.words, self.lengths, self.max_len)
+        masks = batch_loop_masks(masks, self.words, self.hashes, self.max_len, self.visited)
+        return self.encoding.from_standard_masks(masks, self.strands)
+
+    def step_async(self, actions: np.ndarray) -> None:
+        self.actions = np.asarray(actions, dtype=np.int64).reshape(self.num_envs)
+
+    def step_wait(self):
+        move_types, indices, generators = self.encoding.decode(self.actions)
+        generators = generators.astype(np.int32)
+
+        # Each env draws its insert generator from its own stream, exactly like BraidEnv.step.
+        insert_strands = self.encoding.insert_strands(self.strands)
+        for env_idx in np.flatnonzero((move_types == INSERT) & (generators == 0)):
+            generators[env_idx] = self._rng(env_idx).integers(1, insert_strands[env_idx])
+
+        prev_lengths = self.lengths.copy()
+        if self.track_loops:
+            hashes = batch_move_hashes(self.hashes, self.words, np.arange(self.num_envs), move_types, indices, generators)
+        success = batch_apply_moves(self.words, self.lengths, move_types, indices, generators)
+        self.current_steps += 1
+
+        rewards = np.full(self.num_envs, self.config.REWARD_STEP, dtype=np.float64)
+        rewards[~success] += self.config.REWARD_INVALID
+        rewards[success & (self.lengths < prev_lengths)] += self.config.REWARD_SHRINK
+        rewards[success & (self.lengths > prev_lengths)] += self.config.REWARD_GROW
+
+        loops = np.zeros(self.num_envs, dtype=bool)
+        if self.track_loops:
+            self.hashes[success] = hashes[success]
+            moved = np.flatnonzero(success)
+            for env_idx, h in zip(moved.tolist(), hash_values(hashes[moved])):
+                loops[env_idx] = h in self.visited[env_idx]
+                self.visited[env_idx].add(h)
+            rewards[loops] += self.config.REWARD_LOOP
+
+        terminated = success & (self.lengths == 0)
+        truncated = ~terminated & (self.lengths >= self.max_len)
+        rewards[truncated] += self.config.REWARD_INVALID * 2
+        if self.max_episode_steps is not None:
+            truncated |= ~terminated & (self.current_steps >= self.max_episode_steps)
+
+        bonus = np.zeros(self.num_envs)
+        if self.finetune_mode:
+            opt = self.optimal_steps
+            bonus[(opt > 0) & (self.current_steps <= opt + 2)] = 10.0
+            bonus[(opt > 0) & (self.current_steps <= opt)] = 50.0
+        rewards[terminated] = self.config.REWARD_SOLVED + bonus[terminated]
+
+        obs = self._get_obs()
+        dones = terminated | truncated
+        infos = [{"success": s, "is_success": t, "move_type": m, "loop": l, "TimeLimit.truncated": tr}
+                 for s, t, m, l, tr in zip(success.tolist(), terminated.tolist(), move_types.tolist(),
+                                           loops.tolist(), truncated.tolist())]
+
+        finished = np.flatnonzero(dones)
+        if len(finished):
+            for env_idx, terminal in zip(finished.tolist(), obs[finished]):
+                infos[env_idx]["terminal_observation"] = terminal
+            self._reset_envs(finished)
+            obs[finished] = self.encoding.encode(self.words[finished], self.lengths[finished], self.strands[finished])
+
+        return obs, rewards.astype(np.float32), dones, infos
+
+    def close(self) -> None:
+        if self.source is not None:
+            self.source.close()
+            self.source = None
+
+    def _indices(self, indices):
+        return list(self._get_indices(indices))
+
+    def get_attr(self, attr_name: str, indices=None) -> list:
+        # Per-env state comes back row by row; everything else is shared by the batch.
+        value = getattr(self, attr_name)
+        if attr_name in self._PER_ENV:
+            return [value[i] for i in self._indices(indices)]
+        return [value for _ in self._indices(indices)]
+
+    def set_attr(self, attr_name: str, value, indices=None) -> None:
+        indices = self._indices(indices)
+        if attr_name in self._PER_ENV:
+            for i in indices:
+                getattr(self, attr_name)[i] = value
+        elif len(indices) != self.num_envs:
+            raise ValueError(f"{attr_name} is shared by every env of a BraidVecEnv and cannot be set for a subset")
+        else:
+            setattr(self, attr_name, value)
+
+    def env_method(self, method_name: str, *method_args, indices=None, **method_kwargs) -> list:
+        indices = self._indices(indices)
+        if method_name == "action_masks":
+            masks = self.action_masks()
+            return [masks[i] for i in indices]
+        if len(indices) != self.num_envs:
+            raise ValueError(f"{method_name} acts on every env of a BraidVecEnv and cannot be called for a subset")
+
+        result = getattr(self, method_name)(*method_args, **method_kwargs)
+        return [result for _ in indices]
+
+    def env_is_wrapped(self, wrapper_class, indices=None) -> list:
+        return [False for _ in self._indices(indices)]
@@ -1,11 +1,15 @@
 from stable_baselines3.common.callbacks import BaseCallback
 import numpy as np
-from collections import defaultdict
+from collections import defaultdict, deque
 
 class BraidCallback(BaseCallback):
-    def __init__(self, verbose=0):
+    # With a Curriculum, the success rate over the last `window` episodes drives the
+    # level of procedural envs (BraidEnv.set_procedural) at the end of each rollout.
+    def __init__(self, verbose=0, curriculum=None, window=200):
         super(BraidCallback, self).__init__(verbose)
         self.episode_successes = []
+        self.recent_successes = deque(maxlen=window)
+        self.curriculum = curriculum
         self.action_counts = defaultdict(int)
         self.total_actions = 0
 
@@ -21,6 +25,7 @@ class BraidCallback(BaseCallback):
                 info = self.locals['infos'][i]
                 is_success = info.get("is_success", False)
                 self.episode_successes.append(is_success)
+                self.recent_successes.append(is_success)
 
         return True
 
@@ -30,6 +35,9 @@ class BraidCallback(BaseCallback):
             self.logger.record("custom/success_rate", success_rate)
             self.episode_successes = []
 
+        if self.curriculum is not None:
+            self._update_curriculum()
+
         if self.total_actions > 0:
             self.logger.record("actions/commute_ratio", self.action_counts[0] / self.total_actions)
             self.logger.record("actions/r3_ratio", self.action_counts[1] / self.total_actions)
@@ -37,4 +45,25 @@ class BraidCallback(BaseCallback):
             self.logger.record("actions/insert_ratio", self.action_counts[3] / self.total_actions)
             
             self.action_counts = defaultdict(int)
-            self.total_actions = 0
\ No newline at end of file
+            self.total_actions = 0
+
+    def rolling_success_rate(self) -> float:
+        return float(np.mean(self.recent_successes)) if self.recent_successes else 0.0
+
+    def _on_training_start(self) -> None:
+        if self.curriculum is not None:
+            self.training_env.env_method("set_procedural", *self.curriculum.level)
+
+    def _update_curriculum(self) -> None:
+        if self.curriculum.update(self.rolling_success_rate(), len(self.recent_successes)):
+            crossings, difficulty = self.curriculum.level
+            self.training_env.env_method("set_procedural", crossings, difficulty)
+            self.recent_successes.clear()
+            if self.verbose:
+                print(f"Curriculum: level {self.curriculum.index} ({crossings} crossings, {difficulty} moves)")
+
+        self.logger.record("curriculum/level", self.curriculum.index)
+        self.logger.record("curriculum/rolling_success_rate", self.rolling_success_rate())
+        recycled = [stats["recycled_share"] for stats in self.training_env.env_method("source_stats") if stats]
+        if recycled:
+            self.logger.record("curriculum/recycled_share", float(np.mean(recycled)))
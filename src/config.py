@@ -4,12 +4,14 @@ class Configuration:
     def __init__(self, n_strands = 3, max_len = 20, learning_rate = 0.0003, entropy_coef = 0.01, total_timesteps = 300_000, 
                  reward_step = -0.05, reward_invalid = -1.0, reward_loop = -2.0, reward_solved = 20.0, reward_shrink = 1.0,
                  reward_grow = -1.0, max_inference_steps = 50, data_dir = "./data/", model_dir = "./models/", log_dir = "./logs/", 
-                 metrics_dir = "./metrics/"):
+                 metrics_dir = "./metrics/", cache_dir = "./cache/", obs_encoding = "raw", action_order = "type_major",
+                 insert_generators = False, track_loops = False, mask_loops = False):
         
         self.DATA_DIR = data_dir
         self.MODEL_DIR = model_dir
         self.LOG_DIR = log_dir
         self.METRICS_DIR = metrics_dir
+        self.CACHE_DIR = cache_dir
 
         self.N_STRANDS = n_strands
         self.MAX_LEN = max_len
@@ -24,13 +26,27 @@ class Configuration:
         self.REWARD_SOLVED = reward_solved
         self.REWARD_SHRINK = reward_shrink
         self.REWARD_GROW = reward_grow
+        # Opt-in loop tracking: envs remember the words visited in each episode and a
+        # move back to one costs REWARD_LOOP. MASK_LOOPS (which implies tracking) also
+        # masks out the commute/R3/remove moves that would revisit one.
+        self.TRACK_LOOPS = track_loops
+        self.MASK_LOOPS = mask_loops
 
         self.MAX_INFERENCE_STEPS = max_inference_steps
 
+        # Observation / action layout, see src/encoding.py. "channels" allows mixing strand counts.
+        self.OBS_ENCODING = obs_encoding
+        self.ACTION_ORDER = action_order
+        self.INSERT_GENERATORS = insert_generators
+
     def get_dataset_path(self, level_name):
         os.makedirs(self.DATA_DIR, exist_ok=True)
         return os.path.join(self.DATA_DIR, f"{level_name}.txt")
 
+    def get_cache_path(self, name="solutions.sqlite"):
+        os.makedirs(self.CACHE_DIR, exist_ok=True)
+        return os.path.join(self.CACHE_DIR, name)
+
     def get_model_path(self, name):
         os.makedirs(self.MODEL_DIR, exist_ok=True)
         return os.path.join(self.MODEL_DIR, name)
\ No newline at end of file
@@ -0,0 +1,173 @@
+import multiprocessing
+import threading
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+
+from .batch_generator import generate_batch
+
+# The (crossings, difficulty) grid of the generated datasets, easiest first.
+DEFAULT_LEVELS = [(crossings, difficulty) for crossings in (8, 16, 24) for difficulty in (10, 50, 100)]
+
+# Shared producer state, one int64 each; see ProceduralSource.
+WRITTEN, READ, GENERATION, CROSSINGS, DIFFICULTY = range(5)
+
+def _produce(letters, lengths, state, lock, stop_event, n_strands, batch_size, rng):
+    # Producer loop for the thread or the worker process: both only see the shared buffers.
+    capacity = len(lengths)
+    letters = np.frombuffer(letters, dtype=np.int8).reshape(capacity, -1)
+    lengths = np.frombuffer(lengths, dtype=np.int32)
+    state = np.frombuffer(state, dtype=np.int64)
+    while not stop_event.is_set():
+        with lock:
+            # Sleep until a whole batch fits without overwriting unread braids; take() wakes us up.
+            while state[WRITTEN] - state[READ] > capacity - batch_size and not stop_event.is_set():
+                lock.wait(timeout=0.5)
+            crossings, difficulty, generation = int(state[CROSSINGS]), int(state[DIFFICULTY]), int(state[GENERATION])
+        if not stop_event.is_set():
+            _store(letters, lengths, state, lock, _generate(n_strands, batch_size, crossings, difficulty, rng), generation)
+
+def _generate(n_strands: int, batch_size: int, crossings: int, difficulty: int, rng: np.random.Generator):
+    batch = generate_batch(n_strands, batch_size, crossings, difficulty, seed=int(rng.integers(2 ** 63)))
+    return batch.padded_words(int(batch.lengths().max(initial=0)), dtype=np.int8), batch.lengths()
+
+def _store(letters, lengths, state, lock, batch, generation: int) -> bool:
+    words, word_lengths = batch
+    with lock:
+        if generation != state[GENERATION]:
+            return False
+        slots = (state[WRITTEN] + np.arange(len(words))) % len(lengths)
+        letters[slots, :words.shape[1]] = words
+        lengths[slots] = word_lengths
+        state[WRITTEN] += len(words)
+        return True
+
+class ProceduralSource:
+    # Fresh braids for env resets. A producer fills a fixed-size ring buffer with
+    # generate_batch output; take() never waits for it: it returns the oldest unread braid
+    # or, when the producer is behind, a random braid still in the buffer. A slow
+    # generator therefore costs diversity (see stats()), never rollout time. Only the
+    # first batch is generated synchronously, when the source is created.
+    #
+    # The producer is a daemon thread by default. processes=True runs it in a worker
+    # process writing into shared memory instead, so generation no longer holds the GIL
+    # between env steps. The thread stays the default: SubprocVecEnv workers are daemonic
+    # and cannot start processes of their own (the source falls back to the thread there),
+    # and inside a worker the thread only competes with that one env.
+    #
+    # set_level() switches crossings / difficulty: unread braids of the old level are
+    # dropped and a batch in flight is discarded, but old braids may still be recycled
+    # until the first batch of the new level lands.
+    def __init__(self, n_strands: int, crossings: int, difficulty: int, capacity: int = 4096,
+                 batch_size: int = 256, seed: Optional[int] = None, processes: bool = False,
+                 max_word_len: int = 128):
+        self.n_strands = n_strands
+        self.capacity = capacity
+        self.batch_size = min(batch_size, capacity)
+        self.max_word_len = max_word_len
+        self._check_level(crossings)
+
+        if processes and multiprocessing.current_process().daemon:
+            print("Warning: daemonic processes cannot start a braid producer process, using a thread")
+            processes = False
+        context = multiprocessing.get_context("spawn") if processes else None
+        self._letters = multiprocessing.RawArray("b", capacity * max_word_len)
+        self._lengths = multiprocessing.RawArray("i", capacity)
+        self._state = multiprocessing.RawArray("q", 5)
+        self.letters = np.frombuffer(self._letters, dtype=np.int8).reshape(capacity, max_word_len)
+        self.lengths = np.frombuffer(self._lengths, dtype=np.int32)
+        self.state = np.frombuffer(self._state, dtype=np.int64)
+        self.state[CROSSINGS], self.state[DIFFICULTY] = crossings, difficulty
+        self.fresh = 0
+        self.recycled = 0
+        self.rng = np.random.default_rng(seed)
+        self.lock = context.Condition() if processes else threading.Condition()
+        self.stop_event = context.Event() if processes else threading.Event()
+
+        self._store(_generate(n_strands, self.batch_size, crossings, difficulty, self.rng), 0)
+        args = (self._letters, self._lengths, self._state, self.lock, self.stop_event, n_strands, self.batch_size, self.rng)
+        if processes:
+            self.producer = context.Process(target=_produce, args=args, name="braid-prefetch", daemon=True)
+        else:
+            self.producer = threading.Thread(target=_produce, args=args, name="braid-prefetch", daemon=True)
+        self.producer.start()
+
+    @property
+    def crossings(self) -> int:
+        return int(self.state[CROSSINGS])
+
+    @property
+    def difficulty(self) -> int:
+        return int(self.state[DIFFICULTY])
+
+    def _check_level(self, crossings: int):
+        if crossings + crossings % 2 > self.max_word_len:
+            raise ValueError(f"{crossings} crossings do not fit in max_word_len={self.max_word_len}")
+
+    def _store(self, batch, generation: int) -> bool:
+        return _store(self.letters, self.lengths, self.state, self.lock, batch, generation)
+
+    def take(self, rng: np.random.Generator) -> bytes:
+        state = self.state
+        with self.lock:
+            state[READ] = max(state[READ], state[WRITTEN] - self.capacity)
+            if state[READ] < state[WRITTEN]:
+                slot = state[READ] % self.capacity
+                state[READ] += 1
+                self.fresh += 1
+                self.lock.notify()
+            else:
+                slot = int(rng.integers(min(state[WRITTEN], self.capacity)))
+                self.recycled += 1
+            return self.letters[slot, :self.lengths[slot]].tobytes()
+
+    def set_level(self, crossings: int, difficulty: int):
+        self._check_level(crossings)
+        with self.lock:
+            if (crossings, difficulty) == (self.crossings, self.difficulty):
+                return
+            self.state[CROSSINGS], self.state[DIFFICULTY] = crossings, difficulty
+            self.state[GENERATION] += 1
+            self.state[READ] = self.state[WRITTEN]
+            self.lock.notify()
+
+    def stats(self) -> dict:
+        with self.lock:
+            served = self.fresh + self.recycled
+            buffered = int(min(self.state[WRITTEN] - self.state[READ], self.capacity))
+            return {"fresh": self.fresh, "recycled": self.recycled, "buffered": buffered,
+                    "recycled_share": self.recycled / served if served else 0.0}
+
+    def close(self):
+        self.stop_event.set()
+        with self.lock:
+            self.lock.notify()
+        if isinstance(self.producer, multiprocessing.process.BaseProcess):
+            self.producer.join(timeout=5)
+
+class Curriculum:
+    # Ordered (crossings, difficulty) levels for ProceduralSource. update() takes a rolling
+    # success rate over n_episodes and moves up a level once it reaches promote_at (and
+    # down one below demote_at, if set), after at least min_episodes at the level.
+    def __init__(self, levels: Sequence[Tuple[int, int]] = DEFAULT_LEVELS, promote_at: float = 0.8,
+                 demote_at: Optional[float] = None, min_episodes: int = 100, start: int = 0):
+        self.levels = list(levels)
+        self.promote_at = promote_at
+        self.demote_at = demote_at
+        self.min_episodes = min_episodes
+        self.index = start
+
+    @property
+    def level(self) -> Tuple[int, int]:
+        return self.levels[self.index]
+
+    def update(self, success_rate: float, n_episodes: int) -> bool:
+        if n_episodes < self.min_episodes:
+            return False
+        if success_rate >= self.promote_at and self.index < len(self.levels) - 1:
+            self.index += 1
+            return True
+        if self.demote_at is not None and success_rate < self.demote_at and self.index > 0:
+            self.index -= 1
+            return True
+        return False
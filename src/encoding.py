@@ -0,0 +1,107 @@
+from typing import Tuple
+
+import numpy as np
+
+from .braid import INSERT
+from .braid_kernels import batch_action_masks
+
+OBS_ENCODINGS = ("raw", "channels")
+ACTION_ORDERS = ("type_major", "position_major")
+
+class BraidEncoding:
+    # How words become observations and policy actions become moves. The default ("raw",
+    # "type_major", random inserts) is the original layout: the padded word itself, and
+    # action = move_type * max_len + index.
+    #
+    # "channels" is strand-count agnostic: per position |generator| / (n - 1) and its sign,
+    # then n / max_strands and length / max_len, all in [-1, 1]. Each braid's own n is used
+    # for the features and for the insert generators, so one batch can mix strand counts.
+    # "raw" keeps using max_strands for inserts, as BraidEnv always has.
+    #
+    # Each position has slots commute, R3, remove and insert; insert_generators splits the
+    # insert slot into one per generator (1 .. max_strands - 1, masked above n - 1) so the
+    # policy picks the generator instead of the env's RNG. "position_major" orders actions
+    # as index * n_slots + slot instead of slot * max_len + index.
+    def __init__(self, max_len: int, max_strands: int, obs_encoding: str = "raw", action_order: str = "type_major",
+                 insert_generators: bool = False):
+        if obs_encoding not in OBS_ENCODINGS:
+            raise ValueError(f"Unknown observation encoding {obs_encoding!r}, expected one of {OBS_ENCODINGS}")
+        if action_order not in ACTION_ORDERS:
+            raise ValueError(f"Unknown action order {action_order!r}, expected one of {ACTION_ORDERS}")
+        self.max_len = max_len
+        self.max_strands = max_strands
+        self.obs_encoding = obs_encoding
+        self.action_order = action_order
+        self.insert_generators = insert_generators
+        self.n_insert_slots = max_strands - 1 if insert_generators else 1
+        self.n_slots = INSERT + self.n_insert_slots
+        self.n_actions = self.n_slots * max_len
+        self.per_braid_strands = obs_encoding != "raw"
+        self.is_default = obs_encoding == "raw" and action_order == "type_major" and not insert_generators
+
+    @classmethod
+    def from_config(cls, config) -> "BraidEncoding":
+        return cls(config.MAX_LEN, config.N_STRANDS, config.OBS_ENCODING, config.ACTION_ORDER, config.INSERT_GENERATORS)
+
+    def observation_space(self):
+        from gymnasium import spaces
+
+        if self.obs_encoding == "raw":
+            return spaces.Box(low=-(self.max_strands - 1), high=max(self.max_strands - 1, 100),
+                              shape=(self.max_len,), dtype=np.int32)
+        return spaces.Box(low=-1.0, high=1.0, shape=(2 * self.max_len + 2,), dtype=np.float32)
+
+    def insert_strands(self, braid_strands: np.ndarray) -> np.ndarray:
+        # Strand count that bounds the insert generators of each row.
+        if self.per_braid_strands:
+            return np.asarray(braid_strands, dtype=np.int64)
+        return np.full(len(braid_strands), self.max_strands, dtype=np.int64)
+
+    def encode(self, words: np.ndarray, lengths: np.ndarray, strands: np.ndarray) -> np.ndarray:
+        # `words` zero padded and at least max_len wide, `strands` the n of each row's braid.
+        words = words[:, :self.max_len]
+        if self.obs_encoding == "raw":
+            return words.astype(np.int32, copy=True)
+
+        obs = np.zeros((len(words), 2 * self.max_len + 2), dtype=np.float32)
+        obs[:, :self.max_len] = np.abs(words) / np.maximum(np.asarray(strands)[:, None] - 1, 1)
+        obs[:, self.max_len:2 * self.max_len] = np.sign(words)
+        obs[:, -2] = np.asarray(strands) / self.max_strands
+        obs[:, -1] = np.asarray(lengths) / self.max_len
+        return obs
+
+    def from_standard_masks(self, masks: np.ndarray, strands: np.ndarray) -> np.ndarray:
+        # Converts batch_action_masks / BraidEnv.action_masks output to this layout.
+        if self.is_default:
+            return masks
+        slots = masks.reshape(len(masks), INSERT + 1, self.max_len)
+        if self.insert_generators:
+            generators = np.arange(1, self.max_strands)
+            allowed = generators[None, :] < self.insert_strands(strands)[:, None]
+            inserts = slots[:, INSERT:INSERT + 1, :] & allowed[:, :, None]
+            slots = np.concatenate([slots[:, :INSERT], inserts], axis=1)
+        if self.action_order == "position_major":
+            slots = slots.transpose(0, 2, 1)
+        return np.ascontiguousarray(slots).reshape(len(masks), self.n_actions)
+
+    def action_masks(self, words: np.ndarray, lengths: np.ndarray, strands: np.ndarray) -> np.ndarray:
+        # `words` must be at least max_len + 2 wide, as for batch_action_masks.
+        return self.from_standard_masks(batch_action_masks(words, lengths, self.max_len), strands)
+
+    def decode(self, actions: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        # (move_types, indices, generators); the generator is 0 where the env draws it.
+        actions = np.asarray(actions, dtype=np.int64)
+        if self.action_order == "type_major":
+            slots, indices = np.divmod(actions, self.max_len)
+        else:
+            indices, slots = np.divmod(actions, self.n_slots)
+        move_types = np.minimum(slots, INSERT)
+        generators = slots - INSERT + 1 if self.insert_generators else np.zeros_like(slots)
+        generators = np.where(move_types == INSERT, generators, 0)
+        return move_types, indices, generators
+
+    def action(self, move_type: int, index: int, generator: int = 0) -> int:
+        slot = move_type + (generator - 1 if move_type == INSERT and self.insert_generators else 0)
+        if self.action_order == "type_major":
+            return slot * self.max_len + index
+        return index * self.n_slots + slot
@@ -0,0 +1,160 @@
+import concurrent.futures
+import os
+import time
+from typing import List, Optional
+
+import numpy as np
+
+from .braid import INSERT
+from .braid_dataset import BraidDataset, shared_dataset_path
+from .braid_kernels import (batch_action_masks, batch_apply_moves, batch_loop_masks, batch_move_hashes,
+                            batch_rolling_hashes, hash_values)
+from .config import Configuration
+from .encoding import BraidEncoding
+
+class BatchedEvaluator:
+    # Runs every episode of a test file in lockstep: one padded word matrix, one
+    # batched policy forward per step, and finished episodes drop out of the batch.
+    # Moves follow BraidEnv.step / BraidAgent.solve exactly (deterministic actions,
+    # random insert generator, truncation once a word reaches max_len, loop masking
+    # with config.MASK_LOOPS).
+    #
+    # `policy` is anything with predict(obs, action_masks=..., deterministic=True),
+    # e.g. a MaskablePPO model or its policy.
+    def __init__(self, policy, config: Configuration, max_steps: int = 200, seed: Optional[int] = None):
+        self.policy = policy
+        self.config = config
+        self.max_steps = max_steps
+        self.rng = np.random.default_rng(seed)
+        self.encoding = BraidEncoding.from_config(config)
+
+    def run(self, dataset: BraidDataset, episodes: Optional[int] = None) -> dict:
+        # episodes=None evaluates every braid once; otherwise braids are drawn with
+        # replacement, like repeated BraidEnv.reset() calls.
+        max_len = self.config.MAX_LEN
+        if episodes is None:
+            rows = np.arange(len(dataset))
+        else:
+            rows = self.rng.integers(len(dataset), size=episodes) if len(dataset) else np.zeros(0, dtype=np.int64)
+
+        n = len(rows)
+        words = np.zeros((n, max_len + 2), dtype=np.int32)
+        words[:, :max_len] = dataset.padded_words(max_len)[rows]
+        lengths = np.minimum(dataset.lengths(), max_len)[rows].astype(np.int64)
+        optimal = np.asarray(dataset.optimal_steps, dtype=np.int64)[rows]
+        strands = np.full(n, dataset.n_strands, dtype=np.int64)
+        insert_strands = dataset.n_strands if self.encoding.per_braid_strands else self.config.N_STRANDS
+
+        solved = lengths == 0
+        steps = np.zeros(n, dtype=np.int64)
+        move_counts = np.zeros(4, dtype=np.int64)
+        active = np.flatnonzero(~solved)
+        visited = None
+        if self.config.MASK_LOOPS:
+            hashes = batch_rolling_hashes(words, lengths)
+            visited = [{h} for h in hash_values(hashes)]
+
+        for _ in range(self.max_steps):
+            if len(active) == 0:
+                break
+
+            batch_words, batch_lengths, batch_strands = words[active], lengths[active], strands[active]
+            if visited is None:
+                masks = self.encoding.action_masks(batch_words, batch_lengths, batch_strands)
+            else:
+                masks = batch_action_masks(batch_words, batch_lengths, max_len)
+                masks = batch_loop_masks(masks, batch_words, hashes[active], max_len, [visited[r] for r in active])
+                masks = self.encoding.from_standard_masks(masks, batch_strands)
+            obs = self.encoding.encode(batch_words, batch_lengths, batch_strands)
+            actions, _ = self.policy.predict(obs, action_masks=masks, deterministic=True)
+            actions = np.asarray(actions, dtype=np.int64).reshape(len(active))
+
+            move_types, indices, generators = self.encoding.decode(actions)
+            generators = generators.astype(np.int32)
+            inserts = (move_types == INSERT) & (generators == 0)
+            generators[inserts] = self.rng.integers(1, insert_strands, size=int(inserts.sum()))
+
+            if visited is not None:
+                batch_hashes = batch_move_hashes(hashes[active], batch_words, np.arange(len(active)), move_types,
+                                                 indices, generators)
+            success = batch_apply_moves(batch_words, batch_lengths, move_types, indices, generators)
+            words[active], lengths[active] = batch_words, batch_lengths
+            steps[active] += 1
+            move_counts += np.bincount(move_types, minlength=4)
+            if visited is not None:
+                moved = active[success]
+                hashes[moved] = batch_hashes[success]
+                for r, h in zip(moved.tolist(), hash_values(batch_hashes[success])):
+                    visited[r].add(h)
+
+            finished = success & (batch_lengths == 0)
+            solved[active[finished]] = True
+            active = active[~finished & (batch_lengths < max_len)]
+
+        return self._summarize(solved, steps, optimal, move_counts)
+
+    def _summarize(self, solved: np.ndarray, steps: np.ndarray, optimal: np.ndarray, move_counts: np.ndarray) -> dict:
+        episodes = len(solved)
+        gaps = (steps - optimal)[solved & (optimal > 0)]
+        return {
+            "episodes": episodes,
+            "solved": int(solved.sum()),
+            "optimal": int((gaps == 0).sum()),
+            "Score": solved.mean() * 100 if episodes else 0,
+            "Optimal_Score": (gaps == 0).sum() / episodes * 100 if episodes else 0,
+            "Avg_Gap": float(gaps.mean()) if len(gaps) else -1,
+            "steps": int(steps.sum()),
+            "move_counts": move_counts.tolist()
+        }
+
+def evaluate_file(policy, dataset_path: str, config: Configuration, episodes: Optional[int] = 20,
+                  max_steps: int = 200, seed: Optional[int] = None) -> dict:
+    start_time = time.time()
+    evaluator = BatchedEvaluator(policy, config, max_steps=max_steps, seed=seed)
+    result = evaluator.run(BraidDataset.load(dataset_path), episodes)
+    result["File"] = os.path.basename(dataset_path)
+    result["elapsed"] = time.time() - start_time
+    return result
+
+def _init_worker():
+    # One torch thread per worker process; the pool supplies the parallelism.
+    import torch
+    torch.set_num_threads(1)
+
+def evaluate_files(policy, dataset_paths: List[str], config: Configuration, episodes: Optional[int] = 20,
+                   max_steps: int = 200, seed: Optional[int] = None, n_workers: int = 1, verbose: bool = True) -> List[dict]:
+    # Per-file results in input order, in the same shape as the notebook's results table.
+    # With n_workers > 1 the policy is pickled once per file and files run in separate processes.
+    seeds = np.random.SeedSequence(seed).spawn(len(dataset_paths))
+    seeds = [int(s.generate_state(1)[0]) for s in seeds]
+    start_time = time.time()
+    results = [None] * len(dataset_paths)
+
+    def report(result):
+        if verbose:
+            gap_str = f"{result['Avg_Gap']:.1f}" if result["Avg_Gap"] != -1 else "N/A"
+            rate = result["episodes"] / result["elapsed"] if result["elapsed"] > 0 else float("inf")
+            print(f"Testing on {result['File']}... Score: {result['Score']:.0f}% | Opt: {result['Optimal_Score']:.0f}% "
+                  f"| Gap: {gap_str} | {rate:.0f} episodes/s")
+
+    if n_workers > 1:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=n_workers, initializer=_init_worker) as executor:
+            futures = {
+                executor.submit(evaluate_file, policy, shared_dataset_path(path), config, episodes, max_steps, s): i
+                for i, (path, s) in enumerate(zip(dataset_paths, seeds))
+            }
+            for future in concurrent.futures.as_completed(futures):
+                i = futures[future]
+                results[i] = future.result()
+                results[i]["File"] = os.path.basename(dataset_paths[i])
+                report(results[i])
+    else:
+        for i, (path, s) in enumerate(zip(dataset_paths, seeds)):
+            results[i] = evaluate_file(policy, path, config, episodes, max_steps, s)
+            report(results[i])
+
+    elapsed = time.time() - start_time
+    total = sum(r["episodes"] for r in results)
+    if verbose and elapsed > 0:
+        print(f"Evaluated {total} episodes over {len(results)} files in {elapsed:.1f}s ({total / elapsed:.0f} episodes/s)")
+    return results
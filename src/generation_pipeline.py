@@ -0,0 +1,266 @@
+import concurrent.futures
+import os
+import shutil
+import time
+from typing import List, Optional
+
+from .config import Configuration
+from .braid_dataset import BraidDataset, shared_dataset_path
+from .braid_generator import BraidGenerator
+from .optimal_solver import AStarSolver
+from .solution_cache import SolutionCache
+
+class DatasetJob:
+    # One output file, split into fixed-size shards. Each shard has its own seed
+    # derived from the dataset seed, so the merged file only depends on the seeds
+    # and the shard size, never on scheduling order or on interruptions.
+    #
+    # vectorized jobs without optimal labels generate each shard as one NumPy batch
+    # (see batch_generator); the words differ from the scalar generator's, the
+    # distribution does not.
+    def __init__(self, path: str, n_strands: int, crossings: int, difficulty: int, count: int,
+                 compute_optimal: bool, seed: int, shard_size: int, vectorized: bool = False):
+        self.path = path
+        self.n_strands = n_strands
+        self.crossings = crossings
+        self.difficulty = difficulty
+        self.count = count
+        self.compute_optimal = compute_optimal
+        self.seed = seed
+        self.shard_size = shard_size
+        self.vectorized = vectorized and not compute_optimal
+
+    @property
+    def name(self) -> str:
+        return os.path.splitext(os.path.basename(self.path))[0]
+
+    @property
+    def shard_dir(self) -> str:
+        return self.path + ".shards"
+
+    def shards(self) -> List["ShardTask"]:
+        tasks = []
+        for index, start in enumerate(range(0, self.count, self.shard_size)):
+            size = min(self.shard_size, self.count - start)
+            tasks.append(ShardTask(self, index, size))
+        return tasks
+
+    def estimated_cost(self) -> float:
+        # Rough relative cost used to schedule the slowest shards first.
+        cost = self.crossings * (1 + self.difficulty / 10)
+        if self.vectorized:
+            cost /= 50
+        if self.compute_optimal:
+            cost *= 50 * self.n_strands ** 2 * (self.crossings / 8) ** 2
+        return cost
+
+class ShardTask:
+    def __init__(self, job: DatasetJob, index: int, size: int):
+        self.job = job
+        self.index = index
+        self.size = size
+
+    @property
+    def seed(self) -> int:
+        return self.job.seed * 100_003 + self.index
+
+    @property
+    def path(self) -> str:
+        return os.path.join(self.job.shard_dir, f"shard_{self.index:05d}.txt")
+
+    def completed_records(self) -> List[str]:
+        # Complete lines already on disk; a torn trailing line from a crash is dropped.
+        if not os.path.exists(self.path):
+            return []
+        with open(self.path, 'r') as file:
+            content = file.read()
+        lines = content.split("\n")
+        return [line + "\n" for line in lines[:-1]]
+
+    def is_complete(self) -> bool:
+        return len(self.completed_records()) >= self.size
+
+def run_shard(task: ShardTask, cache_path: Optional[str] = None) -> dict:
+    job = task.job
+    start_time = time.time()
+    config = Configuration()
+    cache = SolutionCache(cache_path) if cache_path and job.compute_optimal else None
+    gen = BraidGenerator(n_strands=job.n_strands, config=config, seed=task.seed, cache=cache)
+
+    done = task.completed_records()
+    if job.vectorized:
+        # The shard is one seeded batch: regenerate it and keep the records that match.
+        batch = gen.generate_batch(task.size, job.crossings, job.difficulty, seed=task.seed)
+        records = [f"{batch.word(i).tolist()}\n" for i in range(len(batch))]
+        if done != records[:len(done)]:
+            done = []
+        next_record = iter(records[len(done):]).__next__
+    else:
+        # Replay the generator over the records that survived the last run (cheap, no
+        # solving) so the RNG continues exactly where it stopped, and check they match.
+        for record in done:
+            braid = gen.generate_braid(job.crossings, job.difficulty)
+            if not record.startswith(str(braid.word)):
+                gen = BraidGenerator(n_strands=job.n_strands, config=config, seed=task.seed, cache=cache)
+                done = []
+                break
+
+        def next_record():
+            return gen.format_record(gen.generate_braid(job.crossings, job.difficulty), job.compute_optimal)
+
+    os.makedirs(job.shard_dir, exist_ok=True)
+    resumed = len(done)
+    with open(task.path, 'w' if resumed == 0 else 'r+') as file:
+        file.seek(sum(len(record) for record in done))
+        file.truncate()
+
+        for _ in range(task.size - resumed):
+            file.write(next_record())
+            file.flush()
+        os.fsync(file.fileno())
+
+    elapsed = time.time() - start_time
+    return {
+        "job": job.name,
+        "shard": task.index,
+        "generated": task.size - resumed,
+        "resumed": resumed,
+        "elapsed": elapsed,
+        "cache": cache.summary() if cache else None
+    }
+
+def merge_shards(job: DatasetJob):
+    # Concatenate shards in index order behind the usual header, then drop them.
+    tmp_path = job.path + ".tmp"
+    with open(tmp_path, 'w') as out:
+        out.write(BraidGenerator.dataset_header(job.count, job.n_strands, job.crossings, job.difficulty, job.compute_optimal))
+        for task in job.shards():
+            out.writelines(task.completed_records()[:task.size])
+    os.replace(tmp_path, job.path)
+    shutil.rmtree(job.shard_dir, ignore_errors=True)
+
+def run_jobs(jobs: List[DatasetJob], max_workers: Optional[int] = None, cache_path: Optional[str] = None):
+    pending = {}
+    tasks = []
+    for job in jobs:
+        if os.path.exists(job.path):
+            print(f"[SKIP] {os.path.basename(job.path)} exists")
+            continue
+        shards = job.shards()
+        remaining = [task for task in shards if not task.is_complete()]
+        pending[job.name] = (job, len(remaining))
+        if not remaining:
+            merge_shards(job)
+            print(f"[DONE] {os.path.basename(job.path)} (merged from existing shards)")
+            pending.pop(job.name)
+        tasks.extend(remaining)
+
+    tasks.sort(key=lambda task: task.job.estimated_cost() * task.size, reverse=True)
+    total_braids = sum(task.size for task in tasks)
+    print(f"Scheduling {len(tasks)} shards ({total_braids} braids) across {len(pending)} datasets")
+
+    start_time = time.time()
+    braids_done = 0
+    shards_done = 0
+    cache_totals = {"hits": 0, "misses": 0, "equivalent_hits": 0}
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(run_shard, task, cache_path): task for task in tasks}
+
+        for future in concurrent.futures.as_completed(futures):
+            task = futures[future]
+            try:
+                stats = future.result()
+            except Exception as e:
+                print(f"[FAIL] {task.job.name} shard {task.index}: {e}")
+                continue
+
+            shards_done += 1
+            braids_done += task.size
+            rate = stats["generated"] / stats["elapsed"] if stats["elapsed"] > 0 else float("inf")
+            overall = braids_done / (time.time() - start_time)
+            resumed = f", resumed after {stats['resumed']}" if stats["resumed"] else ""
+            print(f"[SHARD {shards_done}/{len(tasks)}] {stats['job']} #{stats['shard']}: "
+                  f"{stats['generated']} braids in {stats['elapsed']:.1f}s ({rate:.1f}/s{resumed}) | overall {overall:.1f} braids/s")
+
+            if stats["cache"]:
+                for key in cache_totals:
+                    cache_totals[key] += stats["cache"][key]
+
+            job, remaining = pending[task.job.name]
+            pending[task.job.name] = (job, remaining - 1)
+            if remaining - 1 == 0:
+                merge_shards(job)
+                print(f"[DONE] {os.path.basename(job.path)}")
+
+    return cache_totals
+
+def relabel_dataset(path: str, max_time_sec: float = 10.0, max_nodes: Optional[int] = None,
+                    workers: Optional[int] = None, relabel_all: bool = False, max_len: Optional[int] = None,
+                    flush_every: int = 100, trajectory_path: Optional[str] = None, **solver_kwargs) -> dict:
+    # Fills the optimal_steps column of an existing dataset using AStarSolver.solve_many.
+    # Labels go straight into the binary file through a writable memory map, flushed
+    # every flush_every results, so an interrupted run keeps what it solved and a rerun
+    # only solves braids still at -1 (all of them with relabel_all). A text file is
+    # labelled through its sibling .bin and then rewritten atomically, every record
+    # with a label (-1 where the budget ran out), like compute_optimal output.
+    # trajectory_path appends the solutions themselves to a TrajectoryStore.
+    binary = shared_dataset_path(path)
+    dataset = BraidDataset.load(binary, writable=True)
+    if max_len is None:
+        max_len = Configuration().MAX_LEN
+    solver = AStarSolver(dataset.n_strands, max_len, **solver_kwargs)
+
+    todo = [i for i in range(len(dataset)) if relabel_all or dataset.optimal_steps[i] < 0]
+    name = os.path.basename(path)
+    print(f"[LABEL] {name}: {len(todo)}/{len(dataset)} braids to solve")
+
+    start_time = time.time()
+    totals = {"solved": 0, "timed_out": 0, "out_of_nodes": 0, "nodes_expanded": 0}
+    trajectories = None
+    if trajectory_path:
+        from .trajectory_store import TrajectoryWriter
+
+        trajectories = TrajectoryWriter(trajectory_path, dataset.n_strands, dict(dataset.metadata), append=True)
+    for done, result in enumerate(solver.solve_many((dataset[i] for i in todo), max_time_sec, max_nodes, workers), 1):
+        stats = result["stats"]
+        dataset.optimal_steps[todo[result["index"]]] = len(result["path"]) if result["path"] is not None else -1
+        totals["solved"] += result["path"] is not None
+        totals["timed_out"] += stats["timed_out"]
+        totals["out_of_nodes"] += stats["out_of_nodes"]
+        totals["nodes_expanded"] += stats["nodes_expanded"]
+        if trajectories is not None and result["path"] is not None:
+            trajectories.add(dataset.word(todo[result["index"]]).tobytes(), result["path"])
+
+        if done % flush_every == 0 or done == len(todo):
+            dataset.optimal_steps.flush()
+            if trajectories is not None:
+                # Labelled braids are skipped on a rerun, so their solutions must be on disk too.
+                trajectories.flush()
+            rate = done / max(time.time() - start_time, 1e-9)
+            print(f"[LABEL] {name}: {done}/{len(todo)} ({totals['solved']} solved, {totals['timed_out']} over budget) "
+                  f"| {rate:.2f} braids/s", flush=True)
+
+    if path != binary:
+        _write_labelled_text(path, dataset)
+        # The text file is now newer; the .bin holds the same labels, so keep loads using it.
+        os.utime(binary)
+    totals.update(labelled=len(todo), elapsed=time.time() - start_time)
+    return totals
+
+def _write_labelled_text(path: str, dataset: BraidDataset):
+    with open(path, 'r') as file:
+        header = file.readline()
+    metadata = dataset.metadata
+    if {"crossings", "difficulty"} <= metadata.keys():
+        # optimal= records that the solver ran over the file (as with compute_optimal), not
+        # that every braid got a label: the ones over budget stay at -1 either way.
+        header = BraidGenerator.dataset_header(len(dataset), dataset.n_strands, metadata["crossings"],
+                                               metadata["difficulty"], True)
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w') as out:
+        out.write(header)
+        for i in range(len(dataset)):
+            out.write(f"{dataset.word(i).tolist()}, {int(dataset.optimal_steps[i])}\n")
+    os.replace(tmp_path, path)
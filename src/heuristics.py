@@ -0,0 +1,57 @@
+from collections import Counter
+
+# Heuristics take a state key (signed-byte word, see Braid.key) and return a lower
+# bound on the number of moves to the empty word. All of them are consistent
+# (they change by at most 1 across any move), so A* labels stay optimal.
+
+class Heuristic:
+    name = "heuristic"
+
+    def __call__(self, key: bytes) -> float:
+        raise NotImplementedError
+
+class LengthHeuristic(Heuristic):
+    # Every move removes at most two letters.
+    name = "length"
+
+    def __call__(self, key: bytes) -> float:
+        return len(key) / 2
+
+class ExponentImbalanceHeuristic(Heuristic):
+    # Remove/insert change the positive and negative counts of one generator
+    # together and commutations change nothing, so any imbalance between them
+    # must be fixed by R3 moves, each of which shifts the total imbalance by at most 2.
+    name = "exponent_imbalance"
+
+    def __call__(self, key: bytes) -> float:
+        counts = Counter(key)
+        imbalance = sum(abs(count - counts[256 - byte]) for byte, count in counts.items() if byte < 128)
+        imbalance += sum(count for byte, count in counts.items() if byte >= 128 and 256 - byte not in counts)
+        return len(key) / 2 + (imbalance + 1) // 2
+
+class BlockedHeuristic(Heuristic):
+    # A non-empty word without an adjacent inverse pair needs at least one
+    # non-shrinking move before the first removal.
+    name = "blocked"
+
+    def __call__(self, key: bytes) -> float:
+        for byte in set(key):
+            if bytes((byte, -byte & 0xFF)) in key:
+                return len(key) / 2
+        return len(key) / 2 + (1 if key else 0)
+
+class MaxHeuristic(Heuristic):
+    # The maximum of consistent heuristics is consistent.
+    def __init__(self, *heuristics: Heuristic):
+        self.heuristics = heuristics
+        self.name = "max(" + ",".join(h.name for h in heuristics) + ")"
+
+    def __call__(self, key: bytes) -> float:
+        return max(h(key) for h in self.heuristics)
+
+HEURISTICS = {
+    "length": LengthHeuristic,
+    "exponent_imbalance": ExponentImbalanceHeuristic,
+    "blocked": BlockedHeuristic,
+    "combined": lambda: MaxHeuristic(ExponentImbalanceHeuristic(), BlockedHeuristic())
+}
@@ -0,0 +1,271 @@
+import os
+from array import array
+from itertools import accumulate
+from typing import Iterator, List, Sequence, Tuple
+
+# Move validity and application for a single word, shared by Braid, BraidEnv, BraidGenerator
+# and AStarSolver (braid_kernels.py holds the NumPy batch versions). Words are sequences of
+# signed generators: array('b') / bytes keys, or lists for the pure-Python helpers.
+#
+# At index i at most one of commute (|a| and |b| two or more apart), R3 (a b a with |a|, |b|
+# adjacent and a, b of the same sign) and remove (b == -a) applies, so move_codes() gives
+# each index one code. With BRAID_KERNELS=numba (and numba installed) move_codes and the
+# solver's successor enumeration classify the word in a jitted loop; the default stays pure
+# Python so importing the core modules does not pull in NumPy.
+COMMUTE, R3, REMOVE, INSERT = 0, 1, 2, 3
+NO_MOVE = -1
+
+def can_commute(word: Sequence[int], index: int) -> bool:
+    if index < 0 or index >= len(word) - 1:
+        return False
+    return abs(abs(word[index]) - abs(word[index + 1])) >= 2
+
+def can_r3(word: Sequence[int], index: int) -> bool:
+    if index < 0 or index >= len(word) - 2:
+        return False
+    gen_0, gen_1 = word[index], word[index + 1]
+    return gen_0 == word[index + 2] and abs(abs(gen_0) - abs(gen_1)) == 1 and gen_0 * gen_1 > 0
+
+def can_remove(word: Sequence[int], index: int) -> bool:
+    if index < 0 or index >= len(word) - 1:
+        return False
+    return word[index] == -word[index + 1]
+
+def can_insert(word: Sequence[int], index: int) -> bool:
+    return 0 <= index <= len(word)
+
+CHECKS = {COMMUTE: can_commute, R3: can_r3, REMOVE: can_remove, INSERT: can_insert}
+
+def is_valid(word: Sequence[int], move_type: int, index: int) -> bool:
+    check = CHECKS.get(move_type)
+    return check is not None and check(word, index)
+
+def python_move_codes(word: Sequence[int]) -> List[int]:
+    if isinstance(word, (bytes, bytearray)):
+        word = array('b', word)
+    n = len(word)
+    codes = [NO_MOVE] * n
+    for i in range(n - 1):
+        gen_0, gen_1 = word[i], word[i + 1]
+        dist = abs(abs(gen_0) - abs(gen_1))
+        if dist >= 2:
+            codes[i] = COMMUTE
+        elif dist == 1:
+            if i < n - 2 and word[i + 2] == gen_0 and gen_0 * gen_1 > 0:
+                codes[i] = R3
+        elif gen_0 == -gen_1:
+            codes[i] = REMOVE
+    return codes
+
+def refresh_flags(word: Sequence[int], flags: Tuple[bytearray, bytearray, bytearray], start: int, stop: int):
+    # Recomputes the (commute, r3, remove) flags of indices [start, stop).
+    commute, r3, remove = flags
+    for i in range(max(start, 0), min(stop, len(word))):
+        commute[i] = can_commute(word, i)
+        r3[i] = can_r3(word, i)
+        remove[i] = can_remove(word, i)
+
+def move_flags(word: Sequence[int]) -> Tuple[bytearray, bytearray, bytearray]:
+    flags = tuple(bytearray(len(word)) for _ in range(3))
+    for i, code in enumerate(move_codes(word)):
+        if code != NO_MOVE:
+            flags[code][i] = 1
+    return flags
+
+def enumerate_moves(word: Sequence[int]) -> Tuple[List[int], List[int], List[int]]:
+    # Indices of the valid (commute, r3, remove) moves, each in increasing order.
+    moves = ([], [], [])
+    for i, code in enumerate(move_codes(word)):
+        if code != NO_MOVE:
+            moves[code].append(i)
+    return moves
+
+def apply_move(word: array, move_type: int, index: int, generator: int = 0) -> bool:
+    # Applies the move to `word` in place; returns False (leaving it untouched) when invalid.
+    if not is_valid(word, move_type, index):
+        return False
+    apply_valid_move(word, move_type, index, generator)
+    return True
+
+def apply_valid_move(word: array, move_type: int, index: int, generator: int = 0):
+    # apply_move for callers that already checked is_valid.
+    if move_type == COMMUTE:
+        word[index], word[index + 1] = word[index + 1], word[index]
+    elif move_type == R3:
+        gen_0, gen_1 = word[index], word[index + 1]
+        word[index], word[index + 1], word[index + 2] = gen_1, gen_0, gen_1
+    elif move_type == REMOVE:
+        del word[index:index + 2]
+    else:
+        word[index:index] = array('b', (generator, -generator))
+
+def python_successor_keys(key: bytes, pairs: List[bytes], insert_limit: int) -> Iterator[Tuple[int, int, bytes]]:
+    # (move_type, index, new key) for every state one move away, inserts of every pair in
+    # `pairs` included while the word is shorter than insert_limit.
+    word = array('b', key).tolist()
+    curr_len = len(word)
+
+    for i in range(curr_len - 1):
+        gen_0, gen_1 = word[i], word[i + 1]
+        dist = abs(abs(gen_0) - abs(gen_1))
+
+        if dist >= 2:
+            yield COMMUTE, i, key[:i] + key[i+1:i+2] + key[i:i+1] + key[i+2:]
+        elif dist == 1 and i < curr_len - 2 and word[i + 2] == gen_0 and gen_0 * gen_1 > 0:
+            yield R3, i, key[:i] + key[i+1:i+2] + key[i:i+1] + key[i+1:i+2] + key[i+3:]
+        elif gen_0 == -gen_1:
+            yield REMOVE, i, key[:i] + key[i+2:]
+
+    if curr_len < insert_limit:
+        for i in range(curr_len + 1):
+            prefix, suffix = key[:i], key[i:]
+            for pair in pairs:
+                yield INSERT, i, prefix + pair + suffix
+
+def _coded_successor_keys(key: bytes, pairs: List[bytes], insert_limit: int) -> Iterator[Tuple[int, int, bytes]]:
+    # python_successor_keys with the classification done by move_codes (same order).
+    for i, code in enumerate(move_codes(key)):
+        if code == COMMUTE:
+            yield COMMUTE, i, key[:i] + key[i+1:i+2] + key[i:i+1] + key[i+2:]
+        elif code == R3:
+            yield R3, i, key[:i] + key[i+1:i+2] + key[i:i+1] + key[i+1:i+2] + key[i+3:]
+        elif code == REMOVE:
+            yield REMOVE, i, key[:i] + key[i+2:]
+
+    if len(key) < insert_limit:
+        for i in range(len(key) + 1):
+            prefix, suffix = key[:i], key[i:]
+            for pair in pairs:
+                yield INSERT, i, prefix + pair + suffix
+
+def successor_key(key: bytes, move_type: int, index: int, pair: bytes = b"") -> bytes:
+    # The key of one successor, as built by successor_keys; `pair` is the inserted bytes.
+    if move_type == COMMUTE:
+        return key[:index] + key[index+1:index+2] + key[index:index+1] + key[index+2:]
+    if move_type == R3:
+        return key[:index] + key[index+1:index+2] + key[index:index+1] + key[index+1:index+2] + key[index+3:]
+    if move_type == REMOVE:
+        return key[:index] + key[index+2:]
+    return key[:index] + pair + key[index:]
+
+def predecessor_keys(key: bytes, signed_pairs: List[bytes], insert_limit: int,
+                     max_word_len: int) -> Iterator[Tuple[int, int, bytes]]:
+    # States that reach `key` in one forward move (commute and R3 are their own inverses).
+    # A predecessor by INSERT is the word with a positive canceling pair removed.
+    curr_len = len(key)
+    word = array('b', key)
+    for i, code in enumerate(move_codes(word)):
+        if code == COMMUTE:
+            yield COMMUTE, i, key[:i] + key[i+1:i+2] + key[i:i+1] + key[i+2:]
+        elif code == R3:
+            yield R3, i, key[:i] + key[i+1:i+2] + key[i:i+1] + key[i+1:i+2] + key[i+3:]
+        elif code == REMOVE and word[i] > 0 and curr_len - 2 < insert_limit:
+            yield INSERT, i, key[:i] + key[i+2:]
+
+    if curr_len + 2 <= max_word_len:
+        for i in range(curr_len + 1):
+            prefix, suffix = key[:i], key[i:]
+            for pair in signed_pairs:
+                yield REMOVE, i, prefix + pair + suffix
+
+# Rolling hash for per-episode loop detection: sum of (letter + 128) * B^position modulo
+# 2^64 (braid_kernels has the batch versions, in wrapping int64 arithmetic). Envs update
+# it after every move instead of hashing the word again: a commute or R3 changes two or
+# three terms, a remove or insert keeps the terms before the move and shifts the rest by
+# B^-2 or B^2. Words stay far shorter than the ~1000 letters at which mod-2^64
+# polynomial hashes have known collisions.
+HASH_BASE = 0x9E3779B97F4A7C15
+HASH_MASK = (1 << 64) - 1
+HASH_GROW = pow(HASH_BASE, 2, 1 << 64)
+HASH_SHRINK = pow(HASH_BASE, -2, 1 << 64)
+_HASH_POWERS = [1]
+
+def hash_powers(width: int) -> List[int]:
+    # B^0 .. B^(width - 1) modulo 2^64 (the list may be longer).
+    while len(_HASH_POWERS) < width:
+        _HASH_POWERS.append(_HASH_POWERS[-1] * HASH_BASE & HASH_MASK)
+    return _HASH_POWERS
+
+def _prefix_hash(word: Sequence[int], stop: int, value: int = 0) -> int:
+    # Hash of word[:stop], unreduced; given the whole word's hash, the shorter side is summed.
+    if value and 2 * stop > len(word):
+        return value - sum(map(int.__mul__, [gen + 128 for gen in word[stop:]], hash_powers(len(word))[stop:]))
+    return sum(map(int.__mul__, [gen + 128 for gen in word[:stop]], hash_powers(stop)))
+
+def word_hash(word: Sequence[int]) -> int:
+    return _prefix_hash(word, len(word)) & HASH_MASK
+
+def move_hash(value: int, word: Sequence[int], move_type: int, index: int, generator: int = 0) -> int:
+    # Hash after a valid move, from the hash and the word before it.
+    powers = hash_powers(index + 3)
+    if move_type == COMMUTE or move_type == R3:
+        term = powers[index] - powers[index + 1] + (powers[index + 2] if move_type == R3 else 0)
+        return (value + (word[index + 1] - word[index]) * term) & HASH_MASK
+
+    prefix = _prefix_hash(word, index, value)
+    if move_type == REMOVE:
+        pair = (word[index] + 128) * powers[index] + (word[index + 1] + 128) * powers[index + 1]
+        return (prefix + (value - prefix - pair) * HASH_SHRINK) & HASH_MASK
+    pair = (generator + 128) * powers[index] + (128 - generator) * powers[index + 1]
+    return (prefix + pair + (value - prefix) * HASH_GROW) & HASH_MASK
+
+def successor_hashes(value: int, word: Sequence[int], moves: Sequence[Tuple[int, int]]) -> List[int]:
+    # move_hash of every valid (move_type, index) commute, R3 or remove, sharing one pass
+    # over the prefixes of the word between the removes.
+    powers = hash_powers(len(word) + 1)
+    prefixes = None
+    hashes = []
+    for move_type, index in moves:
+        if move_type == REMOVE:
+            if prefixes is None:
+                prefixes = list(accumulate(map(int.__mul__, [gen + 128 for gen in word], powers), initial=0))
+            hashes.append((prefixes[index] + (value - prefixes[index + 2]) * HASH_SHRINK) & HASH_MASK)
+        else:
+            term = powers[index] - powers[index + 1]
+            if move_type == R3:
+                term += powers[index + 2]
+            hashes.append((value + (word[index + 1] - word[index]) * term) & HASH_MASK)
+    return hashes
+
+def load_numba():
+    # Compiles the jitted classifier and returns a move_codes drop-in (ImportError without numba).
+    import numba
+    import numpy as np
+
+    @numba.njit(cache=True)
+    def codes_kernel(word):
+        n = word.shape[0]
+        codes = np.full(n, -1, dtype=np.int8)
+        for i in range(n - 1):
+            gen_0 = np.int64(word[i])
+            gen_1 = np.int64(word[i + 1])
+            dist = abs(abs(gen_0) - abs(gen_1))
+            if dist >= 2:
+                codes[i] = 0
+            elif dist == 1:
+                if i < n - 2 and np.int64(word[i + 2]) == gen_0 and gen_0 * gen_1 > 0:
+                    codes[i] = 1
+            elif gen_0 == -gen_1:
+                codes[i] = 2
+        return codes
+
+    def numba_move_codes(word: Sequence[int]) -> List[int]:
+        if not isinstance(word, (bytes, bytearray, array)):
+            word = array('b', word)
+        return codes_kernel(np.frombuffer(word, dtype=np.int8)).tolist()
+
+    numba_move_codes([1, 3, -3])
+    return numba_move_codes
+
+BACKEND = os.environ.get("BRAID_KERNELS", "python")
+move_codes = python_move_codes
+successor_keys = python_successor_keys
+if BACKEND == "numba":
+    try:
+        move_codes = load_numba()
+        successor_keys = _coded_successor_keys
+    except ImportError:
+        print("Warning: BRAID_KERNELS=numba but numba is not installed; using the pure-Python kernels")
+        BACKEND = "python"
+elif BACKEND != "python":
+    raise ValueError(f"Unknown BRAID_KERNELS backend {BACKEND!r}, expected 'python' or 'numba'")
@@ -0,0 +1,101 @@
+import json
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+ACTIVATIONS = {
+    "Tanh": np.tanh,
+    "ReLU": lambda x: np.maximum(x, 0),
+    "Identity": lambda x: x
+}
+
+def export_policy(model, output_path: Optional[str] = None) -> str:
+    # Writes the MlpPolicy of a MaskablePPO model (or a saved .zip) as plain arrays in an
+    # .npz file. Only the export needs torch / SB3; NumpyPolicy loads it with NumPy alone.
+    if isinstance(model, str):
+        from sb3_contrib import MaskablePPO
+
+        output_path = output_path or model.replace(".zip", "") + ".npz"
+        model = MaskablePPO.load(model, device="cpu")
+    if output_path is None:
+        raise ValueError("output_path is required when exporting an in-memory model")
+    policy = model.policy
+
+    arrays = {}
+    layout = {"obs_dim": int(np.prod(policy.observation_space.shape)), "n_actions": int(policy.action_space.n)}
+    for branch, net, head in (("pi", policy.mlp_extractor.policy_net, policy.action_net),
+                              ("vf", policy.mlp_extractor.value_net, policy.value_net)):
+        activations = []
+        for module in list(net) + [head]:
+            name = type(module).__name__
+            if name == "Linear":
+                index = len(activations)
+                arrays[f"{branch}_{index}_w"] = module.weight.detach().cpu().numpy().T.astype(np.float32)
+                arrays[f"{branch}_{index}_b"] = module.bias.detach().cpu().numpy().astype(np.float32)
+                activations.append("Identity")
+            elif name in ACTIVATIONS and activations:
+                activations[-1] = name
+            else:
+                raise ValueError(f"Cannot export policy layer {name}")
+        layout[branch] = activations
+
+    np.savez(output_path, layout=np.frombuffer(json.dumps(layout).encode(), dtype=np.uint8), **arrays)
+    return output_path
+
+class NumpyPolicy:
+    # Drop-in for MaskablePPO.predict (and therefore BraidAgent.predict / solve /
+    # evaluate) that runs the exported MLP with NumPy in float32. Masked actions get
+    # -inf logits, so the argmax matches MaskableCategorical's deterministic mode.
+    def __init__(self, layout: dict, arrays: dict, seed: Optional[int] = None):
+        self.obs_dim = layout["obs_dim"]
+        self.n_actions = layout["n_actions"]
+        self.pi_layers = self._layers("pi", layout["pi"], arrays)
+        self.vf_layers = self._layers("vf", layout["vf"], arrays)
+        self.rng = np.random.default_rng(seed)
+
+    @staticmethod
+    def _layers(branch: str, activations: List[str], arrays: dict) -> list:
+        return [(arrays[f"{branch}_{i}_w"], arrays[f"{branch}_{i}_b"], ACTIVATIONS[name])
+                for i, name in enumerate(activations)]
+
+    @classmethod
+    def load(cls, path: str, seed: Optional[int] = None) -> "NumpyPolicy":
+        with np.load(path) as data:
+            layout = json.loads(data["layout"].tobytes())
+            arrays = {k: data[k] for k in data.files if k != "layout"}
+        return cls(layout, arrays, seed)
+
+    @staticmethod
+    def _forward(layers: list, x: np.ndarray) -> np.ndarray:
+        for weight, bias, activation in layers:
+            x = activation(x @ weight + bias)
+        return x
+
+    def logits(self, obs: np.ndarray, action_masks: Optional[np.ndarray] = None) -> np.ndarray:
+        logits = self._forward(self.pi_layers, np.asarray(obs, dtype=np.float32).reshape(-1, self.obs_dim))
+        if action_masks is not None:
+            logits = np.where(np.asarray(action_masks, dtype=bool).reshape(logits.shape), logits, -np.inf)
+        return logits
+
+    def values(self, obs: np.ndarray) -> np.ndarray:
+        return self._forward(self.vf_layers, np.asarray(obs, dtype=np.float32).reshape(-1, self.obs_dim)).reshape(-1)
+
+    def action_log_probs(self, obs: np.ndarray, action_masks: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        logits = self.logits(obs, action_masks)
+        shifted = logits - logits.max(axis=1, keepdims=True)
+        log_probs = shifted - np.log(np.exp(shifted).sum(axis=1, keepdims=True))
+        return log_probs, self.values(obs)
+
+    def predict(self, observation: np.ndarray, state=None, episode_start=None, deterministic: bool = False,
+                action_masks: Optional[np.ndarray] = None):
+        observation = np.asarray(observation)
+        logits = self.logits(observation, action_masks)
+        if deterministic:
+            actions = logits.argmax(axis=1)
+        else:
+            actions = (logits + self.rng.gumbel(size=logits.shape)).argmax(axis=1)
+
+        # Same shapes as SB3: a single observation gives a scalar action.
+        if observation.ndim == 1:
+            return actions[0], state
+        return actions, state
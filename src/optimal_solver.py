@@ -1,79 +1,454 @@
 import heapq
 import time
-from typing import List, Tuple, Optional
-from .braid import Braid
-from .config import Configuration
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Tuple, Optional
+from . import move_kernels
+from .braid import Braid, REMOVE, INSERT
+from .heuristics import Heuristic, LengthHeuristic
+from .move_kernels import predecessor_keys, successor_key, successor_keys
+
+if TYPE_CHECKING:
+    from .solution_cache import SolutionCache
+
+MODES = ("astar", "ida", "bidirectional")
+# The search loops look at the clock and the node budget once per this many expansions.
+CHECK_INTERVAL = 256
+
+class ExpansionCache:
+    # Bounded LRU of successor lists keyed by (word, inserts allowed). It lives on the
+    # solver, so words that come up again in later solves of a dataset run (or again
+    # within one, as in IDA*) are not regenerated.
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[Tuple[bytes, bool], tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, entry: Tuple[bytes, bool]) -> Optional[tuple]:
+        moves = self.entries.get(entry)
+        if moves is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(entry)
+        self.hits += 1
+        return moves
+
+    def put(self, entry: Tuple[bytes, bool], moves: tuple):
+        self.entries[entry] = moves
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def summary(self) -> dict:
+        lookups = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self.entries),
+                "hit_rate": self.hits / lookups if lookups else 0.0}
+
+# The solve_many pool's copy of the solver, one per worker process.
+_worker_solver = None
+
+def _init_worker(solver: "AStarSolver"):
+    global _worker_solver
+    _worker_solver = solver
+
+def _solve_task(index: int, key: bytes, max_time_sec: float, max_nodes: Optional[int]) -> dict:
+    path = _worker_solver.solve(Braid.from_key(key, _worker_solver.n_strands), max_time_sec, max_nodes)
+    return {"index": index, "path": path, "stats": dict(_worker_solver.stats)}
 
 class AStarSolver:
-    def __init__(self, n_strands: int, max_len: int):
+    # States are raw signed-byte words (see Braid.key). The table maps each
+    # reached state to (best cost, parent key, move type, index), so the path
+    # is rebuilt once at the goal instead of being copied into every heap entry.
+    #
+    # expansion_cache_size > 0 keeps an ExpansionCache of that many words across solves.
+    # transpositions has A* drop duplicate successors by hash before building their keys
+    # (src/transposition.py, needs numba); None turns it on with BRAID_KERNELS=numba.
+    def __init__(self, n_strands: int, max_len: int, track_memory: bool = False,
+                 heuristic: Optional[Heuristic] = None, mode: str = "astar",
+                 cache: Optional["SolutionCache"] = None, expansion_cache_size: int = 0,
+                 transpositions: Optional[bool] = None):
+        if mode not in MODES:
+            raise ValueError(f"Unknown solver mode '{mode}', expected one of {MODES}")
+
         self.n_strands = n_strands
         self.max_len = max_len
+        self.track_memory = track_memory
+        self.heuristic = heuristic if heuristic is not None else LengthHeuristic()
+        self.mode = mode
+        self.cache = cache
+        self.stats = {}
+
+        self._pairs = [bytes((gen, -gen & 0xFF)) for gen in range(1, n_strands)]
+        self._signed_pairs = self._pairs + [bytes((-gen & 0xFF, gen)) for gen in range(1, n_strands)]
+
+        self.expansion_cache = ExpansionCache(expansion_cache_size) if expansion_cache_size > 0 else None
+        self._transpositions = None
+        if transpositions is None:
+            transpositions = move_kernels.BACKEND == "numba"
+        if transpositions and mode == "astar":
+            try:
+                from .transposition import TranspositionTable
+                self._transpositions = TranspositionTable(n_strands, max_len)
+            except ImportError:
+                print("Warning: numba is not installed; solving without the transposition table")
+
+    def solve(self, start_braid: Braid, max_time_sec: float = 30.0,
+              max_nodes: Optional[int] = None) -> Optional[List[Tuple[int, ...]]]:
+        # Returns None when the search space is exhausted or a budget runs out (stats
+        # "timed_out", and "out_of_nodes" when it was the max_nodes expansion budget).
+        word_key = start_braid.key()
+        if self.cache is not None:
+            path = self.cache.get(word_key, self.n_strands, self.max_len)
+            if path is not None:
+                self._reset_stats()
+                self.stats["cache_hit"] = True
+                return path
+
+        search = {"astar": self._search, "ida": self._search_ida, "bidirectional": self._search_bidirectional}[self.mode]
+        if self._transpositions is not None:
+            search = self._search_hashed
+        if self.track_memory:
+            import tracemalloc
+            tracemalloc.start()
+        try:
+            path = search(start_braid, max_time_sec, max_nodes if max_nodes is not None else float("inf"))
+        finally:
+            if self.track_memory:
+                self.stats["peak_memory_bytes"] = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+
+        # Timeouts are not cached: they depend on the time budget, not on the word.
+        if self.cache is not None and path is not None:
+            self.cache.put(word_key, self.n_strands, self.max_len, path)
+        return path
+
+    def solve_many(self, braids: Iterable[Braid], max_time_sec: float = 30.0, max_nodes: Optional[int] = None,
+                   workers: Optional[int] = None) -> Iterator[dict]:
+        # Yields {"index", "path", "stats"} per braid as soon as it is done, so in completion
+        # order; index is the braid's position in `braids`. Every braid gets its own time and
+        # node budget, and one that runs out comes back with path None and the partial stats.
+        # workers=0 solves in this process. Otherwise each pool process gets a copy of this
+        # solver, and only a few braids per worker are queued, so `braids` may be a long stream.
+        if workers == 0:
+            for index, braid in enumerate(braids):
+                path = self.solve(braid, max_time_sec, max_nodes)
+                yield {"index": index, "path": path, "stats": dict(self.stats)}
+            return
+
+        import concurrent.futures
+        import os
 
-    def solve(self, start_braid: Braid, max_time_sec: float = 30.0) -> Optional[List[Tuple[int, int]]]:
+        workers = workers or os.cpu_count() or 1
+        executor = concurrent.futures.ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                                          initargs=(self,))
+        pending = set()
+        try:
+            for index, braid in enumerate(braids):
+                pending.add(executor.submit(_solve_task, index, braid.key(), max_time_sec, max_nodes))
+                if len(pending) >= 4 * workers:
+                    done, pending = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                    for future in done:
+                        yield future.result()
+            for future in concurrent.futures.as_completed(pending):
+                yield future.result()
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def _search(self, start_braid: Braid, max_time_sec: float, node_limit: float) -> Optional[List[Tuple[int, ...]]]:
         start_time = time.time()
-        initial_word = tuple(start_braid.word)
-        
-        if len(initial_word) == 0:
+        initial_key = start_braid.key()
+        self._reset_stats()
+
+        if len(initial_key) == 0:
             return []
-        
-        start_h = len(initial_word) / 2
-        
-        queue = [(start_h, 0, initial_word, [])]
-        
-        visited_cost = {initial_word: 0}
+
+        insert_limit = self._insert_limit(initial_key)
+        heuristic = self.heuristic
+
+        queue = [(heuristic(initial_key), 0, initial_key)]
+        table: Dict[bytes, tuple] = {initial_key: (0, None, -1, -1)}
         nodes_expanded = 0
+        max_frontier = 1
+        next_check = 0
 
         while queue:
-            if time.time() - start_time > max_time_sec:
-                return None # Timeout
+            if nodes_expanded >= next_check:
+                if time.time() - start_time > max_time_sec or nodes_expanded >= node_limit:
+                    self._finish_stats(start_time, nodes_expanded, max_frontier, table, timed_out=True,
+                                       out_of_nodes=nodes_expanded >= node_limit)
+                    return None # Timeout
+                next_check = min(nodes_expanded + CHECK_INTERVAL, node_limit)
 
-            _, cost, current_word_tuple, history = heapq.heappop(queue)
+            _, cost, key = heapq.heappop(queue)
+            if table[key][0] < cost:
+                continue
             nodes_expanded += 1
 
-            if current_word_tuple in visited_cost and visited_cost[current_word_tuple] < cost:
+            if len(key) == 0:
+                self._finish_stats(start_time, nodes_expanded, max_frontier, table)
+                return self._reconstruct(table, key)
+
+            new_cost = cost + 1
+            for move_type, index, new_key in self._successors(key, insert_limit):
+                entry = table.get(new_key)
+                if entry is None or new_cost < entry[0]:
+                    table[new_key] = (new_cost, key, move_type, index)
+                    heapq.heappush(queue, (new_cost + heuristic(new_key), new_cost, new_key))
+
+            if len(queue) > max_frontier:
+                max_frontier = len(queue)
+
+        self._finish_stats(start_time, nodes_expanded, max_frontier, table)
+        return None
+
+    def _search_hashed(self, start_braid: Braid, max_time_sec: float, node_limit: float) -> Optional[List[Tuple[int, ...]]]:
+        # A* over the TranspositionTable: successors known at an equal or lower cost are
+        # dropped by hash, and heap entries hold (parent, move) so a word is only built
+        # when popped. The table then holds expanded words only. Ties break on the parent
+        # rather than the word, so among several optimal paths another one may come back.
+        start_time = time.time()
+        initial_key = start_braid.key()
+        self._reset_stats()
+
+        if len(initial_key) == 0:
+            return []
+
+        insert_limit = self._insert_limit(initial_key)
+        heuristic = self.heuristic
+        by_length = type(heuristic) is LengthHeuristic
+        pairs = self._pairs
+        transpositions = self._transpositions
+        transpositions.reset()
+        transpositions.add(initial_key, 0)
+
+        queue = [(heuristic(initial_key), 0, None, -1, -1, 0)]
+        table: Dict[bytes, tuple] = {}
+        nodes_expanded = 0
+        max_frontier = 1
+        next_check = 0
+
+        while queue:
+            if nodes_expanded >= next_check:
+                if time.time() - start_time > max_time_sec or nodes_expanded >= node_limit:
+                    self._finish_stats(start_time, nodes_expanded, max_frontier, table, timed_out=True,
+                                       out_of_nodes=nodes_expanded >= node_limit, extra=transpositions.filled - len(table))
+                    return None
+                next_check = min(nodes_expanded + CHECK_INTERVAL, node_limit)
+
+            _, cost, parent, move_type, index, generator = heapq.heappop(queue)
+            # generator is 0 unless the move is an insert, and then pairs[-1] is ignored.
+            key = initial_key if parent is None else successor_key(parent, move_type, index, pairs[generator - 1])
+            if key in table:
                 continue
+            table[key] = (cost, parent, move_type, index)
+            nodes_expanded += 1
+
+            if len(key) == 0:
+                self._finish_stats(start_time, nodes_expanded, max_frontier, table, extra=transpositions.filled - len(table))
+                return self._reconstruct(table, key)
+
+            new_cost = cost + 1
+            half_len = len(key) / 2
+            for move_type, index, generator in transpositions.expand(key, new_cost, len(key) < insert_limit):
+                if by_length:
+                    h = half_len + (move_type == INSERT) - (move_type == REMOVE)
+                else:
+                    h = heuristic(successor_key(key, move_type, index, pairs[generator - 1]))
+                heapq.heappush(queue, (new_cost + h, new_cost, key, move_type, index, generator))
+
+            if len(queue) > max_frontier:
+                max_frontier = len(queue)
+
+        self._finish_stats(start_time, nodes_expanded, max_frontier, table, extra=transpositions.filled - len(table))
+        return None
+
+    def _search_ida(self, start_braid: Braid, max_time_sec: float, node_limit: float) -> Optional[List[Tuple[int, ...]]]:
+        # Depth-first iterative deepening on f = g + h: memory is bounded by the
+        # current path, at the price of re-expanding states across iterations.
+        start_time = time.time()
+        initial_key = start_braid.key()
+        self._reset_stats()
+
+        if len(initial_key) == 0:
+            return []
+
+        insert_limit = self._insert_limit(initial_key)
+        heuristic = self.heuristic
+        deadline = start_time + max_time_sec
+        on_path = {initial_key}
+        history = []
+        nodes_expanded = 0
+        max_depth = 0  # reported as max_frontier: the deepest path held in memory
+        found = -1.0
+
+        def dfs(key: bytes, cost: int, bound: float) -> float:
+            nonlocal nodes_expanded, max_depth
+            f = cost + heuristic(key)
+            if f > bound:
+                return f
+            if len(key) == 0:
+                return found
+
+            if nodes_expanded >= node_limit:
+                raise TimeoutError
+            nodes_expanded += 1
+            if nodes_expanded % CHECK_INTERVAL == 0 and time.time() > deadline:
+                raise TimeoutError
+            max_depth = max(max_depth, cost)
+
+            next_bound = float("inf")
+            for move_type, index, new_key in self._successors(key, insert_limit):
+                if new_key in on_path:
+                    continue
+                on_path.add(new_key)
+                history.append(self._move(move_type, index, new_key))
+                t = dfs(new_key, cost + 1, bound)
+                if t == found:
+                    return found
+                history.pop()
+                on_path.discard(new_key)
+                next_bound = min(next_bound, t)
+            return next_bound
+
+        bound = heuristic(initial_key)
+        try:
+            while True:
+                t = dfs(initial_key, 0, bound)
+                if t == found:
+                    self._finish_stats(start_time, nodes_expanded, max_depth, {})
+                    return history
+                if t == float("inf"):
+                    self._finish_stats(start_time, nodes_expanded, max_depth, {})
+                    return None
+                bound = t
+        except TimeoutError:
+            self._finish_stats(start_time, nodes_expanded, max_depth, {}, timed_out=True,
+                               out_of_nodes=nodes_expanded >= node_limit)
+            return None
+
+    def _search_bidirectional(self, start_braid: Braid, max_time_sec: float, node_limit: float) -> Optional[List[Tuple[int, ...]]]:
+        # Breadth-first from both the start word and the empty word, always growing
+        # the smaller frontier by a full layer. With unit move costs the best meeting
+        # found in the first layer that meets is optimal.
+        start_time = time.time()
+        initial_key = start_braid.key()
+        self._reset_stats()
+
+        if len(initial_key) == 0:
+            return []
+
+        insert_limit = self._insert_limit(initial_key)
+        max_word_len = max(len(initial_key), insert_limit + 1)
+
+        # forward[key] = (depth, parent, move, index); backward[key] = (depth, child, move, index)
+        # where applying (move, index) to key yields child, one step closer to the empty word.
+        forward = {initial_key: (0, None, -1, -1)}
+        backward = {b"": (0, None, -1, -1)}
+        forward_layer, backward_layer = [initial_key], [b""]
+        nodes_expanded = 0
+        max_frontier = 1
+
+        while forward_layer and backward_layer:
+            if time.time() - start_time > max_time_sec or nodes_expanded >= node_limit:
+                self._finish_stats(start_time, nodes_expanded, max_frontier, forward, timed_out=True,
+                                   out_of_nodes=nodes_expanded >= node_limit, extra=len(backward))
+                return None
+
+            grow_forward = len(forward_layer) <= len(backward_layer)
+            own, other = (forward, backward) if grow_forward else (backward, forward)
+            layer = forward_layer if grow_forward else backward_layer
+            next_layer = []
+            best = None
+
+            for key in layer:
+                nodes_expanded += 1
+                depth = own[key][0] + 1
+                moves = self._successors(key, insert_limit) if grow_forward else self._predecessors(key, insert_limit, max_word_len)
+                for move_type, index, new_key in moves:
+                    if new_key in own:
+                        continue
+                    own[new_key] = (depth, key, move_type, index)
+                    next_layer.append(new_key)
+                    if new_key in other:
+                        total = depth + other[new_key][0]
+                        if best is None or total < best[0]:
+                            best = (total, new_key)
+
+            if best is not None:
+                meet = best[1]
+                path = self._reconstruct(forward, meet)
+                key = meet
+                while backward[key][1] is not None:
+                    _, child, move_type, index = backward[key]
+                    path.append(self._move(move_type, index, child))
+                    key = child
+                self._finish_stats(start_time, nodes_expanded, max_frontier, forward, extra=len(backward))
+                return path
+
+            if grow_forward:
+                forward_layer = next_layer
+            else:
+                backward_layer = next_layer
+            max_frontier = max(max_frontier, len(forward_layer) + len(backward_layer))
+
+        self._finish_stats(start_time, nodes_expanded, max_frontier, forward, extra=len(backward))
+        return None
+
+    def _insert_limit(self, initial_key: bytes) -> int:
+        return min(self.max_len - 2, len(initial_key) + 6)
+
+    def _predecessors(self, key: bytes, insert_limit: int, max_word_len: int):
+        return predecessor_keys(key, self._signed_pairs, insert_limit, max_word_len)
+
+    def _successors(self, key: bytes, insert_limit: int):
+        cache = self.expansion_cache
+        if cache is None:
+            return successor_keys(key, self._pairs, insert_limit)
+
+        entry = (key, len(key) < insert_limit)
+        moves = cache.get(entry)
+        if moves is None:
+            moves = tuple(successor_keys(key, self._pairs, insert_limit))
+            cache.put(entry, moves)
+        return moves
+
+    @staticmethod
+    def _move(move_type: int, index: int, child: bytes) -> Tuple[int, ...]:
+        # Path entries follow Braid.apply_moves: inserts carry the generator, read off the
+        # word they produced (the pair's first letter, always positive).
+        return (move_type, index, child[index]) if move_type == INSERT else (move_type, index)
+
+    def _reconstruct(self, table: Dict[bytes, tuple], key: bytes) -> List[Tuple[int, ...]]:
+        history = []
+        _, parent, move_type, index = table[key]
+        while parent is not None:
+            history.append(self._move(move_type, index, key))
+            key = parent
+            _, parent, move_type, index = table[key]
+        history.reverse()
+        return history
+
+    def _reset_stats(self):
+        self.stats = {
+            "nodes_expanded": 0,
+            "nodes_generated": 0,
+            "max_frontier": 0,
+            "elapsed_sec": 0.0,
+            "timed_out": False,
+            "out_of_nodes": False,
+            "cache_hit": False,
+            "peak_memory_bytes": None
+        }
 
-            if len(current_word_tuple) == 0:
-                return history
-
-            current_braid = Braid(list(current_word_tuple), self.n_strands)
-            curr_len = len(current_braid)
-
-            potential_moves = []
-            
-            for i in range(curr_len - 1):
-                if current_braid.check_commutation(i):
-                    new_word = list(current_word_tuple)
-                    new_word[i], new_word[i+1] = new_word[i+1], new_word[i]
-                    potential_moves.append((0, i, tuple(new_word)))
-
-            for i in range(curr_len - 2):
-                if current_braid.check_braid_relation(i):
-                    new_word = list(current_word_tuple)
-                    new_word[i], new_word[i+1], new_word[i+2] = new_word[i+1], new_word[i], new_word[i+1]
-                    potential_moves.append((1, i, tuple(new_word)))
-
-            for i in range(curr_len - 1):
-                if current_braid.check_remove_pair(i):
-                    new_word = list(current_word_tuple)
-                    del new_word[i]
-                    del new_word[i]
-                    potential_moves.append((2, i, tuple(new_word)))
-
-            if curr_len < self.max_len - 2 and curr_len < len(initial_word) + 6:
-                for i in range(curr_len + 1):
-                    for gen in range(1, self.n_strands):
-                        new_word = list(current_word_tuple)
-                        new_word.insert(i, gen)
-                        new_word.insert(i+1, -gen)
-                        potential_moves.append((3, i, tuple(new_word)))
-
-            for move_type, index, new_word_tuple in potential_moves:
-                new_cost = cost + 1
-                
-                if new_word_tuple not in visited_cost or new_cost < visited_cost[new_word_tuple]:
-                    visited_cost[new_word_tuple] = new_cost
-                    priority = new_cost + (len(new_word_tuple) / 2)
-                    heapq.heappush(queue, (priority, new_cost, new_word_tuple, history + [(move_type, index)]))
-
-        return None
\ No newline at end of file
+    def _finish_stats(self, start_time: float, nodes_expanded: int, max_frontier: int, table: dict,
+                      timed_out: bool = False, out_of_nodes: bool = False, extra: int = 0):
+        self.stats.update(
+            nodes_expanded=nodes_expanded,
+            nodes_generated=len(table) + extra,
+            max_frontier=max_frontier,
+            elapsed_sec=time.time() - start_time,
+            timed_out=timed_out,
+            out_of_nodes=out_of_nodes
+        )
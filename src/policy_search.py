@@ -0,0 +1,168 @@
+import math
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .braid import Braid, INSERT
+from .encoding import BraidEncoding
+
+def policy_log_probs(policy, obs: np.ndarray, masks: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    # Masked action log-probabilities and value estimates for a batch of observations,
+    # from a MaskablePPO model, its policy or a NumpyPolicy, in one forward pass.
+    if hasattr(policy, "action_log_probs"):
+        return policy.action_log_probs(obs, masks)
+
+    import torch
+
+    policy = getattr(policy, "policy", policy)
+    obs_tensor, _ = policy.obs_to_tensor(obs)
+    with torch.no_grad():
+        distribution = policy.get_distribution(obs_tensor, action_masks=masks)
+        log_probs = torch.log_softmax(distribution.distribution.logits, dim=-1)
+        values = policy.predict_values(obs_tensor)
+    log_probs = log_probs.cpu().numpy()
+    log_probs[~masks] = -np.inf
+    return log_probs, values.cpu().numpy().reshape(-1)
+
+class PolicySearchSolver:
+    # Beam search over braid moves ranked by the policy: a state's score is the summed
+    # log-probability of the moves leading to it, plus value_weight * V(state) when the
+    # value head should break ties between lines. Each layer of the beam is evaluated in
+    # a single batched forward pass. A transposition table drops states already reached
+    # at the same or a shallower depth.
+    #
+    # Unlike BraidEnv, inserts are expanded for every generator (sharing the policy's
+    # probability for that slot) since the search picks the generator instead of the RNG.
+    # If a beam dies out or hits max_depth the width is doubled and the search restarts,
+    # until the node (forward rows) or wall-time budget runs out.
+    #
+    # `encoding` must match the one the policy was trained with (default: the original layout).
+    def __init__(self, policy, n_strands: int, max_len: int, beam_width: int = 16, expand_width: int = 8,
+                 value_weight: float = 0.0, max_depth: int = 200, encoding: Optional[BraidEncoding] = None):
+        self.policy = policy
+        self.n_strands = n_strands
+        self.max_len = max_len
+        self.encoding = encoding or BraidEncoding(max_len, n_strands)
+        self.beam_width = beam_width
+        self.expand_width = expand_width
+        self.value_weight = value_weight
+        self.max_depth = max_depth
+        self.stats = {}
+
+    def solve(self, start_braid: Braid, max_nodes: Optional[int] = None,
+              max_time_sec: Optional[float] = None) -> Optional[List[Tuple[int, int, int]]]:
+        # Returns (move_type, index, generator) moves for Braid.apply_moves, or None.
+        if max_nodes is None and max_time_sec is None:
+            max_nodes = 10_000
+
+        self.stats = {
+            "nodes_expanded": 0,
+            "nodes_generated": 0,
+            "beam_width": self.beam_width,
+            "depth": 0,
+            "elapsed_sec": 0.0,
+            "timed_out": False
+        }
+        start_time = time.time()
+        self._max_nodes = max_nodes if max_nodes is not None else float("inf")
+        self._deadline = start_time + max_time_sec if max_time_sec is not None else float("inf")
+
+        root = start_braid.key()[:self.max_len]
+        self._braid_strands = start_braid.n_strands
+        self._insert_strands = start_braid.n_strands if self.encoding.per_braid_strands else self.n_strands
+        path = [] if len(root) == 0 else None
+        width = self.beam_width
+        while path is None and not self._out_of_budget():
+            self.stats["beam_width"] = width
+            path = self._beam(root, width)
+            width *= 2
+
+        self.stats["timed_out"] = path is None
+        self.stats["elapsed_sec"] = time.time() - start_time
+        return path
+
+    def _out_of_budget(self) -> bool:
+        return self.stats["nodes_expanded"] >= self._max_nodes or time.time() > self._deadline
+
+    def _beam(self, root: bytes, width: int) -> Optional[List[Tuple[int, int, int]]]:
+        parents: Dict[bytes, tuple] = {root: (None, None)}
+        depth_of = {root: 0}
+        beam = [root]
+        scores = np.zeros(1)
+        log_probs, values = self._evaluate(beam)
+
+        for depth in range(1, self.max_depth + 1):
+            candidates, candidate_scores = [], []
+            for row, key in enumerate(beam):
+                row_log_probs = log_probs[row]
+                n_valid = int(np.isfinite(row_log_probs).sum())
+                top = np.argpartition(-row_log_probs, min(self.expand_width, n_valid) - 1)[:min(self.expand_width, n_valid)]
+
+                move_types, indices, action_generators = self.encoding.decode(top)
+                for action, move_type, index, generator in zip(top, move_types.tolist(), indices.tolist(),
+                                                               action_generators.tolist()):
+                    if move_type == INSERT and generator == 0:
+                        generators = range(1, self._insert_strands)
+                    else:
+                        generators = (generator,)
+                    score = scores[row] + row_log_probs[action] - math.log(len(generators))
+                    for generator in generators:
+                        braid = Braid.from_key(key, self.n_strands)
+                        if not braid.apply_move(move_type, index, generator):
+                            continue
+                        new_key = braid.key()
+                        if depth_of.get(new_key, depth + 1) <= depth:
+                            continue
+                        depth_of[new_key] = depth
+                        parents[new_key] = (key, (move_type, index, generator))
+                        if len(new_key) == 0:
+                            self.stats["depth"] = depth
+                            self.stats["nodes_generated"] += len(depth_of)
+                            return self._reconstruct(parents, new_key)
+                        candidates.append(new_key)
+                        candidate_scores.append(score)
+
+            self.stats["depth"] = depth
+            if not candidates or self._out_of_budget():
+                break
+
+            # With a value term, twice the width is evaluated and the beam is cut afterwards.
+            candidate_scores = np.array(candidate_scores)
+            keep = width * 2 if self.value_weight else width
+            if len(candidates) > keep:
+                order = np.argpartition(-candidate_scores, keep - 1)[:keep]
+                candidates = [candidates[i] for i in order]
+                candidate_scores = candidate_scores[order]
+
+            log_probs, values = self._evaluate(candidates)
+            if self.value_weight and len(candidates) > width:
+                order = np.argpartition(-(candidate_scores + self.value_weight * values), width - 1)[:width]
+                candidates = [candidates[i] for i in order]
+                candidate_scores, log_probs = candidate_scores[order], log_probs[order]
+
+            beam, scores = candidates, candidate_scores
+
+        self.stats["nodes_generated"] += len(depth_of)
+        return None
+
+    def _evaluate(self, keys: List[bytes]) -> Tuple[np.ndarray, np.ndarray]:
+        words = np.zeros((len(keys), self.max_len + 2), dtype=np.int32)
+        lengths = np.zeros(len(keys), dtype=np.int64)
+        for row, key in enumerate(keys):
+            words[row, :len(key)] = np.frombuffer(key, dtype=np.int8)
+            lengths[row] = len(key)
+
+        strands = np.full(len(keys), self._braid_strands, dtype=np.int64)
+        masks = self.encoding.action_masks(words, lengths, strands)
+        self.stats["nodes_expanded"] += len(keys)
+        return policy_log_probs(self.policy, self.encoding.encode(words, lengths, strands), masks)
+
+    def _reconstruct(self, parents: Dict[bytes, tuple], key: bytes) -> List[Tuple[int, int, int]]:
+        moves = []
+        parent, move = parents[key]
+        while parent is not None:
+            moves.append(move)
+            parent, move = parents[parent]
+        moves.reverse()
+        return moves
@@ -0,0 +1,140 @@
+import time
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+from typing import Dict, List
+
+import numpy as np
+
+class PhaseTimer:
+    # Collects wall-time samples per named phase (and plain value samples, e.g. solver
+    # stats) between flushes; totals and counts survive flushes. Disabled timers hand
+    # out a shared null context, so instrumented code costs next to nothing.
+    _NULL = nullcontext()
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.samples: Dict[str, List[float]] = defaultdict(list)
+        self.totals: Dict[str, float] = defaultdict(float)
+        self.counts: Dict[str, int] = defaultdict(int)
+        self.value_names = set()
+
+    def phase(self, name: str):
+        return self._timed(name) if self.enabled else self._NULL
+
+    @contextmanager
+    def _timed(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.samples[name].append(time.perf_counter() - start)
+
+    def record(self, name: str, seconds: float):
+        if self.enabled:
+            self.samples[name].append(seconds)
+
+    def record_value(self, name: str, value: float):
+        # Non-time samples: logged as means, without ms conversion or wall-time share.
+        if self.enabled:
+            self.value_names.add(name)
+            self.samples[name].append(value)
+
+    def record_solver(self, stats: dict, prefix: str = "solver"):
+        # Works with AStarSolver.stats and PolicySearchSolver.stats.
+        if not self.enabled or not stats:
+            return
+        elapsed = stats.get("elapsed_sec", 0.0)
+        if elapsed > 0:
+            self.record_value(f"{prefix}_expansions_per_sec", stats["nodes_expanded"] / elapsed)
+        if "max_frontier" in stats:
+            self.record_value(f"{prefix}_max_frontier", stats["max_frontier"])
+
+    def summary(self) -> Dict[str, dict]:
+        # Count / total / mean per name over everything recorded so far.
+        self.flush()
+        return {name: {"count": self.counts[name], "total": total, "mean": total / self.counts[name]}
+                for name, total in self.totals.items() if self.counts[name]}
+
+    def flush(self) -> Dict[str, np.ndarray]:
+        # Returns and clears the samples recorded since the last flush.
+        samples = {name: np.asarray(values) for name, values in self.samples.items() if values}
+        for name, values in samples.items():
+            self.totals[name] += float(values.sum())
+            self.counts[name] += len(values)
+        self.samples.clear()
+        return samples
+
+def make_profiled_vec_env(venv, timer: PhaseTimer):
+    # Times stepping, masking and resets as seen by the trainer (for subprocess envs
+    # this includes the round trip to the workers).
+    from stable_baselines3.common.vec_env import VecEnvWrapper
+
+    class ProfiledVecEnv(VecEnvWrapper):
+        def reset(self):
+            with timer.phase("env_reset"):
+                return self.venv.reset()
+
+        def step_async(self, actions):
+            self._step_start = time.perf_counter()
+            self.venv.step_async(actions)
+
+        def step_wait(self):
+            result = self.venv.step_wait()
+            timer.record("env_step", time.perf_counter() - self._step_start)
+            return result
+
+        def env_method(self, method_name, *method_args, indices=None, **method_kwargs):
+            phase = "mask" if method_name == "action_masks" else "env_method"
+            with timer.phase(phase):
+                return self.venv.env_method(method_name, *method_args, indices=indices, **method_kwargs)
+
+    return ProfiledVecEnv(venv)
+
+def make_profiling_callback(timer: PhaseTimer):
+    # Adds policy forward, rollout collection and PPO update timings, then logs every
+    # phase through the model's SB3 logger at the end of each rollout: a histogram of
+    # the samples (TensorBoard only) plus mean / p95 in ms and the share of wall time.
+    from stable_baselines3.common.callbacks import BaseCallback
+
+    class ProfilingCallback(BaseCallback):
+        def _on_training_start(self) -> None:
+            self._update_start = None
+            policy = self.model.policy
+            forward = policy.forward
+
+            def timed_forward(*args, **kwargs):
+                with timer.phase("predict"):
+                    return forward(*args, **kwargs)
+
+            policy.forward = timed_forward
+
+        def _on_rollout_start(self) -> None:
+            if self._update_start is not None:
+                timer.record("update", time.perf_counter() - self._update_start)
+            self._rollout_start = time.perf_counter()
+
+        def _on_step(self) -> bool:
+            return True
+
+        def _on_rollout_end(self) -> None:
+            now = time.perf_counter()
+            timer.record("rollout", now - self._rollout_start)
+            wall = now - self._rollout_start + sum(timer.samples.get("update", []))
+
+            for name, values in timer.flush().items():
+                if name in timer.value_names:
+                    self.logger.record(f"timing/{name}", float(values.mean()))
+                    continue
+                self.logger.record(f"timing/{name}_ms", float(values.mean() * 1000))
+                self.logger.record(f"timing/{name}_p95_ms", float(np.percentile(values, 95) * 1000))
+                self.logger.record(f"timing/{name}_share", float(values.sum() / wall) if wall > 0 else 0.0)
+                self.logger.record(f"timing/{name}_hist", values * 1000, exclude=("stdout", "log", "json", "csv"))
+            self._update_start = time.perf_counter()
+
+        def _on_training_end(self) -> None:
+            if self._update_start is not None:
+                timer.record("update", time.perf_counter() - self._update_start)
+            # Drops the instance attribute so the class forward is used again.
+            del self.model.policy.forward
+
+    return ProfilingCallback()
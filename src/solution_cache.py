@@ -0,0 +1,136 @@
+import os
+import sqlite3
+import time
+from array import array
+from typing import List, Optional, Tuple
+
+from .braid import canonical_key
+
+SCHEMA_VERSION = 2
+
+class SolutionCache:
+    # On-disk store of optimal solver results shared by every process that opens the
+    # same file (sqlite in WAL mode handles concurrent readers/writers).
+    #
+    # Entries are keyed by the exact word: a far commutation is itself a move, so two
+    # commutation-equivalent words can have different optimal step counts. The
+    # canonical form is stored alongside to report how often an equivalent word was
+    # already solved. max_len is part of the key because it bounds the insert moves.
+    #
+    # Paths are stored as (move type, index, generator) int16 triples, generator 0 except
+    # for inserts. Files of an older SCHEMA_VERSION are emptied when first opened.
+    def __init__(self, path: str, max_entries: int = 1_000_000, timeout: float = 60.0):
+        self.path = path
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self._conn = None
+        self._puts_since_evict = 0
+        self.reset_stats()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_conn"] = None
+        return state
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+        self.equivalent_hits = 0
+        self.evicted = 0
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("BEGIN IMMEDIATE")
+            if self._conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+                self._conn.execute("DROP TABLE IF EXISTS solutions")
+                self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS solutions (
+                    n_strands INTEGER NOT NULL,
+                    max_len INTEGER NOT NULL,
+                    word BLOB NOT NULL,
+                    canonical BLOB NOT NULL,
+                    optimal_steps INTEGER NOT NULL,
+                    path BLOB NOT NULL,
+                    last_used INTEGER NOT NULL,
+                    PRIMARY KEY (n_strands, max_len, word)
+                )""")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS solutions_last_used ON solutions (last_used)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS solutions_canonical ON solutions (n_strands, max_len, canonical)")
+            self._conn.execute("COMMIT")
+        return self._conn
+
+    def get(self, word_key: bytes, n_strands: int, max_len: int) -> Optional[List[Tuple[int, ...]]]:
+        row = self.conn.execute(
+            "SELECT path, optimal_steps FROM solutions WHERE n_strands = ? AND max_len = ? AND word = ?",
+            (n_strands, max_len, word_key)
+        ).fetchone()
+
+        if row is None:
+            self.misses += 1
+            equivalent = self.conn.execute(
+                "SELECT 1 FROM solutions WHERE n_strands = ? AND max_len = ? AND canonical = ? LIMIT 1",
+                (n_strands, max_len, canonical_key(array('b', word_key)))
+            ).fetchone()
+            if equivalent is not None:
+                self.equivalent_hits += 1
+            return None
+
+        self.hits += 1
+        self.conn.execute(
+            "UPDATE solutions SET last_used = ? WHERE n_strands = ? AND max_len = ? AND word = ?",
+            (time.time_ns(), n_strands, max_len, word_key)
+        )
+        flat = array('h', row[0]).tolist()
+        return [(move_type, index, generator) if generator else (move_type, index)
+                for move_type, index, generator in zip(flat[0::3], flat[1::3], flat[2::3])]
+
+    def put(self, word_key: bytes, n_strands: int, max_len: int, path: List[Tuple[int, ...]]):
+        # array('h') raises OverflowError for values outside int16 instead of wrapping them.
+        flat = array('h', (v for move in path for v in (move + (0,))[:3]))
+        self.conn.execute(
+            "INSERT OR REPLACE INTO solutions VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (n_strands, max_len, word_key, canonical_key(array('b', word_key)),
+             len(path), flat.tobytes(), time.time_ns())
+        )
+
+        self._puts_since_evict += 1
+        if self._puts_since_evict >= 256:
+            self.evict()
+
+    def evict(self):
+        # Least-recently-used entries go first once the table outgrows max_entries.
+        self._puts_since_evict = 0
+        count = self.conn.execute("SELECT COUNT(*) FROM solutions").fetchone()[0]
+        excess = count - self.max_entries
+        if excess > 0:
+            self.conn.execute(
+                "DELETE FROM solutions WHERE rowid IN (SELECT rowid FROM solutions ORDER BY last_used LIMIT ?)",
+                (excess,)
+            )
+            self.evicted += excess
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM solutions").fetchone()[0]
+
+    def summary(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "equivalent_hits": self.equivalent_hits,
+            "evicted": self.evicted,
+            "hit_rate": self.hits / lookups if lookups else 0.0
+        }
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
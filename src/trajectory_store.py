@@ -0,0 +1,194 @@
+import json
+import os
+import struct
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .braid import Braid, INSERT
+from .braid_dataset import _align
+from .encoding import BraidEncoding
+
+MAGIC = b"BRTJ"
+VERSION = 1
+_PREAMBLE = struct.Struct("<4sII")
+
+def trajectory_path_for(dataset_path: str) -> str:
+    return os.path.splitext(dataset_path)[0] + ".traj"
+
+class TrajectoryStore:
+    # Solver solutions: braid i starts as letters[word_offsets[i]:word_offsets[i + 1]] and
+    # is solved by moves[move_offsets[i]:move_offsets[i + 1]], rows of (move type, index,
+    # generator) with generator 0 except for inserts. Files are memory-mapped like
+    # BraidDataset: "BRTJ", version, header length, JSON header, then 8-byte aligned
+    # word_offsets (int64), letters (int8), move_offsets (int64) and moves (int16, n x 3).
+    def __init__(self, word_offsets: np.ndarray, letters: np.ndarray, move_offsets: np.ndarray, moves: np.ndarray,
+                 n_strands: int, metadata: Optional[dict] = None):
+        self.word_offsets = word_offsets
+        self.letters = letters
+        self.move_offsets = move_offsets
+        self.moves = moves
+        self.n_strands = n_strands
+        self.metadata = metadata or {}
+
+    def __len__(self):
+        return len(self.word_offsets) - 1
+
+    @property
+    def n_transitions(self) -> int:
+        return len(self.moves)
+
+    def word(self, index: int) -> np.ndarray:
+        return self.letters[self.word_offsets[index]:self.word_offsets[index + 1]]
+
+    def path(self, index: int) -> List[Tuple[int, ...]]:
+        # In Braid.apply_moves form, like AStarSolver.solve returns it.
+        rows = self.moves[self.move_offsets[index]:self.move_offsets[index + 1]].tolist()
+        return [(move_type, index, generator) if move_type == INSERT else (move_type, index)
+                for move_type, index, generator in rows]
+
+    @classmethod
+    def from_solutions(cls, words: Sequence[bytes], paths: Sequence[Sequence[Tuple[int, ...]]], n_strands: int,
+                       metadata: Optional[dict] = None) -> "TrajectoryStore":
+        word_offsets = np.zeros(len(words) + 1, dtype=np.int64)
+        word_offsets[1:] = np.cumsum([len(w) for w in words])
+        move_offsets = np.zeros(len(paths) + 1, dtype=np.int64)
+        move_offsets[1:] = np.cumsum([len(p) for p in paths])
+        moves = np.array([(move + (0,))[:3] for path in paths for move in path], dtype=np.int16).reshape(-1, 3)
+        letters = np.frombuffer(b"".join(words), dtype=np.int8).copy()
+        return cls(word_offsets, letters, move_offsets, moves, n_strands, metadata)
+
+    @classmethod
+    def load(cls, path: str) -> "TrajectoryStore":
+        with open(path, 'rb') as file:
+            magic, version, header_len = _PREAMBLE.unpack(file.read(_PREAMBLE.size))
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(f"{path} is not a version {VERSION} trajectory store")
+            header = json.loads(file.read(header_len))
+
+        count, n_letters, n_moves = header["count"], header["letters"], header["moves"]
+        position = _align(_PREAMBLE.size + header_len)
+        arrays = []
+        for dtype, shape in ((np.int64, (count + 1,)), (np.int8, (n_letters,)), (np.int64, (count + 1,)),
+                             (np.int16, (n_moves, 3))):
+            size = int(np.prod(shape)) * np.dtype(dtype).itemsize
+            arrays.append(np.memmap(path, dtype=dtype, mode='r', offset=position, shape=shape) if size
+                          else np.zeros(shape, dtype=dtype))
+            position = _align(position + size)
+
+        metadata = {k: v for k, v in header.items() if k not in ("count", "letters", "moves", "n_strands")}
+        return cls(*arrays, header["n_strands"], metadata)
+
+    def save(self, path: str):
+        header = dict(self.metadata, count=len(self), letters=len(self.letters), moves=len(self.moves),
+                      n_strands=self.n_strands)
+        header_bytes = json.dumps(header).encode()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'wb') as file:
+            file.write(_PREAMBLE.pack(MAGIC, VERSION, len(header_bytes)))
+            file.write(header_bytes)
+            for array, dtype in ((self.word_offsets, np.int64), (self.letters, np.int8),
+                                 (self.move_offsets, np.int64), (self.moves, np.int16)):
+                file.write(b"\0" * (_align(file.tell()) - file.tell()))
+                file.write(np.ascontiguousarray(array, dtype=dtype).tobytes())
+        os.replace(tmp_path, path)
+
+class TrajectoryWriter:
+    # Collects solved braids while a dataset is generated or labelled; flush() (and
+    # close()) rewrite the whole store. With append=True an existing store is extended.
+    def __init__(self, path: str, n_strands: int, metadata: Optional[dict] = None, append: bool = False):
+        self.path = path
+        self.n_strands = n_strands
+        self.metadata = metadata
+        self.words: List[bytes] = []
+        self.paths: List[List[Tuple[int, ...]]] = []
+        if append and os.path.exists(path):
+            existing = TrajectoryStore.load(path)
+            self.metadata = metadata or existing.metadata
+            for i in range(len(existing)):
+                self.add(existing.word(i).tobytes(), existing.path(i))
+
+    def add(self, word_key: bytes, path: Sequence[Tuple[int, ...]]):
+        self.words.append(bytes(word_key))
+        self.paths.append(list(path))
+
+    def flush(self) -> TrajectoryStore:
+        store = TrajectoryStore.from_solutions(self.words, self.paths, self.n_strands, self.metadata)
+        store.save(self.path)
+        return store
+
+    def close(self) -> TrajectoryStore:
+        return self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class TrajectoryLoader:
+    # (observation, action mask, action) minibatches for behaviour cloning: every state
+    # along every stored solution, encoded as the env would show it and with the solver's
+    # move as the target action. Transitions are built once (the batch mask kernel does
+    # the masks) and each pass over the loader shuffles them.
+    #
+    # Solutions through words longer than max_len cannot be shown to the policy and are
+    # dropped, as are moves the env's mask forbids (inserts near max_len).
+    def __init__(self, stores: Sequence[TrajectoryStore], encoding: BraidEncoding, batch_size: int = 256,
+                 shuffle: bool = True, seed: Optional[int] = None):
+        self.encoding = encoding
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.rng = np.random.default_rng(seed)
+        self.dropped = 0
+
+        states, strands, moves = [], [], []
+        for store in stores:
+            for i in range(len(store)):
+                braid = Braid.from_key(store.word(i).tobytes(), store.n_strands)
+                path = store.path(i)
+                trajectory = []
+                for move in path:
+                    trajectory.append(braid.key())
+                    if not braid.apply_move(*move):
+                        break
+                if len(trajectory) != len(path) or len(braid) or max(map(len, trajectory), default=0) > encoding.max_len:
+                    self.dropped += len(path)
+                    continue
+                states += trajectory
+                strands += [store.n_strands] * len(path)
+                moves += [(move + (0,))[:3] for move in path]
+
+        width = encoding.max_len + 2
+        words = np.zeros((len(states), width), dtype=np.int32)
+        lengths = np.array([len(key) for key in states], dtype=np.int64)
+        for row, key in enumerate(states):
+            words[row, :len(key)] = np.frombuffer(key, dtype=np.int8)
+        strands = np.array(strands, dtype=np.int64)
+
+        masks = encoding.action_masks(words, lengths, strands)
+        actions = np.array([encoding.action(*move) for move in moves], dtype=np.int64)
+        keep = masks[np.arange(len(actions)), actions] if len(actions) else np.zeros(0, dtype=bool)
+        self.dropped += int((~keep).sum())
+
+        self.observations = encoding.encode(words, lengths, strands)[keep]
+        self.masks = masks[keep]
+        self.actions = actions[keep]
+
+    @property
+    def n_transitions(self) -> int:
+        return len(self.actions)
+
+    def __len__(self):
+        return (self.n_transitions + self.batch_size - 1) // self.batch_size
+
+    def __iter__(self) -> Iterator[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        order = self.rng.permutation(self.n_transitions) if self.shuffle else np.arange(self.n_transitions)
+        for start in range(0, self.n_transitions, self.batch_size):
+            batch = order[start:start + self.batch_size]
+            yield self.observations[batch], self.masks[batch], self.actions[batch]
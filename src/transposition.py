@@ -0,0 +1,158 @@
+import numba
+import numpy as np
+
+from .move_kernels import COMMUTE, R3, REMOVE, INSERT
+
+# Duplicate detection for AStarSolver before successor keys are built. Each word has a
+# polynomial hash under two 31-bit primes (letter g counts as g + 128, so never 0); from
+# the parent's prefix hashes every successor's hash is O(1): a commute or R3 changes two
+# or three terms, a remove or insert splices the prefix and suffix hashes. The combined
+# 62-bit hashes live in an open-addressing table with the best cost seen, and only the
+# successors that are new or cheaper are returned to be materialized.
+#
+# Distinct words sharing a 62-bit hash would make the solver skip a state; at the table
+# sizes the solver reaches that is vanishingly unlikely, but it is not impossible.
+P1, P2 = 2147483629, 2147483587
+B1, B2 = 1000003, 999983
+
+@numba.njit(cache=True)
+def _claim(hashes, costs, h, cost):
+    # 1 for a new entry, 0 for an improved one, -1 when h is known at cost <= `cost`.
+    mask = hashes.shape[0] - 1
+    slot = h & mask
+    while True:
+        stored = hashes[slot]
+        if stored == 0:
+            hashes[slot] = h
+            costs[slot] = cost
+            return 1
+        if stored == h:
+            if cost < costs[slot]:
+                costs[slot] = cost
+                return 0
+            return -1
+        slot = (slot + 1) & mask
+
+@numba.njit(cache=True)
+def _combine(h1, h2):
+    return ((h1 << 31) | h2) + 1
+
+@numba.njit(cache=True)
+def _word_hash(word):
+    h1 = np.int64(0)
+    h2 = np.int64(0)
+    for i in range(word.shape[0]):
+        h1 = (h1 * B1 + np.int64(word[i]) + 128) % P1
+        h2 = (h2 * B2 + np.int64(word[i]) + 128) % P2
+    return _combine(h1, h2)
+
+@numba.njit(cache=True)
+def _expand(word, cost, n_strands, allow_inserts, pow1, pow2, hashes, costs, out):
+    # Writes (move_type, index, generator) rows for the successors worth keeping to `out`,
+    # in successor_keys order; returns (rows, new table entries).
+    n = word.shape[0]
+    pre1 = np.zeros(n + 1, dtype=np.int64)
+    pre2 = np.zeros(n + 1, dtype=np.int64)
+    for i in range(n):
+        pre1[i + 1] = (pre1[i] * B1 + np.int64(word[i]) + 128) % P1
+        pre2[i + 1] = (pre2[i] * B2 + np.int64(word[i]) + 128) % P2
+    h1, h2 = pre1[n], pre2[n]
+
+    rows = 0
+    added = 0
+    for i in range(n - 1):
+        gen_0 = np.int64(word[i])
+        gen_1 = np.int64(word[i + 1])
+        dist = abs(abs(gen_0) - abs(gen_1))
+        move = -1
+        if dist >= 2:
+            move = COMMUTE
+            # a b -> b a at positions i, i + 1
+            d = gen_1 - gen_0
+            c1 = (h1 + d * (pow1[n - 1 - i] - pow1[n - 2 - i])) % P1
+            c2 = (h2 + d * (pow2[n - 1 - i] - pow2[n - 2 - i])) % P2
+        elif dist == 1:
+            if i < n - 2 and np.int64(word[i + 2]) == gen_0 and gen_0 * gen_1 > 0:
+                move = R3
+                # a b a -> b a b
+                d = gen_1 - gen_0
+                c1 = (h1 + d * (pow1[n - 1 - i] - pow1[n - 2 - i] + pow1[n - 3 - i])) % P1
+                c2 = (h2 + d * (pow2[n - 1 - i] - pow2[n - 2 - i] + pow2[n - 3 - i])) % P2
+        elif gen_0 == -gen_1:
+            move = REMOVE
+            # prefix[:i] followed by the suffix after i + 2
+            c1 = (pre1[i] * pow1[n - i - 2] + h1 - pre1[i + 2] * pow1[n - i - 2] % P1) % P1
+            c2 = (pre2[i] * pow2[n - i - 2] + h2 - pre2[i + 2] * pow2[n - i - 2] % P2) % P2
+        if move >= 0:
+            state = _claim(hashes, costs, _combine(c1, c2), cost)
+            if state >= 0:
+                out[rows, 0] = move
+                out[rows, 1] = i
+                out[rows, 2] = 0
+                rows += 1
+                added += state
+
+    if allow_inserts:
+        for i in range(n + 1):
+            suffix1 = (h1 - pre1[i] * pow1[n - i] % P1) % P1
+            suffix2 = (h2 - pre2[i] * pow2[n - i] % P2) % P2
+            head1 = pre1[i] * pow1[2] % P1
+            head2 = pre2[i] * pow2[2] % P2
+            for gen in range(1, n_strands):
+                pair1 = (head1 + (gen + 128) * B1 + 128 - gen) % P1
+                pair2 = (head2 + (gen + 128) * B2 + 128 - gen) % P2
+                c1 = (pair1 * pow1[n - i] + suffix1) % P1
+                c2 = (pair2 * pow2[n - i] + suffix2) % P2
+                state = _claim(hashes, costs, _combine(c1, c2), cost)
+                if state >= 0:
+                    out[rows, 0] = INSERT
+                    out[rows, 1] = i
+                    out[rows, 2] = gen
+                    rows += 1
+                    added += state
+    return rows, added
+
+@numba.njit(cache=True)
+def _rehash(hashes, costs, new_hashes, new_costs):
+    for slot in range(hashes.shape[0]):
+        if hashes[slot] != 0:
+            _claim(new_hashes, new_costs, hashes[slot], costs[slot])
+
+class TranspositionTable:
+    # Best known cost per word hash for one search; reset() between solves.
+    def __init__(self, n_strands: int, max_len: int, capacity: int = 1 << 16):
+        self.n_strands = n_strands
+        self.max_candidates = (max_len + 1) * n_strands
+        self.pow1 = np.ones(max_len + 3, dtype=np.int64)
+        self.pow2 = np.ones(max_len + 3, dtype=np.int64)
+        for k in range(1, max_len + 3):
+            self.pow1[k] = self.pow1[k - 1] * B1 % P1
+            self.pow2[k] = self.pow2[k - 1] * B2 % P2
+        self.out = np.zeros((self.max_candidates, 3), dtype=np.int64)
+        self.initial_capacity = capacity
+        self.reset()
+
+    def reset(self):
+        self.hashes = np.zeros(self.initial_capacity, dtype=np.int64)
+        self.costs = np.zeros(self.initial_capacity, dtype=np.int32)
+        self.filled = 0
+
+    def _grow(self):
+        hashes = np.zeros(2 * len(self.hashes), dtype=np.int64)
+        costs = np.zeros(2 * len(self.hashes), dtype=np.int32)
+        _rehash(self.hashes, self.costs, hashes, costs)
+        self.hashes, self.costs = hashes, costs
+
+    def add(self, key: bytes, cost: int):
+        word = np.frombuffer(key, dtype=np.int8)
+        self.filled += max(_claim(self.hashes, self.costs, _word_hash(word), cost), 0)
+
+    def expand(self, key: bytes, cost: int, allow_inserts: bool) -> list:
+        # [(move_type, index, generator)] of the successors at `cost` that are new or cheaper.
+        # The table stays at most half full, so probing ends quickly.
+        while 2 * (self.filled + self.max_candidates) > len(self.hashes):
+            self._grow()
+        rows, added = _expand(np.frombuffer(key, dtype=np.int8), cost, self.n_strands, allow_inserts,
+                              self.pow1, self.pow2, self.hashes, self.costs, self.out)
+        self.filled += added
+        return self.out[:rows].tolist()
@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+
+from src.braid import Braid, COMMUTE, R3, REMOVE, INSERT
+from src.braid_env import BraidEnv
+from src.config import Configuration
+
+DATASET = "data/test/test_n5_c8_m10.txt"
+MAX_LEN = 12
+
+@pytest.fixture
+def env():
+    # debug_masks compares every incremental mask with a fresh scan and raises on a mismatch.
+    env = BraidEnv(DATASET, 5, MAX_LEN, Configuration(n_strands=5, max_len=MAX_LEN), debug_masks=True)
+    env.reset(seed=0)
+    return env
+
+def test_random_episodes_keep_masks_in_sync(env):
+    # A short max_len makes episodes run into the length limit, so inserts and removes
+    # happen at both ends of full words as well as at index 0.
+    rng = np.random.default_rng(0)
+    edges = 0
+    for _ in range(5000):
+        mask = env.action_masks()
+        action = int(rng.choice(np.flatnonzero(mask)))
+        index = action % MAX_LEN
+        edges += index == 0 or index >= len(env.current_braid) - 2
+        _, _, terminated, truncated, _ = env.step(action)
+        if terminated or truncated:
+            env.reset()
+    assert edges > 500
+
+@pytest.mark.parametrize("word, moves", [
+    ([1, -1, 2, 3], [(REMOVE, 0), (INSERT, 0, 4), (REMOVE, 0), (INSERT, 2, 1)]),
+    ([1, 3, 2, 4, -4], [(REMOVE, 3), (INSERT, 3, 2), (REMOVE, 3), (COMMUTE, 0)]),
+    ([1, 2, 1, 3], [(R3, 0), (INSERT, 4, 3), (REMOVE, 4), (INSERT, 0, 2), (REMOVE, 0)]),
+    ([1, 2, 3, 4, 1, 2, 3, 4], [(INSERT, 8, 1), (INSERT, 10, 2), (REMOVE, 10), (REMOVE, 8)]),
+    ([2, 4, 1, 3, 2, 4, 1, 3, 2], [(INSERT, 0, 3), (REMOVE, 0), (INSERT, 9, 4), (REMOVE, 9), (COMMUTE, 6)]),
+])
+def test_edge_moves_keep_masks_in_sync(env, word, moves):
+    env.current_braid = Braid(word, 5)
+    env.action_masks()
+    for move in moves:
+        assert env.current_braid.apply_move(*move)
+        env.action_masks()
+
+def test_full_word_allows_no_insert(env):
+    env.current_braid = Braid([1, 3] * ((MAX_LEN - 2) // 2), 5)
+    mask = env.action_masks()
+    assert not mask[INSERT * MAX_LEN:].any()
+
+def test_vec_env_rejects_shared_calls_on_a_subset():
+    from src.braid_vec_env import BraidVecEnv
+
+    vec_env = BraidVecEnv(DATASET, 5, MAX_LEN, Configuration(n_strands=5, max_len=MAX_LEN), n_envs=3)
+    vec_env.reset()
+    assert len(vec_env.env_method("action_masks", indices=[0, 2])) == 2
+    assert vec_env.env_method("source_stats") == [{}, {}, {}]
+    with pytest.raises(ValueError):
+        vec_env.env_method("set_dataset", DATASET, indices=[0])
+    with pytest.raises(ValueError):
+        vec_env.set_attr("finetune_mode", True, indices=[1])
@@ -0,0 +1,71 @@
+import time
+
+import numpy as np
+import pytest
+
+from src.braid import Braid
+from src.curriculum import ProceduralSource
+
+@pytest.mark.parametrize("processes", [False, True])
+def test_producer_serves_identities_and_follows_level(processes):
+    source = ProceduralSource(5, 8, 10, capacity=512, batch_size=64, seed=0, processes=processes)
+    try:
+        rng = np.random.default_rng(0)
+        keys = [source.take(rng) for _ in range(1000)]
+        assert {len(key) for key in keys} == {8}
+        assert all(Braid.from_key(key, 5).is_identity() for key in keys[:100])
+
+        source.set_level(16, 10)
+        deadline = time.monotonic() + 30
+        while source.stats()["buffered"] == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert len(source.take(rng)) == 16
+    finally:
+        source.close()
+
+def test_thread_and_process_generate_the_same_braids():
+    sources = [ProceduralSource(5, 8, 10, capacity=256, batch_size=64, seed=3, processes=processes)
+               for processes in (False, True)]
+    try:
+        # Wait until both producers have filled their buffers, so nothing is recycled.
+        deadline = time.monotonic() + 30
+        while any(s.stats()["buffered"] < 192 for s in sources) and time.monotonic() < deadline:
+            time.sleep(0.01)
+        thread, process = ([s.take(np.random.default_rng(0)) for _ in range(192)] for s in sources)
+        assert thread == process
+    finally:
+        for source in sources:
+            source.close()
+
+def test_level_must_fit_the_slots():
+    with pytest.raises(ValueError):
+        ProceduralSource(5, 40, 10, max_word_len=32)
+
+@pytest.mark.parametrize("vectorized", [False, True])
+def test_curriculum_keeps_the_source_strand_count(vectorized):
+    from src.braid_agent import BraidAgent
+    from src.braid_vec_env import BraidVecEnv
+    from src.callbacks import BraidCallback
+    from src.config import Configuration
+    from src.curriculum import Curriculum
+
+    config = Configuration(n_strands=7, max_len=40)
+    agent = BraidAgent(config, {"n_steps": 64, "batch_size": 64, "n_epochs": 1, "seed": 0, "device": "cpu", "verbose": 0})
+    source_kwargs = {"n_strands": 3, "capacity": 256, "batch_size": 64}
+    if vectorized:
+        env = BraidVecEnv(None, 7, 40, config, n_envs=2, max_episode_steps=5)
+        agent.set_procedural(env, 8, 10, **source_kwargs)
+    else:
+        env = agent.make_procedural_env(8, 10, max_episode_steps=5, **source_kwargs)
+    try:
+        # Every episode promotes, so the level changes during training.
+        curriculum = Curriculum([(8, 10), (12, 10), (16, 10)], promote_at=0.0, min_episodes=1)
+        agent.train(env, 128, callback=BraidCallback(curriculum=curriculum, window=1))
+        assert curriculum.index > 0
+        assert env.source.n_strands == 3 and env.source.crossings == curriculum.level[0]
+        # Fresh episodes are drawn from the 3-strand source (inserts may add any generator later).
+        env.reset()
+        words = env.words if vectorized else [env.current_braid.word]
+        assert 0 < np.abs(words).max() < 3
+    finally:
+        env.close()
@@ -0,0 +1,24 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Wall-clock budgets stay in benchmarks/import_time.py; only the dependency rules are tested here.
+HEAVY = ("torch", "stable_baselines3", "sb3_contrib", "gymnasium")
+
+def loaded_modules(statement, modules):
+    # Imports in a fresh interpreter and reports which of modules came along. The numba
+    # kernels (BRAID_KERNELS=numba) load numpy by design, so the probe uses the default ones.
+    env = {k: v for k, v in os.environ.items() if k != "BRAID_KERNELS"}
+    probe = f"import sys\n{statement}\nprint(','.join(m for m in {modules!r} if m in sys.modules))"
+    return subprocess.run([sys.executable, "-c", probe], cwd=PROJECT_ROOT, env=env, check=True, capture_output=True,
+                          text=True).stdout.split()
+
+def test_inference_path_skips_training_dependencies():
+    assert loaded_modules("import src.braid_agent, src.numpy_policy", HEAVY) == []
+
+@pytest.mark.parametrize("module", ["src.move_kernels", "src.braid", "src.optimal_solver", "src.braid_generator"])
+def test_core_modules_skip_numpy(module):
+    assert loaded_modules(f"import {module}", HEAVY + ("numpy",)) == []
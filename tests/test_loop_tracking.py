@@ -0,0 +1,105 @@
+import numpy as np
+import pytest
+
+from src.braid_env import BraidEnv
+from src.braid_kernels import (batch_action_masks, batch_apply_moves, batch_move_hashes, batch_rolling_hashes,
+                               hash_values)
+from src.braid_vec_env import BraidVecEnv
+from src.config import Configuration
+from src.move_kernels import INSERT, enumerate_moves, move_hash, successor_hashes, word_hash
+
+N_STRANDS = 5
+MAX_LEN = 30
+DATASET = "data/train/train_n5_c8_m10.txt"
+
+def random_batch(n=2000, seed=0):
+    # A small alphabet keeps every move type common, R3 patterns included.
+    rng = np.random.default_rng(seed)
+    lengths = rng.integers(0, MAX_LEN - 1, n)
+    words = np.zeros((n, MAX_LEN + 2), dtype=np.int32)
+    for row, length in enumerate(lengths.tolist()):
+        words[row, :length] = rng.choice([1, -1, 2, -2, 3, -3], length)
+    return rng, words, lengths
+
+def test_move_hashes_match_full_rehash():
+    rng, words, lengths = random_batch()
+    checked = np.zeros(4, dtype=np.int64)
+    for _ in range(20):
+        masks = batch_action_masks(words, lengths, MAX_LEN)
+        # Weighted towards the rarer move types, inserts included.
+        weights = masks * np.repeat([50.0, 400.0, 30.0, 1.0], MAX_LEN)[None]
+        actions = (rng.random(masks.shape) ** (1 / np.maximum(weights, 1e-9)) * masks).argmax(axis=1)
+        move_types, indices = np.divmod(actions, MAX_LEN)
+        generators = rng.choice([1, 2, -3], len(actions)).astype(np.int32) * (move_types == INSERT)
+
+        hashes = batch_rolling_hashes(words, lengths)
+        moved = batch_move_hashes(hashes, words, np.arange(len(words)), move_types, indices, generators)
+        scalar = [move_hash(h, words[r, :lengths[r]].tolist(), int(m), int(i), int(g))
+                  for r, (h, m, i, g) in enumerate(zip(hash_values(hashes), move_types, indices, generators))]
+        success = batch_apply_moves(words, lengths, move_types, indices, generators)
+        expected = hash_values(batch_rolling_hashes(words, lengths))
+
+        assert success.all()
+        assert hash_values(moved) == expected
+        assert scalar == expected
+        assert [word_hash(words[r, :lengths[r]].tolist()) for r in range(100)] == expected[:100]
+        checked += np.bincount(move_types, minlength=4)
+        lengths = np.where(lengths > MAX_LEN - 3, 0, lengths)
+    assert (checked > 0).all()
+
+def test_successor_hashes_match_move_hash():
+    _, words, lengths = random_batch(300, seed=1)
+    for row in range(len(words)):
+        word = words[row, :lengths[row]].tolist()
+        moves = [(move_type, i) for move_type, indices in enumerate(enumerate_moves(word)) for i in indices]
+        value = word_hash(word)
+        assert successor_hashes(value, word, moves) == [move_hash(value, word, m, i) for m, i in moves]
+
+def test_tracking_is_opt_in():
+    config = Configuration(n_strands=N_STRANDS, max_len=MAX_LEN)
+    assert not config.TRACK_LOOPS and not config.MASK_LOOPS
+    assert not BraidEnv(DATASET, N_STRANDS, MAX_LEN, config).track_loops
+    assert not BraidVecEnv(DATASET, N_STRANDS, MAX_LEN, config, n_envs=2).track_loops
+    assert BraidEnv(DATASET, N_STRANDS, MAX_LEN, Configuration(n_strands=N_STRANDS, max_len=MAX_LEN,
+                                                                 mask_loops=True)).track_loops
+
+@pytest.mark.parametrize("mask_loops", [False, True])
+def test_scalar_and_vec_envs_agree(mask_loops):
+    config = Configuration(n_strands=N_STRANDS, max_len=MAX_LEN, track_loops=True, mask_loops=mask_loops)
+    env = BraidEnv(DATASET, N_STRANDS, MAX_LEN, config, max_episode_steps=60)
+    vec_env = BraidVecEnv(DATASET, N_STRANDS, MAX_LEN, config, n_envs=1, max_episode_steps=60)
+    env.reset(seed=3)
+    vec_env.seed(3)
+    vec_env.reset()
+    rng = np.random.default_rng(0)
+    loops = 0
+    for _ in range(2000):
+        mask = env.action_masks()
+        np.testing.assert_array_equal(mask, vec_env.action_masks()[0])
+        action = int(rng.choice(np.flatnonzero(mask)))
+        _, reward, terminated, truncated, info = env.step(action)
+        _, vec_rewards, _, vec_infos = vec_env.step(np.array([action]))
+        assert reward == pytest.approx(vec_rewards[0]) and info["loop"] == vec_infos[0]["loop"]
+        loops += info["loop"]
+        if terminated or truncated:
+            env.reset()
+    assert loops > 0
+
+def test_loop_flags_are_exact_revisits():
+    config = Configuration(n_strands=N_STRANDS, max_len=MAX_LEN, track_loops=True)
+    env = BraidEnv(DATASET, N_STRANDS, MAX_LEN, config, max_episode_steps=80)
+    env.reset(seed=1)
+    seen = {env.current_braid.key()}
+    rng = np.random.default_rng(1)
+    loops = 0
+    for _ in range(5000):
+        _, _, terminated, truncated, info = env.step(int(rng.choice(np.flatnonzero(env.action_masks()))))
+        if info["success"] and not terminated:
+            key = env.current_braid.key()
+            assert info["loop"] == (key in seen)
+            loops += info["loop"]
+            seen.add(key)
+        if terminated or truncated:
+            env.reset()
+            seen = {env.current_braid.key()}
+    assert loops > 0
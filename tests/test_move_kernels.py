@@ -0,0 +1,118 @@
+from array import array
+from functools import lru_cache
+
+import numpy as np
+import pytest
+
+from src import move_kernels
+from src.braid import Braid
+from src.move_kernels import (COMMUTE, R3, REMOVE, INSERT, apply_valid_move, enumerate_moves, move_flags,
+                              predecessor_keys, refresh_flags, successor_key)
+
+N_STRANDS = 5
+PAIRS = [bytes((gen, -gen & 0xFF)) for gen in range(1, N_STRANDS)]
+SIGNED_PAIRS = PAIRS + [bytes((-gen & 0xFF, gen)) for gen in range(1, N_STRANDS)]
+
+@lru_cache(maxsize=None)
+def numba_move_codes():
+    return move_kernels.load_numba()
+
+@pytest.fixture(params=["python", "numba"], autouse=True)
+def backend(request, monkeypatch):
+    # Every test runs on both backends, whatever BRAID_KERNELS selected at import.
+    if request.param == "numba":
+        pytest.importorskip("numba")
+        monkeypatch.setattr(move_kernels, "move_codes", numba_move_codes())
+        monkeypatch.setattr(move_kernels, "successor_keys", move_kernels._coded_successor_keys)
+    else:
+        monkeypatch.setattr(move_kernels, "move_codes", move_kernels.python_move_codes)
+        monkeypatch.setattr(move_kernels, "successor_keys", move_kernels.python_successor_keys)
+    return request.param
+
+def random_words(count=300, seed=0):
+    # A small alphabet keeps every move type common, R3 patterns included.
+    rng = np.random.default_rng(seed)
+    letters = [g for g in range(1, N_STRANDS) for g in (g, -g)]
+    return [[int(x) for x in rng.choice(letters, size=rng.integers(0, 16))] for _ in range(count)] + [[], [1], [2, -2]]
+
+def checks(braid):
+    # (commute, r3, remove) validity per index, as the Braid.check_* methods report it.
+    n = len(braid)
+    return ([braid.check_commutation(i) for i in range(n)], [braid.check_braid_relation(i) for i in range(n)],
+            [braid.check_remove_pair(i) for i in range(n)])
+
+def valid_moves(word):
+    braid = Braid(word, N_STRANDS)
+    return [(move, i) for move, flags in zip((COMMUTE, R3, REMOVE), checks(braid)) for i, ok in enumerate(flags) if ok]
+
+def reference_apply(word, move, index, generator=0):
+    word = list(word)
+    if move == COMMUTE:
+        word[index], word[index + 1] = word[index + 1], word[index]
+    elif move == R3:
+        word[index:index + 3] = [word[index + 1], word[index], word[index + 1]]
+    elif move == REMOVE:
+        del word[index:index + 2]
+    else:
+        word[index:index] = [generator, -generator]
+    return word
+
+def key(word):
+    return array('b', word).tobytes()
+
+def test_enumerate_moves_and_flags_match_braid_checks():
+    for word in random_words():
+        expected = checks(Braid(word, N_STRANDS))
+        assert enumerate_moves(word) == tuple([i for i, ok in enumerate(flags) if ok] for flags in expected)
+        assert enumerate_moves(key(word)) == enumerate_moves(word)
+        assert move_flags(word) == tuple(bytearray(flags) for flags in expected)
+
+def test_refresh_flags_only_touches_its_window():
+    rng = np.random.default_rng(1)
+    for word in random_words(seed=1):
+        expected = tuple(bytearray(flags) for flags in checks(Braid(word, N_STRANDS)))
+        start, stop = sorted(int(x) for x in rng.integers(-2, len(word) + 3, size=2))
+        flags = tuple(bytearray(b"\x07" * len(word)) for _ in range(3))
+        refresh_flags(array('b', word), flags, start, stop)
+        window = range(max(start, 0), min(stop, len(word)))
+        for got, want in zip(flags, expected):
+            assert [got[i] for i in window] == [want[i] for i in window]
+            assert all(got[i] == 7 for i in range(len(word)) if i not in window)
+
+def test_apply_valid_move_matches_reference():
+    for word in random_words():
+        moves = valid_moves(word) + [(INSERT, i, g) for i in range(len(word) + 1) for g in (1, -3)]
+        for move in moves:
+            applied = array('b', word)
+            apply_valid_move(applied, *move)
+            assert applied.tolist() == reference_apply(word, *move)
+
+def test_successor_key_matches_apply():
+    for word in random_words():
+        for move, i in valid_moves(word):
+            assert successor_key(key(word), move, i) == key(reference_apply(word, move, i))
+        for i in range(len(word) + 1):
+            assert successor_key(key(word), INSERT, i, PAIRS[1]) == key(reference_apply(word, INSERT, i, 2))
+
+def test_successor_keys_enumerate_every_move():
+    for word in random_words():
+        for insert_limit in (0, len(word), len(word) + 1):
+            expected = [(move, i, key(reference_apply(word, move, i))) for move, i in
+                        sorted(valid_moves(word), key=lambda m: m[1])]
+            if len(word) < insert_limit:
+                expected += [(INSERT, i, key(reference_apply(word, INSERT, i, g)))
+                             for i in range(len(word) + 1) for g in range(1, N_STRANDS)]
+            assert list(move_kernels.successor_keys(key(word), PAIRS, insert_limit)) == expected
+
+def test_predecessor_keys_invert_successor_keys():
+    insert_limit, max_word_len = 14, 16
+    for word in random_words():
+        k = key(word)
+        predecessors = list(predecessor_keys(k, SIGNED_PAIRS, insert_limit, max_word_len))
+        # Every predecessor reaches the word in one forward move...
+        for _, _, predecessor in predecessors:
+            assert k in {s for _, _, s in move_kernels.successor_keys(predecessor, PAIRS, insert_limit)}
+        # ...and the word is a predecessor of each of its successors.
+        for _, _, successor in move_kernels.successor_keys(k, PAIRS, insert_limit):
+            if len(successor) <= max_word_len:
+                assert k in {p for _, _, p in predecessor_keys(successor, SIGNED_PAIRS, insert_limit, max_word_len)}
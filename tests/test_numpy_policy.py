@@ -0,0 +1,68 @@
+import glob
+
+import numpy as np
+import pytest
+
+from src.braid_agent import BraidAgent
+from src.braid_dataset import BraidDataset
+from src.braid_kernels import batch_action_masks
+from src.config import Configuration
+from src.numpy_policy import NumpyPolicy
+
+N_STRANDS = 5
+MAX_LEN = 100
+
+@pytest.fixture(scope="module")
+def trained(tmp_path_factory):
+    config = Configuration(n_strands=N_STRANDS, max_len=MAX_LEN)
+    agent = BraidAgent(config, {"n_steps": 64, "batch_size": 64, "n_epochs": 2, "seed": 0, "device": "cpu", "verbose": 0})
+    env = agent.make_mixed_env(["data/train/train_n5_c8_m10.txt"], n_envs=4, max_episode_steps=50)
+    agent.train(env, 512)
+    env.close()
+    path = agent.export(str(tmp_path_factory.mktemp("policy") / "policy.npz"))
+    return agent.model, NumpyPolicy.load(path)
+
+@pytest.fixture(scope="module")
+def states():
+    # Initial states of every shipped n=5 test file, with their action masks.
+    words, lengths = [], []
+    for path in sorted(glob.glob(f"data/test/test_n{N_STRANDS}_*.txt")):
+        dataset = BraidDataset.load(path)
+        words.append(dataset.padded_words(MAX_LEN + 2))
+        lengths.append(np.minimum(dataset.lengths(), MAX_LEN))
+    words, lengths = np.concatenate(words), np.concatenate(lengths)
+    words[:, MAX_LEN:] = 0
+    return words[:, :MAX_LEN], batch_action_masks(words, lengths, MAX_LEN)
+
+def test_actions_match_maskable_ppo(trained, states):
+    model, policy = trained
+    obs, masks = states
+    expected, _ = model.predict(obs, action_masks=masks, deterministic=True)
+    actions, _ = policy.predict(obs, action_masks=masks, deterministic=True)
+    np.testing.assert_array_equal(actions, expected)
+    assert masks[np.arange(len(actions)), actions].all()
+
+def test_single_observation_gives_scalar_action(trained, states):
+    model, policy = trained
+    obs, masks = states
+    expected, _ = model.predict(obs[0], action_masks=masks[0], deterministic=True)
+    action, _ = policy.predict(obs[0], action_masks=masks[0], deterministic=True)
+    assert np.ndim(action) == 0 and action == expected
+
+def test_logits_match_maskable_ppo(trained, states):
+    import torch
+
+    model, policy = trained
+    obs, masks = states
+    with torch.no_grad():
+        obs_tensor, _ = model.policy.obs_to_tensor(obs)
+        distribution = model.policy.get_distribution(obs_tensor, action_masks=masks)
+        expected = distribution.distribution.logits.numpy()
+        values = model.policy.predict_values(obs_tensor).numpy().reshape(-1)
+
+    # MaskableCategorical normalises its logits and fills masked ones with a large negative
+    # number; NumpyPolicy leaves them unnormalised and uses -inf.
+    log_probs, numpy_values = policy.action_log_probs(obs, masks)
+    np.testing.assert_allclose(log_probs[masks], expected[masks], rtol=1e-4, atol=1e-4)
+    assert np.isneginf(log_probs[~masks]).all()
+    np.testing.assert_allclose(numpy_values, values, rtol=1e-4, atol=1e-4)
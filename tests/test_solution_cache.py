@@ -0,0 +1,35 @@
+import sqlite3
+from array import array
+
+import pytest
+
+from src.move_kernels import COMMUTE, R3, REMOVE, INSERT
+from src.solution_cache import SCHEMA_VERSION, SolutionCache
+
+def test_paths_round_trip_with_large_indices_and_signed_generators(tmp_path):
+    cache = SolutionCache(str(tmp_path / "cache.sqlite"))
+    key = array('b', [1, -1, 2]).tobytes()
+    path = [(REMOVE, 0), (INSERT, 300, -4), (COMMUTE, 255), (R3, 256), (INSERT, 0, 3)]
+    cache.put(key, 5, 400, path)
+    assert cache.get(key, 5, 400) == path
+    assert cache.get(key, 5, 100) is None
+
+def test_out_of_range_values_are_rejected(tmp_path):
+    cache = SolutionCache(str(tmp_path / "cache.sqlite"))
+    with pytest.raises(OverflowError):
+        cache.put(b"\x01\xff", 3, 100, [(REMOVE, 40_000)])
+
+def test_older_schema_is_dropped(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    cache = SolutionCache(path)
+    cache.put(b"\x01\xff", 3, 100, [(REMOVE, 0)])
+    cache.close()
+    conn = sqlite3.connect(path)
+    conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION - 1}")
+    conn.close()
+
+    cache = SolutionCache(path)
+    assert len(cache) == 0
+    cache.put(b"\x01\xff", 3, 100, [(REMOVE, 0)])
+    cache.close()
+    assert len(SolutionCache(path)) == 1